@@ -7,10 +7,11 @@ including medical supplies, pharmaceuticals, and equipment consumables.
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from array import array
 import json
 import uuid
 from typing import Union
@@ -71,6 +72,26 @@ try:
                 BALANCE_ALL = "balance_all"
             intelligent_optimizer = None
             
+        try:
+            from consumption_store import ConsumptionTimeSeriesStore
+        except:
+            ConsumptionTimeSeriesStore = None
+            
+        try:
+            from abc_xyz import ABCXYZClassifier
+        except:
+            ABCXYZClassifier = None
+            
+        try:
+            from transfer_planning import plan_transfers, transfer_cost_matrix
+        except:
+            plan_transfers = None
+            
+        try:
+            from inventory_kernels import fill_rate, safety_stock_for_service_level, stockout_probability
+        except:
+            safety_stock_for_service_level = None
+            
         AI_ML_AVAILABLE = False  # Set to False for now until modules are created
         print("✅ AI/ML fallback classes loaded")
     else:
@@ -91,11 +112,21 @@ try:
         initialize_ai_engine = None
         demand_forecasting = None
         intelligent_optimizer = None
+        ConsumptionTimeSeriesStore = None
+        ABCXYZClassifier = None
+        plan_transfers = None
+        safety_stock_for_service_level = None
         AI_ML_AVAILABLE = False
         print("✅ AI/ML fallback classes created (no AI/ML directory)")
         
 except ImportError as e:
     print(f"⚠️ AI/ML modules not available: {e}")
+    predictive_analytics = None
+    demand_forecasting = None
+    ConsumptionTimeSeriesStore = None
+    ABCXYZClassifier = None
+    plan_transfers = None
+    safety_stock_for_service_level = None
     AI_ML_AVAILABLE = False
 
 class SupplyCategory(Enum):
@@ -241,6 +272,9 @@ class SupplyItem:
     # Daily consumption for demand forecasting
     daily_consumption: int = 10
     
+    # Demand variability class (X, Y, Z), computed alongside abc_classification
+    xyz_classification: Optional[str] = None
+    
     @property
     def current_quantity(self) -> int:
         """Total quantity across all locations (alias for total_quantity)"""
@@ -501,6 +535,160 @@ class ComplianceRecord:
         delta = self.expiry_date - datetime.now()
         return max(0, delta.days)
 
+class DailyUsageBuffer:
+    """
+    Daily usage totals for the last `window` days of one item, in a fixed ring buffer.
+    Running sums make the average and variance O(1); memory per item is constant.
+    """
+    __slots__ = ('window', 'values', 'first_day', 'last_day', 'total', 'total_squares')
+    
+    def __init__(self, window: int = 30):
+        self.window = window
+        self.values = array('d', [0.0]) * window  # Slot for a day: day.toordinal() % window
+        self.first_day: Optional[date] = None
+        self.last_day: Optional[date] = None
+        self.total = 0.0
+        self.total_squares = 0.0
+    
+    @property
+    def days(self) -> int:
+        """Days covered, from the first recorded day (or the window start) to the latest"""
+        if self.last_day is None:
+            return 0
+        return min(self.window, (self.last_day - self.first_day).days + 1)
+    
+    def _advance(self, day: date) -> bool:
+        """Move the window forward to `day`, clearing expired slots; False if `day` is already out of the window"""
+        if self.last_day is None:
+            self.first_day = self.last_day = day
+            return True
+        gap = (day - self.last_day).days
+        if gap <= 0:
+            return -gap < self.days
+        last_ordinal = self.last_day.toordinal()
+        for ordinal in range(last_ordinal + 1, last_ordinal + min(gap, self.window) + 1):
+            slot = ordinal % self.window
+            expired = self.values[slot]
+            self.total -= expired
+            self.total_squares -= expired * expired
+            self.values[slot] = 0.0
+        self.last_day = day
+        return True
+    
+    def _write(self, day: date, usage: float):
+        slot = day.toordinal() % self.window
+        previous = self.values[slot]
+        self.values[slot] = usage
+        self.total += usage - previous
+        self.total_squares += usage * usage - previous * previous
+    
+    def add(self, day: date, usage: float):
+        """Accumulate usage into a day's total"""
+        if self._advance(day):
+            self._write(day, self.values[day.toordinal() % self.window] + usage)
+    
+    def set(self, day: date, usage: float):
+        """Replace a day's total"""
+        if self._advance(day):
+            self._write(day, float(usage))
+    
+    def covers(self, day: date) -> bool:
+        """Whether `day` lies within the recorded span (days without events count as zero usage)"""
+        return self.last_day is not None and 0 <= (self.last_day - day).days < self.days
+    
+    def mean(self) -> float:
+        days = self.days
+        return self.total / days if days else 0.0
+    
+    def variance(self) -> float:
+        days = self.days
+        if not days:
+            return 0.0
+        mean = self.total / days
+        return max(0.0, self.total_squares / days - mean * mean)
+    
+    def daily_values(self, end_day: Optional[date] = None) -> List[Optional[float]]:
+        """Usage for the `window` days ending at end_day (default: latest), oldest first; None where not covered"""
+        end_day = end_day or self.last_day
+        if end_day is None:
+            return [None] * self.window
+        first_covered = self.last_day - timedelta(days=self.days - 1) if self.last_day else None
+        end_ordinal = end_day.toordinal()
+        result: List[Optional[float]] = []
+        for ordinal in range(end_ordinal - self.window + 1, end_ordinal + 1):
+            if self.last_day is None or ordinal < first_covered.toordinal():
+                result.append(None)
+            elif ordinal > self.last_day.toordinal():
+                result.append(0.0)  # No usage recorded since the latest day
+            else:
+                result.append(self.values[ordinal % self.window])
+        return result
+    
+    def history(self) -> List[Dict[str, Any]]:
+        """Covered days as {'date', 'usage'} records, oldest first"""
+        if self.last_day is None:
+            return []
+        return [
+            {'date': self.last_day - timedelta(days=offset), 'usage': self.values[(self.last_day.toordinal() - offset) % self.window]}
+            for offset in range(self.days - 1, -1, -1)
+        ]
+
+class UsageHistoryStore:
+    """Per-item daily usage buffers with catalogue-wide matrix export for the ML modules"""
+    
+    def __init__(self, window: int = 30):
+        self.window = window
+        self.buffers: Dict[str, DailyUsageBuffer] = {}
+    
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.buffers
+    
+    def buffer(self, item_id: str) -> DailyUsageBuffer:
+        if item_id not in self.buffers:
+            self.buffers[item_id] = DailyUsageBuffer(self.window)
+        return self.buffers[item_id]
+    
+    def record(self, item_id: str, usage: float, day: Optional[date] = None):
+        """Add a consumption event to the item's daily total"""
+        self.buffer(item_id).add(day or datetime.now().date(), usage)
+    
+    def average(self, item_id: str, default: float = 5.0) -> float:
+        buffer = self.buffers.get(item_id)
+        return buffer.mean() if buffer is not None and buffer.days else default
+    
+    def variance(self, item_id: str) -> float:
+        buffer = self.buffers.get(item_id)
+        return buffer.variance() if buffer is not None else 0.0
+    
+    def history(self, item_id: str) -> List[Dict[str, Any]]:
+        buffer = self.buffers.get(item_id)
+        return buffer.history() if buffer is not None else []
+    
+    def usage_matrix(self, item_ids: Optional[List[str]] = None, end_day: Optional[date] = None) -> Tuple[List[str], Any]:
+        """(items x window) NumPy matrix of daily usage ending at end_day, NaN where not covered"""
+        import numpy as np
+        
+        item_ids = list(self.buffers) if item_ids is None else item_ids
+        end_day = end_day or max((buffer.last_day for buffer in self.buffers.values() if buffer.last_day), default=None)
+        matrix = np.full((len(item_ids), self.window), np.nan)
+        for row, item_id in enumerate(item_ids):
+            buffer = self.buffers.get(item_id)
+            if buffer is not None and end_day is not None:
+                matrix[row] = [np.nan if value is None else value for value in buffer.daily_values(end_day)]
+        return item_ids, matrix
+    
+    def stats_matrix(self, item_ids: Optional[List[str]] = None) -> Tuple[List[str], Any]:
+        """(items x 3) NumPy matrix of [days covered, mean, variance] per item"""
+        import numpy as np
+        
+        item_ids = list(self.buffers) if item_ids is None else item_ids
+        stats = np.zeros((len(item_ids), 3))
+        for row, item_id in enumerate(item_ids):
+            buffer = self.buffers.get(item_id)
+            if buffer is not None:
+                stats[row] = (buffer.days, buffer.mean(), buffer.variance())
+        return item_ids, stats
+
 class ProfessionalSupplyInventoryAgent:
     """
     Professional-grade autonomous agent for comprehensive hospital supply inventory management
@@ -519,8 +707,17 @@ class ProfessionalSupplyInventoryAgent:
         self.audit_logs: List[AuditLog] = []
         self.budgets: Dict[str, Budget] = {}
         self.compliance_records: Dict[str, ComplianceRecord] = {}
-        self.usage_patterns: Dict[str, List] = {}
+        self.usage_patterns = UsageHistoryStore(window=30)  # Last 30 days of usage per item
+        # Minute/hour/day consumption per item and location, kept for years at daily resolution
+        self.consumption_store = ConsumptionTimeSeriesStore() if ConsumptionTimeSeriesStore else None
+        self.demand_forecasts: Dict[str, Any] = {}  # Latest DemandForecast per item from recorded consumption
+        self._forecast_lock: Optional[asyncio.Lock] = None  # Created on the serving loop at first use
+        self.last_closed_day: Optional[date] = None  # Latest day whose consumption was fed to the forecasters
+        # ABC (consumption value) / XYZ (demand variability) classes, refreshed every monitoring cycle
+        self.abc_xyz_classifier = ABCXYZClassifier() if ABCXYZClassifier else None
         self.transfers = []  # Track inter-departmental transfers
+        self.transfer_costs: Dict[Tuple[str, str], float] = {}  # Per-unit cost of (from, to) location moves
+        self.procurement_service_level = 0.95  # Cycle service level targeted by recommended orders
         self.is_running = False
         
         # Analytics and ML components
@@ -592,6 +789,12 @@ class ProfessionalSupplyInventoryAgent:
                 "contact": "lab@hospital.com"
             }
         }
+        
+        # Stock leaves central storage on scheduled runs; moves between departments need a dedicated trip
+        self.transfer_costs = {
+            (source, target): 0.5 if self.locations[source]["type"] == "storage" else 1.0
+            for source in self.locations for target in self.locations if source != target
+        }
     
     async def _load_users(self):
         """Load system users with role-based permissions"""
@@ -1000,6 +1203,7 @@ class ProfessionalSupplyInventoryAgent:
         # Initialize demand forecasting
         # Initialize cost optimization
         # Initialize performance analytics
+        await self._update_abc_xyz_classification()
         self.logger.info("Analytics engine initialized")
         
     async def _load_sample_transfers(self):
@@ -1408,41 +1612,32 @@ class ProfessionalSupplyInventoryAgent:
             "stockout_incidents": 2,
             "supplier_performance_avg": 89.5,
             "cost_savings_ytd": 15000.0,
-            "waste_reduction_percentage": 12.3
+            "waste_reduction_percentage": 12.3,
+            "abc_xyz_classes": self._get_classification_summary()
         }
 
     def _get_procurement_recommendations(self):
         """Get procurement recommendations (synchronous version for dashboard)"""
         recommendations = []
         
-        for item in self.inventory.values():
-            if item.is_low_stock:
-                supplier = self.suppliers.get(item.supplier_id)
-                if supplier:
-                    lead_time = supplier.lead_time_days
-                    supplier_name = supplier.name
-                else:
-                    lead_time = 7
-                    supplier_name = 'Unknown Supplier'
-                
-                # Calculate recommended order quantity
-                avg_usage = self._get_average_usage(item.id)
-                safety_stock = avg_usage * lead_time * 1.5  # 50% safety margin
-                order_quantity = max(
-                    item.minimum_threshold * 2,
-                    safety_stock - item.current_quantity
-                )
-                
-                recommendations.append({
-                    'item_id': item.id,
-                    'item_name': item.name,
-                    'current_quantity': item.current_quantity,
-                    'recommended_quantity': int(order_quantity),
-                    'supplier': supplier_name,
-                    'estimated_cost': order_quantity * item.unit_cost,
-                    'urgency': 'high' if item.current_quantity < item.minimum_threshold * 0.5 else 'medium',
-                    'reason': 'Critical low stock level' if item.current_quantity < item.minimum_threshold * 0.5 else 'Approaching minimum threshold'
-                })
+        low_stock = [item for item in self.inventory.values() if item.is_low_stock]
+        for item, plan in zip(low_stock, self._procurement_quantities(low_stock)):
+            supplier = self.suppliers.get(item.supplier_id)
+            supplier_name = supplier.name if supplier else 'Unknown Supplier'
+            order_quantity = plan['order_quantity']
+            
+            recommendations.append({
+                'item_id': item.id,
+                'item_name': item.name,
+                'current_quantity': item.current_quantity,
+                'recommended_quantity': int(order_quantity),
+                'supplier': supplier_name,
+                'estimated_cost': order_quantity * item.unit_cost,
+                'stockout_probability': plan['stockout_probability'],
+                'fill_rate': plan['fill_rate'],
+                'urgency': 'high' if item.current_quantity < item.minimum_threshold * 0.5 else 'medium',
+                'reason': 'Critical low stock level' if item.current_quantity < item.minimum_threshold * 0.5 else 'Approaching minimum threshold'
+            })
         
         return recommendations
     
@@ -1558,7 +1753,9 @@ class ProfessionalSupplyInventoryAgent:
                 await self._check_inventory_levels()
                 await self._check_expiration_dates()
                 await self._analyze_usage_patterns()
+                await self._update_abc_xyz_classification()
                 await self._generate_procurement_recommendations()
+                await self._close_consumption_days()
                 
                 # Wait before next monitoring cycle
                 await asyncio.sleep(30)  # Check every 30 seconds for more frequent updates
@@ -1626,29 +1823,45 @@ class ProfessionalSupplyInventoryAgent:
     
     async def _analyze_usage_patterns(self):
         """Analyze usage patterns to predict future needs"""
-        # Ensure usage_patterns is properly initialized
-        if not isinstance(self.usage_patterns, dict):
-            self.usage_patterns = {}
+        today = datetime.now().date()
         
-        # Simulate usage pattern analysis
+        # Simulate daily usage data for items without recorded usage today;
+        # the ring buffer drops days older than its window on its own
         for item_id in self.inventory:
-            if item_id not in self.usage_patterns:
-                self.usage_patterns[item_id] = []
-            
-            # Ensure it's a list
-            if not isinstance(self.usage_patterns[item_id], list):
-                self.usage_patterns[item_id] = []
-            
-            # Simulate daily usage data
-            usage = self._simulate_usage(item_id)
-            self.usage_patterns[item_id].append({
-                'date': datetime.now().date(),
-                'usage': usage
-            })
-            
-            # Keep only last 30 days
-            if len(self.usage_patterns[item_id]) > 30:
-                self.usage_patterns[item_id] = self.usage_patterns[item_id][-30:]
+            buffer = self.usage_patterns.buffer(item_id)
+            if not buffer.covers(today):
+                buffer.set(today, self._simulate_usage(item_id))
+    
+    async def _update_abc_xyz_classification(self):
+        """Reclassify the whole catalogue by consumption value (ABC) and demand variability (XYZ)"""
+        if self.abc_xyz_classifier is None or not self.inventory:
+            return
+        import numpy as np
+        
+        # Running usage stats per item in one matrix; items without history fall back
+        # to their nominal daily consumption, and variability needs a week of history
+        item_ids, stats = self.usage_patterns.stats_matrix(list(self.inventory))
+        nominal = np.array([self.inventory[item_id].daily_consumption for item_id in item_ids], dtype=float)
+        mean_usage = np.where(stats[:, 0] > 0, stats[:, 1], nominal)
+        variance = np.where(stats[:, 0] >= 7, stats[:, 2], np.nan)
+        unit_cost = np.array([self.inventory[item_id].unit_cost for item_id in item_ids], dtype=float)
+        
+        result = self.abc_xyz_classifier.classify(item_ids, mean_usage, variance, unit_cost)
+        if not result.changed:
+            return
+        
+        positions = {item_id: i for i, item_id in enumerate(result.item_ids)}
+        for item_id in result.changed:
+            item = self.inventory[item_id]
+            item.abc_classification = str(result.abc[positions[item_id]])
+            item.xyz_classification = str(result.xyz[positions[item_id]])
+        self.logger.info(f"ABC-XYZ classification updated for {len(result.changed)} items")
+    
+    def _get_classification_summary(self) -> Dict[str, Any]:
+        """Class-level ABC-XYZ statistics for analytics"""
+        if self.abc_xyz_classifier is None:
+            return {"classified_items": 0, "abc": {}, "xyz": {}, "matrix": {}, "available": False}
+        return {**self.abc_xyz_classifier.class_stats(), "available": True}
     
     def _simulate_usage(self, item_id: str) -> int:
         """Simulate daily usage for demo purposes"""
@@ -1670,38 +1883,80 @@ class ProfessionalSupplyInventoryAgent:
         """Generate procurement recommendations based on current state"""
         recommendations = []
         
-        for item in self.inventory.values():
-            if item.is_low_stock:
-                supplier = self.suppliers.get(item.supplier_id)
-                lead_time = supplier.lead_time_days if supplier else 7
-                
-                # Calculate recommended order quantity
-                avg_usage = self._get_average_usage(item.id)
-                safety_stock = avg_usage * lead_time * 1.5  # 50% safety margin
-                order_quantity = max(
-                    item.minimum_threshold * 2,
-                    safety_stock - item.current_quantity
-                )
-                
-                recommendations.append({
-                    'item_id': item.id,
-                    'item_name': item.name,
-                    'current_quantity': item.current_quantity,
-                    'recommended_order': int(order_quantity),
-                    'supplier': supplier.name if supplier else 'Unknown',
-                    'estimated_cost': order_quantity * item.unit_cost,
-                    'urgency': 'HIGH' if item.current_quantity < item.minimum_threshold * 0.5 else 'MEDIUM'
-                })
+        low_stock = [item for item in self.inventory.values() if item.is_low_stock]
+        for item, plan in zip(low_stock, self._procurement_quantities(low_stock)):
+            supplier = self.suppliers.get(item.supplier_id)
+            order_quantity = plan['order_quantity']
+            
+            recommendations.append({
+                'item_id': item.id,
+                'item_name': item.name,
+                'current_quantity': item.current_quantity,
+                'recommended_order': int(order_quantity),
+                'supplier': supplier.name if supplier else 'Unknown',
+                'estimated_cost': order_quantity * item.unit_cost,
+                'stockout_probability': plan['stockout_probability'],
+                'fill_rate': plan['fill_rate'],
+                'urgency': 'HIGH' if item.current_quantity < item.minimum_threshold * 0.5 else 'MEDIUM'
+            })
         
         return recommendations
     
+    def _procurement_quantities(self, items: List[SupplyItem]) -> List[Dict[str, Any]]:
+        """
+        Recommended order quantity per item, covering lead-time demand plus safety stock.
+        
+        With a week of usage history the safety stock targets procurement_service_level
+        under normal lead-time demand, and the stockout probability and fill rate of
+        the cycle an order placed now closes come with it; otherwise a 50% margin on
+        lead-time demand is used.
+        """
+        lead_times = []
+        for item in items:
+            supplier = self.suppliers.get(item.supplier_id)
+            lead_times.append(supplier.lead_time_days if supplier else 7)
+        avg_usage = [self._get_average_usage(item.id) for item in items]
+        
+        if safety_stock_for_service_level is None or not items:
+            return [
+                {
+                    'order_quantity': max(item.minimum_threshold * 2, usage * lead_time * 1.5 - item.current_quantity),
+                    'stockout_probability': None,
+                    'fill_rate': None
+                }
+                for item, usage, lead_time in zip(items, avg_usage, lead_times)
+            ]
+        import numpy as np
+        
+        # All items in one pass through the shared service-level kernels
+        _, stats = self.usage_patterns.stats_matrix([item.id for item in items])
+        has_spread = stats[:, 0] >= 7
+        demand_std = np.sqrt(stats[:, 2])
+        lead_time = np.array(lead_times, dtype=float)
+        current = np.array([item.current_quantity for item in items], dtype=float)
+        minimum = np.array([item.minimum_threshold for item in items], dtype=float)
+        lead_time_demand = np.array(avg_usage, dtype=float) * lead_time
+        
+        safety_stock = np.where(has_spread,
+                                np.maximum(safety_stock_for_service_level(self.procurement_service_level, demand_std, lead_time), 0.0),
+                                lead_time_demand * 0.5)
+        order_quantity = np.maximum(minimum * 2, lead_time_demand + safety_stock - current)
+        # Ordering now, current stock is the reorder point of this replenishment cycle
+        risk = stockout_probability(current - lead_time_demand, demand_std, lead_time)
+        rate = fill_rate(current - lead_time_demand, order_quantity, demand_std, lead_time)
+        
+        return [
+            {
+                'order_quantity': float(order_quantity[i]),
+                'stockout_probability': round(float(risk[i]), 4) if has_spread[i] else None,
+                'fill_rate': round(float(rate[i]), 4) if has_spread[i] else None
+            }
+            for i in range(len(items))
+        ]
+    
     def _get_average_usage(self, item_id: str) -> float:
         """Calculate average daily usage for an item"""
-        if item_id not in self.usage_patterns or not self.usage_patterns[item_id]:
-            return 5.0  # Default assumption
-        
-        usages = [day['usage'] for day in self.usage_patterns[item_id]]
-        return sum(usages) / len(usages)
+        return self.usage_patterns.average(item_id, default=5.0)  # Default assumption without history
     
     async def _add_alert(self, alert: SupplyAlert):
         """Add a new alert if it doesn't already exist"""
@@ -1742,21 +1997,131 @@ class ProfessionalSupplyInventoryAgent:
             
             # Log usage if it's a consumption
             if quantity_change < 0:
-                # Ensure usage_patterns is properly initialized
-                if not isinstance(self.usage_patterns, dict):
-                    self.usage_patterns = {}
-                
-                if item_id not in self.usage_patterns:
-                    self.usage_patterns[item_id] = []
-                
-                # Ensure it's a list
-                if not isinstance(self.usage_patterns[item_id], list):
-                    self.usage_patterns[item_id] = []
-                
-                self.usage_patterns[item_id].append({
-                    'date': datetime.now().date(),
-                    'usage': abs(quantity_change)
-                })
+                self._record_consumption(item_id, location_id, abs(quantity_change))
+    
+    def _record_consumption(self, item_id: str, location_id: str, quantity: int):
+        """Log consumed units in the daily usage buffer and the consumption time-series store"""
+        self.usage_patterns.record(item_id, quantity)
+        if self.consumption_store is not None:
+            self.consumption_store.record(item_id, location_id, quantity)
+    
+    def _daily_consumption(self, day: date) -> Dict[str, float]:
+        """Total consumption per item on one day, for items that had observed that day"""
+        if self.consumption_store is not None:
+            item_ids, _, matrix = self.consumption_store.daily_matrix(list(self.inventory), day, day + timedelta(days=1))
+            return {item_id: float(value) for item_id, value in zip(item_ids, matrix[:, 0].tolist()) if value == value}
+        return {
+            item_id: buffer.values[day.toordinal() % buffer.window]
+            for item_id, buffer in self.usage_patterns.buffers.items() if buffer.covers(day)
+        }
+    
+    async def _close_consumption_days(self):
+        """
+        Once a day has ended, hand its consumption totals to the forecasting modules
+        (one daily observation per item); each day is closed exactly once
+        """
+        yesterday = datetime.now().date() - timedelta(days=1)
+        if self.last_closed_day is None:
+            self.last_closed_day = yesterday  # Days before the agent started are not replayed
+            return
+        if self.last_closed_day >= yesterday:
+            return
+        while self.last_closed_day < yesterday:
+            day = self.last_closed_day + timedelta(days=1)
+            totals = self._daily_consumption(day)
+            self._publish_daily_observations(day, totals)
+            await self._advance_forecast_states(totals)
+            self.last_closed_day = day
+            self.logger.info(f"Closed consumption day {day.isoformat()} for {len(totals)} items")
+        await self._refresh_demand_forecasts()
+    
+    def _publish_daily_observations(self, day: date, totals: Dict[str, float]):
+        """Feed a closed day's totals to the online feature store of the predictive analytics engine"""
+        if predictive_analytics is None:
+            return
+        for item_id, demand in totals.items():
+            item = self.inventory.get(item_id)
+            if item is None:
+                continue
+            supplier = self.suppliers.get(item.supplier_id)
+            predictive_analytics.record_observation(item_id, {
+                'date': datetime.combine(day, datetime.min.time()),
+                'item_name': item.name,
+                'demand': demand,
+                'stock_level': item.current_quantity,
+                'procurement_cost': round(demand * item.unit_cost, 2),
+                'supplier_lead_time': supplier.lead_time_days if supplier else 7
+            })
+    
+    def _forecast_guard(self) -> asyncio.Lock:
+        """
+        Lock serializing forecast state changes on the agent's event loop; the loop
+        never blocks on it, and the fits it guards run on executor threads
+        """
+        if self._forecast_lock is None:
+            self._forecast_lock = asyncio.Lock()
+        return self._forecast_lock
+    
+    async def _advance_forecast_states(self, totals: Dict[str, float]):
+        """Fold a closed day's totals into the persisted forecast state of every fitted item"""
+        if demand_forecasting is None:
+            return
+        async with self._forecast_guard():
+            due = demand_forecasting.update_item_states(totals)
+        if due:
+            self.logger.info(f"{len(due)} items are due for a forecast refit")
+    
+    async def _refresh_demand_forecasts(self, forecast_days: int = 30):
+        """
+        Re-project demand_forecasts from the persisted forecast states, first refitting
+        the items past their refit interval on the closed days of the store's history
+        """
+        if demand_forecasting is None or not len(demand_forecasting.state_store):
+            return
+        async with self._forecast_guard():
+            due = demand_forecasting.state_store.due_for_refit()
+            history = self.consumption_history(due) if due else None  # Read on the loop that records
+            forecasts = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: demand_forecasting.refresh_forecasts(forecast_days=forecast_days, historical_data=history))
+        self.demand_forecasts.update(forecasts)
+    
+    def consumption_history(self, item_ids: Optional[List[str]] = None, days: int = 365):
+        """
+        Daily consumption (item_id, date, demand) from the time-series store, from each
+        item's first recorded day through the last closed day (yesterday before any is
+        closed); the running day is left out so forecast states never fold it in twice
+        """
+        if self.consumption_store is None:
+            return None
+        last_day = self.last_closed_day or datetime.now().date() - timedelta(days=1)
+        return self.consumption_store.history_frame(item_ids, days, datetime.combine(last_day, datetime.min.time()))
+    
+    async def forecast_catalogue_demand(self, item_ids: Optional[List[str]] = None, forecast_days: int = 30,
+                                        history_days: int = 365, backtest: bool = False) -> Dict[str, Any]:
+        """
+        Demand forecasts for every item with recorded consumption (or just item_ids) in
+        one forecast_many pass over the store's daily history; kept in demand_forecasts.
+        With backtest, per-item ensemble weights and out-of-sample accuracy are first
+        relearned from the same history (backtest_many).
+        Must be awaited on the agent's event loop: the history is snapshotted there and
+        only the fits run on an executor thread.
+        """
+        if demand_forecasting is None:
+            return {}
+        async with self._forecast_guard():
+            history = self.consumption_history(item_ids, history_days)
+            if history is None or history.empty:
+                return {}
+            forecasts = await asyncio.get_running_loop().run_in_executor(
+                None, self._fit_catalogue, history, forecast_days, backtest)
+        self.demand_forecasts.update(forecasts)
+        return forecasts
+    
+    @staticmethod
+    def _fit_catalogue(history, forecast_days: int, backtest: bool) -> Dict[str, Any]:
+        if backtest:
+            demand_forecasting.batch_backtest(None, history)
+        return demand_forecasting.batch_forecast(None, history, forecast_days)
     
     async def get_dashboard_data(self) -> Dict[str, Any]:
         """Get current dashboard data"""
@@ -1848,6 +2213,7 @@ class ProfessionalSupplyInventoryAgent:
                     for location_id, location_stock in item.locations.items():
                         if location_stock.current_quantity >= consumption:
                             location_stock.current_quantity -= consumption
+                            self._record_consumption(item_id, location_id, consumption)
                             self.logger.info(f"Consumed {consumption} units of {item.name} at {location_id}. New quantity: {location_stock.current_quantity}")
                             break
                     else:
@@ -1860,6 +2226,7 @@ class ProfessionalSupplyInventoryAgent:
                                 consumed_here = min(location_stock.current_quantity, remaining_consumption)
                                 location_stock.current_quantity -= consumed_here
                                 remaining_consumption -= consumed_here
+                                self._record_consumption(item_id, location_id, consumed_here)
                                 self.logger.info(f"Consumed {consumed_here} units of {item.name} at {location_id}. New quantity: {location_stock.current_quantity}")
                     
                     # is_low_stock is automatically calculated as a property
@@ -2046,8 +2413,81 @@ class ProfessionalSupplyInventoryAgent:
         """Get recent transfer history"""
         return self.transfers[-limit:] if self.transfers else []
     
+    def plan_autonomous_transfers(self):
+        """
+        Least-cost transfer plan for every item at once: locations below their minimum
+        threshold are filled from locations with stock to spare (see transfer_planning)
+        """
+        item_ids = list(self.inventory)
+        location_ids = list(dict.fromkeys(
+            location_id for item in self.inventory.values() for location_id in item.locations))
+        available, minimum, capacity, stocked = [], [], [], []
+        for item in self.inventory.values():
+            stocks = [item.locations.get(location_id) for location_id in location_ids]
+            available.append([stock.available_quantity if stock else 0 for stock in stocks])
+            minimum.append([stock.minimum_threshold if stock else 0 for stock in stocks])
+            capacity.append([stock.maximum_capacity if stock else 0 for stock in stocks])
+            stocked.append([stock is not None for stock in stocks])
+        return plan_transfers(item_ids, location_ids, available, minimum, capacity, stocked,
+                              transfer_cost_matrix(location_ids, self.transfer_costs))
+    
+    def apply_transfer_plan(self, plan) -> List[dict]:
+        """
+        Apply every transfer of a plan as one batch. The batch is checked against
+        current stock first and nothing is moved if any source would drop below its
+        minimum threshold.
+        """
+        moves = plan.transfers()
+        outgoing: Dict[Tuple[str, str], int] = {}
+        for move in moves:
+            item = self.inventory.get(move["item_id"])
+            if item is None or move["to_location"] not in item.locations or move["from_location"] not in item.locations:
+                self.logger.warning(f"Transfer plan rejected: unknown item or location in {move}")
+                return []
+            key = (move["item_id"], move["from_location"])
+            outgoing[key] = outgoing.get(key, 0) + move["quantity"]
+        for (item_id, location_id), quantity in outgoing.items():
+            stock = self.inventory[item_id].locations[location_id]
+            if stock.available_quantity - quantity < stock.minimum_threshold:
+                self.logger.warning(f"Transfer plan rejected: {item_id} at {location_id} would drop below minimum")
+                return []
+        
+        now = datetime.now()
+        batch_id = f"TRF-{now.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6].upper()}"
+        executed = []
+        for number, move in enumerate(moves, 1):
+            item = self.inventory[move["item_id"]]
+            item.locations[move["from_location"]].current_quantity -= move["quantity"]
+            item.locations[move["to_location"]].current_quantity += move["quantity"]
+            item.last_updated = now
+            transfer_log = {
+                "transfer_id": f"{batch_id}-{number:03d}",
+                "batch_id": batch_id,
+                "item_id": item.id,
+                "item_name": item.name,
+                "from_department": move["from_location"],
+                "to_department": move["to_location"],
+                "quantity": move["quantity"],
+                "cost": move["cost"],
+                "timestamp": now.isoformat(),
+                "status": "completed"
+            }
+            self.transfers.append(transfer_log)
+            executed.append(transfer_log)
+        
+        if executed:
+            self.logger.info(f"✅ TRANSFER BATCH {batch_id}: {len(executed)} transfers, "
+                             f"{sum(move['quantity'] for move in moves)} units, cost {plan.total_cost:.2f}")
+        return executed
+    
     def check_and_execute_autonomous_transfers(self):
         """Check for low stock and attempt inter-departmental transfers"""
+        if plan_transfers is not None:
+            try:
+                return self.apply_transfer_plan(self.plan_autonomous_transfers())
+            except Exception as e:
+                self.logger.error(f"Transfer planning failed, falling back to item-by-item transfers: {e}")
+        
         transfers_executed = []
         
         # Check each item in inventory for low stock in any location
@@ -0,0 +1,206 @@
+"""
+Autoregressive Model Fitting for Demand Forecasting
+
+This module implements:
+- Autocorrelation of many series at once via FFT (O(n log n) per series)
+- Yule-Walker AR coefficients through the Levinson-Durbin recursion
+- AIC order selection up to monthly lag orders in the same recursion
+- Recursive multi-step AR forecasts over an (items x days) matrix
+"""
+
+import numpy as np
+from typing import Dict, Any
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MAX_AR_ORDER = 31  # Covers weekly and monthly seasonality in daily demand
+
+def autocovariance_fft(matrix: np.ndarray, max_lag: int) -> np.ndarray:
+    """Biased autocovariances at lags 0..max_lag for every row of a 2-D array"""
+    n_items, n_obs = matrix.shape
+    centered = matrix - matrix.mean(axis=1, keepdims=True)
+
+    # Zero-pad to avoid circular wrap-around
+    n_fft = 1 << int(np.ceil(np.log2(max(2 * n_obs - 1, 1))))
+    spectrum = np.fft.rfft(centered, n=n_fft, axis=1)
+    autocovariance = np.fft.irfft(spectrum * np.conj(spectrum), n=n_fft, axis=1)[:, :max_lag + 1] / n_obs
+
+    if autocovariance.shape[1] < max_lag + 1:
+        autocovariance = np.pad(autocovariance, ((0, 0), (0, max_lag + 1 - autocovariance.shape[1])))
+    return autocovariance
+
+LEVINSON_CHUNK_ROWS = 4096  # Keeps the per-chunk recursion state cache resident
+ORIGIN_CHUNK_ROWS = 1024
+
+def _levinson_chunk(autocovariance: np.ndarray, n_obs, max_order: int) -> Dict[str, np.ndarray]:
+    """Levinson-Durbin with AIC selection for one block of rows, in lag-major layout"""
+    lagged = np.ascontiguousarray(autocovariance.T)          # (lags, rows)
+    n_rows = lagged.shape[1]
+    degenerate = lagged[0] <= 1e-12  # Constant series
+    variance = lagged[0].copy()
+
+    phi = np.zeros((max_order, n_rows))
+    best_phi = np.zeros((max_order, n_rows))
+    best_order = np.ones(n_rows, dtype=int)
+    best_variance = variance.copy()
+    best_aic = np.full(n_rows, np.inf)
+
+    for m in range(1, max_order + 1):
+        previous = phi[:m - 1]
+        numerator = lagged[m] - (previous * lagged[m - 1:0:-1]).sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reflection = np.where(variance > 0, numerator / variance, 0.0)
+        reflection = np.clip(np.nan_to_num(reflection), -0.9999, 0.9999)
+        reflection[degenerate] = 0.0
+
+        if m > 1:
+            phi[:m - 1] = previous - reflection * previous[::-1]
+        phi[m - 1] = reflection
+        variance = variance * (1 - reflection * reflection)
+
+        aic = n_obs * np.log(np.maximum(variance, 1e-300)) + 2 * m
+        improved = aic < best_aic
+        best_aic = np.where(improved, aic, best_aic)
+        best_order = np.where(improved, m, best_order)
+        best_variance = np.where(improved, variance, best_variance)
+        best_phi[:m] = np.where(improved, phi[:m], best_phi[:m])
+
+    best_order[degenerate] = 1
+    best_phi[:, degenerate] = 0.0
+    return {'order': best_order, 'coefficients': best_phi.T, 'variance': best_variance, 'aic': best_aic}
+
+def levinson_durbin_aic(autocovariance: np.ndarray, n_obs, max_order: int) -> Dict[str, np.ndarray]:
+    """
+    Yule-Walker fits of orders 1..max_order for every row, keeping the AIC-best order.
+
+    n_obs is the series length (scalar or per row). Returns the selected order per
+    row, its coefficients (lag 1 first, zero-padded to max_order) and its
+    innovation variance.
+    """
+    n_items = autocovariance.shape[0]
+    n_obs = np.broadcast_to(np.asarray(n_obs, dtype=float), (n_items,))
+    chunks = [
+        _levinson_chunk(autocovariance[start:start + LEVINSON_CHUNK_ROWS],
+                        n_obs[start:start + LEVINSON_CHUNK_ROWS], max_order)
+        for start in range(0, n_items, LEVINSON_CHUNK_ROWS)
+    ]
+    if len(chunks) == 1:
+        return chunks[0]
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+def fit_ar_matrix(matrix: np.ndarray, max_order: int = MAX_AR_ORDER) -> Dict[str, Any]:
+    """Fit AR models to every row with FFT autocorrelation and Levinson-Durbin"""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=float))
+    n_items, n_obs = matrix.shape
+    max_order = max(1, min(max_order, n_obs // 4))
+
+    autocovariance = autocovariance_fft(matrix, max_order)
+    fit = levinson_durbin_aic(autocovariance, n_obs, max_order)
+    fit['mean'] = matrix.mean(axis=1)
+    fit['autocorrelation'] = np.divide(autocovariance, autocovariance[:, :1],
+                                       out=np.zeros_like(autocovariance), where=autocovariance[:, :1] > 0)
+
+    # In-sample one-step residuals, items grouped by selected order
+    residual_std = np.empty(n_items)
+    residual_mean = np.zeros(n_items)
+    residual_count = np.zeros(n_items, dtype=int)
+    centered = matrix - fit['mean'][:, None]
+    for order in np.unique(fit['order']):
+        rows = np.flatnonzero(fit['order'] == order)
+        if n_obs <= order:
+            residual_std[rows] = matrix[rows].std(axis=1) * 0.1
+            continue
+        # Lagged windows hold oldest value first, so coefficients are applied reversed
+        windows = np.lib.stride_tricks.sliding_window_view(centered[rows], order, axis=1)[:, :n_obs - order]
+        predicted = windows @ fit['coefficients'][rows, :order, None][:, ::-1]
+        residuals = centered[rows, order:] - predicted[..., 0]
+        residual_std[rows] = residuals.std(axis=1)
+        residual_mean[rows] = residuals.mean(axis=1)
+        residual_count[rows] = n_obs - order
+    fit['residual_std'] = residual_std
+    fit['residual_mean'] = residual_mean
+    fit['residual_count'] = residual_count
+    return fit
+
+def autocovariance_at_origins(matrix: np.ndarray, origins: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    Biased autocovariances of every prefix matrix[:, :o], for each origin o.
+
+    Sums of lagged products are accumulated block by block between origins, so
+    each lag costs one pass over the data for all origins together.
+    Returns (items, origins, max_lag + 1).
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=float))
+    n_items = matrix.shape[0]
+    origins = np.asarray(origins)
+    if n_items > ORIGIN_CHUNK_ROWS:
+        return np.concatenate([
+            autocovariance_at_origins(matrix[start:start + ORIGIN_CHUNK_ROWS], origins, max_lag)
+            for start in range(0, n_items, ORIGIN_CHUNK_ROWS)
+        ])
+
+    def _prefix_sums(values: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        # Sum over t < end for increasing ends (each >= 1): block sums, then cumulative
+        blocks = np.add.reduceat(values[:, :ends[-1]], np.concatenate([[0], ends[:-1]]), axis=1)
+        return np.cumsum(blocks, axis=1)
+
+    # Autocovariance is shift invariant; centering keeps the running sums well conditioned
+    shifted = matrix - matrix[:, :origins.min()].mean(axis=1, keepdims=True)
+    origin_sums = _prefix_sums(shifted, origins)
+    mean = origin_sums / origins
+
+    autocovariance = np.zeros((n_items, len(origins), max_lag + 1))
+    for lag in range(max_lag + 1):
+        valid = origins > lag
+        if not valid.any():
+            continue
+        o = origins[valid]
+        products = _prefix_sums(shifted[:, :-lag or None] * shifted[:, lag:], o - lag)  # t < o - lag
+        head_sum = _prefix_sums(shifted, o - lag)                                       # t < o - lag
+        tail_sum = origin_sums[:, valid] - shifted[:, :lag].sum(axis=1, keepdims=True)  # lag <= t < o
+        mu = mean[:, valid]
+        autocovariance[:, valid, lag] = (products - mu * (head_sum + tail_sum) + (o - lag) * mu * mu) / o
+    return autocovariance
+
+def ar_forecast_from_tail(tail: np.ndarray, mean: np.ndarray, coefficients: np.ndarray,
+                          order: np.ndarray, steps: int) -> np.ndarray:
+    """
+    Recursive multi-step forecasts from the most recent values of each series.
+
+    tail holds at least max(order) values per row, oldest first; unclipped
+    values feed the next step.
+    """
+    forecasts = np.empty((len(tail), steps))
+    for p in np.unique(order):
+        rows = np.flatnonzero(order == p)
+        window = tail[rows, tail.shape[1] - p:] - mean[rows, None]
+        reversed_coefficients = coefficients[rows, :p][:, ::-1]
+        for h in range(steps):
+            next_value = (reversed_coefficients * window).sum(axis=1)
+            forecasts[rows, h] = next_value + mean[rows]
+            window = np.concatenate([window[:, 1:], next_value[:, None]], axis=1)
+    return forecasts
+
+def ar_forecast_matrix(matrix: np.ndarray, fit: Dict[str, Any], steps: int) -> np.ndarray:
+    """Recursive multi-step forecasts continuing every row of the matrix"""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=float))
+    max_order = int(fit['order'].max())
+    tail = matrix[:, -max_order:]
+    if tail.shape[1] < max_order:
+        # Missing history before the first day is treated as the mean
+        padding = np.repeat(fit['mean'][:, None], max_order - tail.shape[1], axis=1)
+        tail = np.concatenate([padding, tail], axis=1)
+    return ar_forecast_from_tail(tail, fit['mean'], fit['coefficients'], fit['order'], steps)
+
+# Export main components
+__all__ = [
+    'MAX_AR_ORDER',
+    'autocovariance_fft',
+    'levinson_durbin_aic',
+    'fit_ar_matrix',
+    'autocovariance_at_origins',
+    'ar_forecast_from_tail',
+    'ar_forecast_matrix'
+]
@@ -0,0 +1,173 @@
+"""
+Rolling-Origin Backtesting for Demand Forecasting
+
+This module implements:
+- Forecasts from many rolling origins per item without refitting per origin
+  (Holt-Winters state snapshots, AR fits from cumulative lagged products)
+- Actuals read through strided window views instead of per-origin copies
+- Out-of-sample MAPE / RMSE / MAE per item and method
+- Per-item ensemble weights learned from backtest errors
+- Ensemble scored on held-out origins, each weighted only by earlier origins
+- Optional process pool over item chunks for full-catalogue runs
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Any, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+import logging
+from holt_winters import fit_holt_winters, holt_winters_snapshot_forecasts, season_length_for
+from autoregression import MAX_AR_ORDER, autocovariance_at_origins, levinson_durbin_aic, ar_forecast_from_tail
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+BACKTEST_METHODS = ('arima', 'exp_smooth')
+
+def rolling_origins(n_obs: int, horizon: int, stride: int = 7, min_train: Optional[int] = None,
+                    max_origins: int = 26) -> np.ndarray:
+    """Most recent forecast origins, `stride` days apart, each followed by a full horizon"""
+    min_train = min_train or max(28, n_obs // 3)
+    last_origin = n_obs - horizon
+    if last_origin < min_train:
+        return np.zeros(0, dtype=int)
+    origins = np.arange(last_origin, min_train - 1, -stride)[:max_origins]
+    return origins[::-1].copy()
+
+def error_metrics(actuals: np.ndarray, forecasts: np.ndarray) -> Dict[str, np.ndarray]:
+    """MAPE (over non-zero actuals), RMSE and MAE per item across origins and horizons"""
+    n_items = actuals.shape[0]
+    actuals = actuals.reshape(n_items, -1)
+    errors = forecasts.reshape(n_items, -1) - actuals
+
+    nonzero = actuals != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage = np.where(nonzero, np.abs(errors) / np.abs(actuals), 0.0)
+        mape = percentage.sum(axis=1) / nonzero.sum(axis=1) * 100
+    mape[nonzero.sum(axis=1) == 0] = np.nan
+
+    return {
+        'mape': mape,
+        'rmse': np.sqrt((errors * errors).mean(axis=1)),
+        'mae': np.abs(errors).mean(axis=1)
+    }
+
+def inverse_mse_weights(rmse: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Per-item combination weights proportional to 1 / MSE of each method"""
+    inverse = {method: 1.0 / np.maximum(values * values, 1e-9) for method, values in rmse.items()}
+    total = sum(inverse.values())
+    return {method: values / total for method, values in inverse.items()}
+
+def held_out_ensemble(actuals: np.ndarray, forecasts: Dict[str, np.ndarray]) -> Tuple[np.ndarray, bool]:
+    """
+    Ensemble forecasts from every origin but the first, each combined with inverse-MSE
+    weights learned from the origins before it (an expanding window), so scoring them
+    is out of sample. With a single origin there is nothing earlier to learn from, and
+    its in-sample ensemble is returned instead; the flag tells which one it is.
+    """
+    n_origins = actuals.shape[1]
+    if n_origins < 2:
+        rmse = {method: np.sqrt(((forecasts[method] - actuals) ** 2).mean(axis=(1, 2))) for method in BACKTEST_METHODS}
+        weights = inverse_mse_weights(rmse)
+        return sum(weights[method][:, None, None] * forecasts[method] for method in BACKTEST_METHODS), True
+
+    # MSE of each method over the origins before each held-out origin, from running sums
+    counts = np.arange(1, n_origins)
+    prior_rmse = {
+        method: np.sqrt(np.cumsum(((forecasts[method] - actuals) ** 2).mean(axis=2), axis=1)[:, :-1] / counts)
+        for method in BACKTEST_METHODS
+    }
+    weights = inverse_mse_weights(prior_rmse)                     # (items, origins - 1)
+    ensemble = sum(weights[method][:, :, None] * forecasts[method][:, 1:] for method in BACKTEST_METHODS)
+    return ensemble, False
+
+def backtest_matrix(demand_matrix: np.ndarray, horizon: int = 14, stride: int = 7,
+                    min_train: Optional[int] = None, max_origins: int = 26,
+                    max_ar_order: int = MAX_AR_ORDER) -> Dict[str, Any]:
+    """
+    Backtest AR and Holt-Winters from rolling origins for every row of an (items x days) matrix.
+
+    Each model only sees days before its origin. Returns the origins, per-method
+    error metrics, ensemble weights learned from all origins, and the ensemble's
+    metrics on held-out origins (in sample only when there is a single origin).
+    """
+    demand_matrix = np.atleast_2d(np.asarray(demand_matrix, dtype=float))
+    n_items, n_obs = demand_matrix.shape
+    origins = rolling_origins(n_obs, horizon, stride, min_train, max_origins)
+    if len(origins) == 0:
+        raise ValueError(f"Series of {n_obs} days are too short to backtest a {horizon}-day horizon")
+
+    first_origin = int(origins[0])
+
+    # Actuals after each origin: a strided window view, indexed once
+    windows = np.lib.stride_tricks.sliding_window_view(demand_matrix, horizon, axis=1)
+    actuals = windows[:, origins]                                   # (items, origins, horizon)
+
+    # Holt-Winters: one recursion, state snapshots at every origin
+    state = fit_holt_winters(demand_matrix, season_length=season_length_for(first_origin),
+                             init_length=first_origin, snapshot_at=origins)
+    forecasts = {'exp_smooth': holt_winters_snapshot_forecasts(state, horizon)}
+
+    # AR: Yule-Walker fits of every prefix at once, then recursive forecasts from each origin
+    max_order = max(1, min(max_ar_order, first_origin // 4))
+    autocovariance = autocovariance_at_origins(demand_matrix, origins, max_order)
+    fit = levinson_durbin_aic(autocovariance.reshape(-1, max_order + 1),
+                              np.tile(origins, n_items), max_order)
+    prefix = np.concatenate([np.zeros((n_items, 1)), np.cumsum(demand_matrix, axis=1)], axis=1)
+    means = (prefix[:, origins] / origins).reshape(-1)
+    tails = np.lib.stride_tricks.sliding_window_view(demand_matrix, max_order, axis=1)[:, origins - max_order]
+    ar_forecasts = ar_forecast_from_tail(tails.reshape(-1, max_order), means, fit['coefficients'],
+                                         fit['order'], horizon)
+    forecasts['arima'] = np.maximum(0, ar_forecasts).reshape(n_items, len(origins), horizon)
+
+    metrics = {method: error_metrics(actuals, forecasts[method]) for method in BACKTEST_METHODS}
+    weights = inverse_mse_weights({method: metrics[method]['rmse'] for method in BACKTEST_METHODS})
+    ensemble, in_sample = held_out_ensemble(actuals, forecasts)
+    metrics['ensemble'] = error_metrics(actuals[:, -ensemble.shape[1]:], ensemble)
+
+    return {
+        'origins': origins,
+        'horizon': horizon,
+        'metrics': metrics,
+        'weights': weights,
+        'ensemble_in_sample': in_sample
+    }
+
+def _merge_backtests(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = {'origins': results[0]['origins'], 'horizon': results[0]['horizon'], 'metrics': {}, 'weights': {},
+              'ensemble_in_sample': results[0]['ensemble_in_sample']}
+    for method in results[0]['metrics']:
+        merged['metrics'][method] = {
+            name: np.concatenate([result['metrics'][method][name] for result in results])
+            for name in results[0]['metrics'][method]
+        }
+    for method in results[0]['weights']:
+        merged['weights'][method] = np.concatenate([result['weights'][method] for result in results])
+    return merged
+
+def backtest_matrix_parallel(demand_matrix: np.ndarray, n_jobs: Optional[int] = None,
+                             chunk_size: int = 2000, **kwargs) -> Dict[str, Any]:
+    """Backtest in item chunks across a process pool (n_jobs=None uses every core)"""
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs <= 1 or len(demand_matrix) <= chunk_size:
+        return backtest_matrix(demand_matrix, **kwargs)
+
+    chunks = [demand_matrix[start:start + chunk_size] for start in range(0, len(demand_matrix), chunk_size)]
+    logger.info(f"Backtesting {len(demand_matrix)} series in {len(chunks)} chunks on {n_jobs} processes")
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        results = list(executor.map(_backtest_chunk, chunks, [kwargs] * len(chunks)))
+    return _merge_backtests(results)
+
+def _backtest_chunk(chunk: np.ndarray, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return backtest_matrix(chunk, **kwargs)
+
+# Export main components
+__all__ = [
+    'BACKTEST_METHODS',
+    'rolling_origins',
+    'error_metrics',
+    'inverse_mse_weights',
+    'held_out_ensemble',
+    'backtest_matrix',
+    'backtest_matrix_parallel'
+]
@@ -0,0 +1,312 @@
+"""
+Multi-Resolution Consumption Time-Series Store
+
+This module implements:
+- Per-item, per-location consumption series rolled up on ingest into
+  minute, hour and day buckets (no raw events kept in memory)
+- Ring buffers per resolution with independent retention, built from
+  pooled fixed-size blocks allocated as a series' events reach them
+- Range queries returning NumPy arrays, per location or summed per item
+- Whole-catalogue daily matrices and long-format history frames for the
+  forecasting modules, with days before a series' first event missing
+  rather than zero consumption
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Any, Tuple, Sequence
+from datetime import datetime
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = {'minute': 60, 'hour': 3600, 'day': 86400}  # Bucket width in seconds
+DEFAULT_RETENTION = {
+    'minute': 6 * 60,    # 6 hours
+    'hour': 14 * 24,     # 2 weeks
+    'day': 5 * 366       # 5 years
+}
+
+EPOCH = datetime(1970, 1, 1)
+NO_BUCKET = np.iinfo(np.int64).max  # First bucket of a series without events
+BLOCK_SLOTS = 32  # Buckets per pooled ring-buffer block
+COUNT_MAX = np.iinfo(np.uint16).max
+
+def _epoch_seconds(timestamps) -> np.ndarray:
+    """Seconds since 1970-01-01 for naive timestamps, read as wall-clock time"""
+    return np.asarray(timestamps, dtype='datetime64[s]').astype(np.int64)
+
+def _sum_present(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    """Sum over series ignoring missing (NaN) buckets; NaN where every series is missing"""
+    missing = np.isnan(values).all(axis=axis)
+    return np.where(missing, np.nan, np.nansum(values, axis=axis))
+
+class _ResolutionTier:
+    """
+    Ring buffers of bucket totals and event counts at one resolution, one row per series.
+    Each ring is split into blocks of BLOCK_SLOTS buckets taken from a shared pool when the
+    first event lands in them, so a series only holds memory for the spans it has data in;
+    block 0 is a shared all-zero block standing in for every unallocated one.
+    Totals are float32: exact for whole-unit consumption up to 2**24 units per bucket.
+    Counts are uint16 and saturate at 65535 events per bucket.
+    """
+
+    def __init__(self, width: int, retention: int, capacity: int):
+        self.width = width
+        self.retention = retention
+        self.block = min(BLOCK_SLOTS, retention)
+        # Pool block holding each ring block of each series, 0 when unallocated
+        self.blocks = np.zeros((capacity, -(-retention // self.block)), dtype=np.int32)
+        self.sums = np.zeros((1, self.block), dtype=np.float32)
+        self.counts = np.zeros((1, self.block), dtype=np.uint16)
+        self._free: List[int] = []
+        self.head = np.full(capacity, -1, dtype=np.int64)  # Latest bucket per series, -1 when empty
+        self.first = np.full(capacity, NO_BUCKET, dtype=np.int64)  # Earliest bucket with an event
+
+    @property
+    def nbytes(self) -> int:
+        return self.blocks.nbytes + self.sums.nbytes + self.counts.nbytes + self.head.nbytes + self.first.nbytes
+
+    def grow(self, capacity: int):
+        n = len(self.head)
+        self.blocks = np.concatenate([self.blocks, np.zeros((capacity - n, self.blocks.shape[1]), dtype=np.int32)])
+        self.head = np.concatenate([self.head, np.full(capacity - n, -1, dtype=np.int64)])
+        self.first = np.concatenate([self.first, np.full(capacity - n, NO_BUCKET, dtype=np.int64)])
+
+    def _allocate(self, n: int) -> np.ndarray:
+        """Take n zeroed blocks from the pool, doubling it when the free list runs out"""
+        if n > len(self._free):
+            size = len(self.sums)
+            pad = max(size, n - len(self._free), 64)
+            self.sums = np.concatenate([self.sums, np.zeros((pad, self.block), dtype=np.float32)])
+            self.counts = np.concatenate([self.counts, np.zeros((pad, self.block), dtype=np.uint16)])
+            self._free.extend(range(size + pad - 1, size - 1, -1))
+        ids = self._free[len(self._free) - n:]
+        del self._free[len(self._free) - n:]
+        return np.array(ids, dtype=np.int32)
+
+    def _release(self, row: int):
+        ids = self.blocks[row][self.blocks[row] > 0]
+        if len(ids):
+            self.sums[ids] = 0.0
+            self.counts[ids] = 0
+            self.blocks[row] = 0
+            self._free.extend(ids.tolist())
+
+    def advance(self, row: int, bucket: int):
+        """Move a series' window forward to `bucket`, clearing the slots it reuses"""
+        head = self.head[row]
+        if bucket <= head:
+            return
+        if bucket - head >= self.retention:
+            self._release(row)  # The whole window is reused: its blocks go back to the pool
+        elif head >= 0:
+            slots = (head + 1 + np.arange(bucket - head)) % self.retention
+            ids = self.blocks[row, slots // self.block]
+            self.sums[ids, slots % self.block] = 0.0
+            self.counts[ids, slots % self.block] = 0
+        self.head[row] = bucket
+
+    def put(self, row: int, bucket: int, quantity: float):
+        """Fold one event into a bucket inside the series' window"""
+        chunk, offset = divmod(bucket % self.retention, self.block)
+        block = self.blocks[row, chunk]
+        if block == 0:
+            block = self.blocks[row, chunk] = self._free.pop() if self._free else self._allocate(1)[0]
+        self.sums[block, offset] += quantity
+        if self.counts[block, offset] < COUNT_MAX:
+            self.counts[block, offset] += 1
+        if bucket < self.first[row]:
+            self.first[row] = bucket
+
+    def add(self, rows: np.ndarray, buckets: np.ndarray, quantities: np.ndarray):
+        """Fold events into their buckets; events older than the retention window are dropped"""
+        order = np.lexsort((buckets, rows))
+        rows, buckets, quantities = rows[order], buckets[order], quantities[order]
+        last = np.flatnonzero(np.r_[rows[1:] != rows[:-1], True])
+        for row, bucket in zip(rows[last].tolist(), buckets[last].tolist()):
+            self.advance(row, bucket)
+        keep = buckets > self.head[rows] - self.retention
+        rows, slots = rows[keep], buckets[keep] % self.retention
+        chunks = slots // self.block
+        missing = self.blocks[rows, chunks] == 0
+        if missing.any():
+            pairs = np.unique(rows[missing] * self.blocks.shape[1] + chunks[missing])
+            self.blocks[pairs // self.blocks.shape[1], pairs % self.blocks.shape[1]] = self._allocate(len(pairs))
+        cells = self.blocks[rows, chunks].astype(np.int64) * self.block + slots % self.block
+        np.add.at(self.sums.reshape(-1), cells, quantities[keep].astype(np.float32))
+        cells, events = np.unique(cells, return_counts=True)
+        counts = self.counts.reshape(-1)
+        counts[cells] = np.minimum(counts[cells] + events, COUNT_MAX)
+        np.minimum.at(self.first, rows, buckets[keep])
+        return int((~keep).sum())
+
+    def read(self, rows: np.ndarray, buckets: np.ndarray, counts: bool = False) -> np.ndarray:
+        """
+        (rows x buckets) totals: 0 after a series' latest bucket, NaN before its first
+        event or its retention window (not observed, as opposed to no consumption)
+        """
+        head = self.head[rows][:, None]
+        slots = buckets % self.retention
+        ids = self.blocks[rows[:, None], (slots // self.block)[None, :]]
+        values = (self.counts if counts else self.sums)[ids, (slots % self.block)[None, :]].astype(float)
+        values[buckets[None, :] > head] = 0.0
+        values[(buckets[None, :] <= head - self.retention) | (buckets[None, :] < self.first[rows][:, None])] = np.nan
+        return values
+
+class ConsumptionTimeSeriesStore:
+    """
+    Embedded store of consumption per (item, location) at minute, hour and day resolution
+    """
+
+    def __init__(self, retention: Optional[Dict[str, int]] = None, initial_capacity: int = 64):
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.capacity = initial_capacity
+        self.tiers = {
+            name: _ResolutionTier(width, self.retention[name], initial_capacity)
+            for name, width in RESOLUTIONS.items()
+        }
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self._item_rows: Dict[str, List[int]] = {}
+        self._series: List[Tuple[str, str]] = []
+        self.events = 0
+        self.dropped_events = 0
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @property
+    def item_ids(self) -> List[str]:
+        return list(self._item_rows)
+
+    def series(self) -> List[Tuple[str, str]]:
+        return list(self._series)
+
+    def _row(self, item_id: str, location_id: str) -> int:
+        key = (item_id, location_id)
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._series)
+            if row >= self.capacity:
+                self.capacity *= 2
+                for tier in self.tiers.values():
+                    tier.grow(self.capacity)
+            self._rows[key] = row
+            self._series.append(key)
+            self._item_rows.setdefault(item_id, []).append(row)
+        return row
+
+    def record(self, item_id: str, location_id: str, quantity: float, timestamp: Optional[datetime] = None):
+        """Roll one consumption event into every resolution"""
+        row = self._row(item_id, location_id)
+        seconds = int(((timestamp or datetime.now()) - EPOCH).total_seconds())
+        for tier in self.tiers.values():
+            bucket = seconds // tier.width
+            tier.advance(row, bucket)
+            if bucket > tier.head[row] - tier.retention:
+                tier.put(row, bucket, quantity)
+            elif tier is self.tiers['day']:
+                self.dropped_events += 1  # Counted against the longest-retention tier
+        self.events += 1
+
+    def record_many(self, item_ids: Sequence[str], location_ids: Sequence[str], quantities: Sequence[float],
+                    timestamps: Sequence[Any]):
+        """Roll a batch of consumption events into every resolution"""
+        rows = np.array([self._row(item_id, location_id) for item_id, location_id in zip(item_ids, location_ids)],
+                        dtype=np.int64)
+        seconds = _epoch_seconds(timestamps)
+        quantities = np.asarray(quantities, dtype=float)
+        dropped = 0
+        for tier in self.tiers.values():
+            dropped = tier.add(rows, seconds // tier.width, quantities)
+        self.events += len(rows)
+        self.dropped_events += dropped  # Counted against the longest-retention tier
+
+    def _buckets(self, resolution: str, start, end) -> Tuple[_ResolutionTier, np.ndarray]:
+        if resolution not in self.tiers:
+            raise ValueError(f"Unknown resolution '{resolution}', expected one of {list(self.tiers)}")
+        tier = self.tiers[resolution]
+        first = int(_epoch_seconds(start)) // tier.width
+        last = -(-int(_epoch_seconds(end)) // tier.width)  # Buckets overlapping [start, end)
+        return tier, np.arange(first, max(first, last), dtype=np.int64)
+
+    def query(self, item_id: str, start, end, resolution: str = 'day',
+              location_id: Optional[str] = None, counts: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Consumption of an item over [start, end) at the given resolution.
+
+        Returns bucket start times (datetime64[s]) and totals (event counts when
+        counts=True), summed over locations unless location_id is given. Buckets
+        before the first event or older than the resolution's retention are NaN.
+        """
+        tier, buckets = self._buckets(resolution, start, end)
+        if location_id is not None:
+            row = self._rows.get((item_id, location_id))
+            rows = [] if row is None else [row]
+        else:
+            rows = self._item_rows.get(item_id, [])
+        values = _sum_present(tier.read(np.array(rows, dtype=np.int64), buckets, counts)) if rows \
+            else np.full(len(buckets), np.nan)
+        return (buckets * tier.width).astype('datetime64[s]'), values
+
+    def daily_matrix(self, item_ids: Optional[List[str]], start, end) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        (items x days) daily consumption summed over locations, with the day dates.
+        Days no location of an item has observed yet (or still retains) are NaN.
+        """
+        item_ids = self.item_ids if item_ids is None else list(item_ids)
+        tier, buckets = self._buckets('day', start, end)
+        matrix = np.full((len(item_ids), len(buckets)), np.nan)
+        positions = {item_id: i for i, item_id in enumerate(item_ids)}
+        series_rows = [row for row, (item_id, _) in enumerate(self._series) if item_id in positions]
+        if series_rows:
+            # One read of the items' series, grouped by item; items with several locations are summed
+            targets = np.array([positions[self._series[row][0]] for row in series_rows], dtype=np.int64)
+            order = np.argsort(targets, kind='stable')
+            targets = targets[order]
+            values = tier.read(np.array(series_rows, dtype=np.int64)[order], buckets)
+            starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+            if len(starts) < len(targets):
+                observed = np.logical_or.reduceat(~np.isnan(values), starts, axis=0)
+                values = np.where(observed, np.add.reduceat(np.nan_to_num(values), starts, axis=0), np.nan)
+            matrix[targets[starts]] = values
+        return item_ids, (buckets * tier.width).astype('datetime64[s]').astype('datetime64[D]'), matrix
+
+    def history_frame(self, item_ids: Optional[List[str]] = None, days: int = 365,
+                      end: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Long-format daily history (item_id, date, demand) for forecast_many / backtest_many.
+
+        Covers the `days` days up to and including the day of `end` (default: now);
+        days before an item's first recorded consumption or outside the daily
+        retention are left out, so short histories are not padded with zero demand.
+        """
+        end_day = np.datetime64(end or datetime.now(), 'D') + 1
+        item_ids, dates, matrix = self.daily_matrix(item_ids, end_day - days, end_day)
+        rows, cols = np.nonzero(~np.isnan(matrix))
+        return pd.DataFrame({
+            'item_id': np.asarray(item_ids, dtype=object)[rows],
+            'date': dates[cols].astype('datetime64[ns]'),
+            'demand': matrix[rows, cols]
+        })
+
+    def memory_bytes(self) -> int:
+        return sum(tier.nbytes for tier in self.tiers.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'series': len(self._series),
+            'items': len(self._item_rows),
+            'events': self.events,
+            'dropped_events': self.dropped_events,
+            'retention': dict(self.retention),
+            'memory_bytes': self.memory_bytes()
+        }
+
+# Export main components
+__all__ = [
+    'ConsumptionTimeSeriesStore',
+    'RESOLUTIONS',
+    'DEFAULT_RETENTION'
+]
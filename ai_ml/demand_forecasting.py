@@ -8,6 +8,7 @@ This module implements multiple forecasting algorithms:
 - Ensemble methods
 """
 
+import asyncio
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple, Any
@@ -15,10 +16,21 @@ from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass
 import json
+from holt_winters import fit_holt_winters, holt_winters_forecast, holt_winters_intervals
+from history_store import ItemHistoryIndex, sort_by_item_date
+from autoregression import fit_ar_matrix, ar_forecast_matrix
+from backtesting import backtest_matrix_parallel, rolling_origins
+from forecast_state import ForecastStateStore
+from inventory_kernels import normal_ppf
+from series_summary import SeriesSummaryCache, decomposition_window, series_fingerprint, period_means_stds, weekly_seasonal_means
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+INTERVAL_LEVEL = 0.95  # Coverage of forecast prediction intervals
+INTERVAL_Z = float(normal_ppf(0.5 + INTERVAL_LEVEL / 2))
+ANONYMOUS_SERIES_PREFIX = "series:"  # Summary keys of series given without an item_id
+
 @dataclass
 class SeasonalPattern:
     pattern_type: str  # 'weekly', 'monthly', 'quarterly'
@@ -44,390 +56,510 @@ class AdvancedDemandForecasting:
     """
     
     def __init__(self):
-        self.seasonal_patterns = {}
         self.trend_models = {}
         self.ensemble_weights = {}
+        self.backtest_metrics = {}
+        self.state_store = ForecastStateStore()
+        self.series_summaries = SeriesSummaryCache()
         logger.info("Advanced Demand Forecasting module initialized")
     
+    @property
+    def seasonal_patterns(self) -> Dict[str, Dict[str, SeasonalPattern]]:
+        """Detected patterns per item, kept on the item's cached series summary (bounded with it)"""
+        return {
+            key: summary.patterns for key, summary in self.series_summaries.items()
+            if summary.patterns is not None and not key.startswith(ANONYMOUS_SERIES_PREFIX)
+        }
+    
     def detect_seasonality(self, time_series: pd.Series, item_id: str) -> Dict[str, SeasonalPattern]:
         """Detect seasonal patterns in demand data"""
         logger.info(f"Detecting seasonality for {item_id}")
         
-        patterns = {}
-        
-        # Weekly seasonality
-        if len(time_series) >= 14:  # At least 2 weeks
-            weekly_data = time_series.groupby(time_series.index.dayofweek).mean()
-            weekly_std = time_series.groupby(time_series.index.dayofweek).std()
-            
-            # Calculate coefficient of variation
-            cv = weekly_std.mean() / weekly_data.mean()
-            
-            if cv > 0.2:  # Significant weekly variation
-                peak_days = weekly_data.nlargest(2).index.tolist()
-                low_days = weekly_data.nsmallest(2).index.tolist()
-                
-                patterns['weekly'] = SeasonalPattern(
-                    pattern_type='weekly',
-                    strength=cv,
-                    peak_periods=peak_days,
-                    low_periods=low_days
-                )
-        
-        # Monthly seasonality
-        if len(time_series) >= 60:  # At least 2 months
-            monthly_data = time_series.groupby(time_series.index.day).mean()
-            monthly_std = time_series.groupby(time_series.index.day).std()
-            
-            cv = monthly_std.mean() / monthly_data.mean()
-            
-            if cv > 0.15:
-                peak_days = monthly_data.nlargest(3).index.tolist()
-                low_days = monthly_data.nsmallest(3).index.tolist()
-                
-                patterns['monthly'] = SeasonalPattern(
-                    pattern_type='monthly',
-                    strength=cv,
-                    peak_periods=peak_days,
-                    low_periods=low_days
-                )
-        
-        self.seasonal_patterns[item_id] = patterns
-        return patterns
+        summary = self.series_summaries.summarize([item_id], time_series.to_numpy(dtype=float)[None, :],
+                                                  time_series.index.values[None, :])
+        return self._seasonal_patterns_matrix([item_id], summary, len(time_series))[0]
     
-    def decompose_time_series(self, time_series: pd.Series) -> Dict[str, np.ndarray]:
+    def decompose_time_series(self, time_series: pd.Series, item_id: Optional[str] = None) -> Dict[str, np.ndarray]:
         """Decompose time series into trend, seasonal, and residual components"""
         logger.info("Decomposing time series")
         
-        # Simple moving average for trend
-        window = min(30, len(time_series) // 4)
-        trend = time_series.rolling(window=window, center=True).mean()
-        
-        # Detrend the series
-        detrended = time_series - trend
-        
-        # Seasonal component (simplified weekly pattern)
-        if len(time_series) >= 14:
-            seasonal = detrended.groupby(detrended.index.dayofweek).transform('mean')
-        else:
-            seasonal = pd.Series(0, index=time_series.index)
+        values = time_series.to_numpy(dtype=float)[None, :]
+        dates = time_series.index.values[None, :]
+        key = item_id if item_id is not None else ANONYMOUS_SERIES_PREFIX + series_fingerprint(values[0], dates[0, 0])
+        summary = self.series_summaries.summarize([key], values, dates)
         
-        # Residual
-        residual = time_series - trend - seasonal
+        # Centered moving average for trend, weekly seasonal means from the memoized summary
+        decomposition = self._decompose_matrix(values, summary['weekdays'],
+                                               weekly_seasonal_means(summary['detrended']))
         
         return {
             'original': time_series.values,
-            'trend': trend.fillna(method='bfill').fillna(method='ffill').values,
-            'seasonal': seasonal.values,
-            'residual': residual.fillna(0).values
+            'trend': decomposition['trend'][0],
+            'seasonal': decomposition['seasonal'][0],
+            'residual': decomposition['residual'][0]
         }
     
     def arima_forecast(self, time_series: pd.Series, steps: int) -> Dict[str, Any]:
         """Simple ARIMA-like forecasting"""
         logger.info(f"Generating ARIMA forecast for {steps} periods")
         
-        # Simple autoregressive model (AR(p))
-        data = time_series.values
-        
-        # Determine lag order (simplified)
-        max_lag = min(7, len(data) // 4)
-        
-        # Calculate autocorrelations for lag selection
-        best_lag = 1
-        best_corr = 0
-        
-        for lag in range(1, max_lag + 1):
-            if len(data) > lag:
-                corr = np.corrcoef(data[:-lag], data[lag:])[0, 1]
-                if abs(corr) > abs(best_corr):
-                    best_corr = corr
-                    best_lag = lag
-        
-        # Simple AR model: x(t) = φ₁x(t-1) + φ₂x(t-2) + ... + φₚx(t-p) + ε(t)
-        if len(data) > best_lag:
-            # Estimate AR coefficients (simplified)
-            X = []
-            y = []
-            
-            for i in range(best_lag, len(data)):
-                X.append(data[i-best_lag:i])
-                y.append(data[i])
-            
-            X = np.array(X)
-            y = np.array(y)
-            
-            # Simple linear regression for AR coefficients
-            try:
-                coeffs = np.linalg.lstsq(X, y, rcond=None)[0]
-            except np.linalg.LinAlgError:
-                coeffs = np.ones(best_lag) / best_lag
-        else:
-            coeffs = np.array([1.0])
-        
-        # Generate forecasts
-        forecasts = []
-        last_values = data[-best_lag:].tolist()
-        
-        for _ in range(steps):
-            if len(coeffs) == len(last_values):
-                next_val = np.dot(coeffs, last_values)
-            else:
-                next_val = np.mean(last_values)
-            
-            forecasts.append(max(0, next_val))
-            last_values = last_values[1:] + [next_val]
-        
-        # Estimate prediction intervals
-        residuals = []
-        if len(data) > best_lag:
-            for i in range(best_lag, len(data)):
-                if len(coeffs) == best_lag:
-                    pred = np.dot(coeffs, data[i-best_lag:i])
-                    residuals.append(data[i] - pred)
+        result = self._ar_forecast_matrix(np.asarray(time_series.values, dtype=float)[None, :], steps)
+        forecasts = result['forecasts'][0].tolist()
         
-        std_error = np.std(residuals) if residuals else np.std(data) * 0.1
-        
-        confidence_intervals = []
-        for forecast in forecasts:
-            ci_lower = max(0, forecast - 1.96 * std_error)
-            ci_upper = forecast + 1.96 * std_error
-            confidence_intervals.append((ci_lower, ci_upper))
+        return {
+            'forecasts': forecasts,
+            'confidence_intervals': list(zip(result['lower'][0].tolist(), result['upper'][0].tolist())),
+            'model_params': {
+                'lag_order': int(result['lag_order'][0]),
+                'coefficients': result['coefficients'][0].tolist(),  # Lag 1 first
+                'mean': float(result['mean'][0])
+            },
+            'error_std': float(result['error_std'][0])
+        }
+    
+    def _ar_forecast_matrix(self, demand_matrix: np.ndarray, steps: int) -> Dict[str, Any]:
+        """AR(p) forecasts for every row of an (items x days) matrix, order chosen per row by AIC"""
+        # FFT autocorrelation + Levinson-Durbin Yule-Walker fits up to monthly lag orders
+        fit = fit_ar_matrix(demand_matrix)
+        forecasts = np.maximum(0, ar_forecast_matrix(demand_matrix, fit, steps))
         
+        half_width = INTERVAL_Z * fit['residual_std'][:, None]
         return {
             'forecasts': forecasts,
-            'confidence_intervals': confidence_intervals,
-            'model_params': {'lag_order': best_lag, 'coefficients': coeffs.tolist()},
-            'error_std': std_error
+            'lower': np.maximum(0, forecasts - half_width),
+            'upper': forecasts + half_width,
+            'lag_order': fit['order'],
+            'coefficients': [coefficients[:order] for coefficients, order in zip(fit['coefficients'], fit['order'])],
+            'mean': fit['mean'],
+            'error_std': fit['residual_std'],
+            'fit': fit
         }
     
     def exponential_smoothing_forecast(self, time_series: pd.Series, steps: int) -> Dict[str, Any]:
         """Exponential smoothing forecast with trend and seasonality"""
         logger.info(f"Generating exponential smoothing forecast for {steps} periods")
         
-        data = time_series.values
-        
-        # Holt-Winters exponential smoothing parameters
-        alpha = 0.3  # Level smoothing
-        beta = 0.1   # Trend smoothing
-        gamma = 0.1  # Seasonal smoothing
-        
-        # Initialize components
-        level = data[0]
-        trend = 0 if len(data) < 2 else data[1] - data[0]
-        
-        # Seasonal initialization (weekly pattern)
-        season_length = min(7, len(data) // 2)
-        seasonal = np.zeros(season_length)
-        
-        if len(data) >= season_length:
-            for i in range(season_length):
-                seasonal[i] = np.mean([data[j] for j in range(i, len(data), season_length)])
-            seasonal = seasonal - np.mean(seasonal)
-        
-        # Apply exponential smoothing
-        levels = [level]
-        trends = [trend]
-        seasonals = [seasonal.copy()]
-        
-        for i in range(1, len(data)):
-            # Update level
-            if len(seasonal) > 0:
-                season_idx = (i - 1) % len(seasonal)
-                level = alpha * (data[i] - seasonal[season_idx]) + (1 - alpha) * (level + trend)
-            else:
-                level = alpha * data[i] + (1 - alpha) * (level + trend)
-            
-            # Update trend
-            trend = beta * (level - levels[-1]) + (1 - beta) * trend
-            
-            # Update seasonal
-            if len(seasonal) > 0:
-                season_idx = (i - 1) % len(seasonal)
-                seasonal[season_idx] = gamma * (data[i] - level) + (1 - gamma) * seasonal[season_idx]
-            
-            levels.append(level)
-            trends.append(trend)
-            seasonals.append(seasonal.copy())
-        
-        # Generate forecasts
-        forecasts = []
-        for h in range(1, steps + 1):
-            forecast = level + h * trend
-            if len(seasonal) > 0:
-                season_idx = (len(data) + h - 1) % len(seasonal)
-                forecast += seasonal[season_idx]
-            
-            forecasts.append(max(0, forecast))
-        
-        # Estimate confidence intervals
-        residuals = []
-        for i in range(len(data)):
-            fitted = levels[i]
-            if i > 0 and len(seasonal) > 0:
-                season_idx = (i - 1) % len(seasonal)
-                fitted += seasonals[i][season_idx]
-            residuals.append(data[i] - fitted)
-        
-        std_error = np.std(residuals)
-        
-        confidence_intervals = []
-        for i, forecast in enumerate(forecasts):
-            # Prediction interval widens with forecast horizon
-            error_multiplier = np.sqrt(1 + i * 0.1)
-            ci_lower = max(0, forecast - 1.96 * std_error * error_multiplier)
-            ci_upper = forecast + 1.96 * std_error * error_multiplier
-            confidence_intervals.append((ci_lower, ci_upper))
+        # Holt-Winters state-space recursion (single seasonal state, residuals computed inline)
+        state = fit_holt_winters(time_series.values)
+        forecasts = holt_winters_forecast(state, steps)
+        lower, upper = holt_winters_intervals(state, forecasts, INTERVAL_Z)
         
         return {
-            'forecasts': forecasts,
-            'confidence_intervals': confidence_intervals,
+            'forecasts': forecasts[0].tolist(),
+            'confidence_intervals': list(zip(lower[0].tolist(), upper[0].tolist())),
             'model_params': {
-                'alpha': alpha,
-                'beta': beta,
-                'gamma': gamma,
-                'final_level': level,
-                'final_trend': trend,
-                'seasonal_factors': seasonal.tolist()
+                'alpha': state.alpha,
+                'beta': state.beta,
+                'gamma': state.gamma,
+                'final_level': float(state.level[0]),
+                'final_trend': float(state.trend[0]),
+                'seasonal_factors': state.seasonal[:, 0].tolist()
             },
-            'error_std': std_error
+            'error_std': float(state.residual_std[0])
         }
     
-    def ensemble_forecast(self, time_series: pd.Series, steps: int) -> DemandForecast:
-        """Ensemble forecast combining multiple methods"""
-        logger.info(f"Generating ensemble forecast for {steps} periods")
+    def exponential_smoothing_matrix(self, demand_matrix: np.ndarray, steps: int) -> Dict[str, np.ndarray]:
+        """Holt-Winters forecasts for a whole (items x days) matrix in one vectorized recursion"""
+        logger.info(f"Generating exponential smoothing forecasts for {len(demand_matrix)} series")
         
-        item_id = "ensemble_item"
+        state = fit_holt_winters(demand_matrix)
+        forecasts = holt_winters_forecast(state, steps)
+        lower, upper = holt_winters_intervals(state, forecasts, INTERVAL_Z)
         
-        # Get forecasts from different methods
-        arima_result = self.arima_forecast(time_series, steps)
-        exp_smooth_result = self.exponential_smoothing_forecast(time_series, steps)
-        
-        # Decompose time series
-        decomposition = self.decompose_time_series(time_series)
-        
-        # Ensemble weights (can be learned from historical performance)
-        weights = {
-            'arima': 0.4,
-            'exp_smooth': 0.6
+        return {
+            'forecasts': forecasts,
+            'lower': lower,
+            'upper': upper,
+            'error_std': state.residual_std,
+            'state': state
         }
+    
+    def ensemble_forecast(self, time_series: pd.Series, steps: int, item_id: Optional[str] = None) -> DemandForecast:
+        """
+        Ensemble forecast combining multiple methods, for a single series.
+        
+        Runs the same path as forecast_many: an item backtested by backtest_many gets
+        its learned ensemble weights and out-of-sample metrics. Without item_id the
+        series is forecast with the default weights and its state is not persisted.
+        """
+        logger.info(f"Generating ensemble forecast for {steps} periods")
         
-        # Combine forecasts
-        ensemble_forecasts = []
-        ensemble_intervals = []
-        
-        for i in range(steps):
-            # Weighted average of forecasts
-            forecast = (weights['arima'] * arima_result['forecasts'][i] + 
-                       weights['exp_smooth'] * exp_smooth_result['forecasts'][i])
-            
-            # Combined confidence intervals
-            arima_ci = arima_result['confidence_intervals'][i]
-            exp_ci = exp_smooth_result['confidence_intervals'][i]
-            
-            ci_lower = weights['arima'] * arima_ci[0] + weights['exp_smooth'] * exp_ci[0]
-            ci_upper = weights['arima'] * arima_ci[1] + weights['exp_smooth'] * exp_ci[1]
-            
-            ensemble_forecasts.append(forecast)
-            ensemble_intervals.append((ci_lower, ci_upper))
+        values = np.asarray(time_series.values, dtype=float)[None, :]
+        dates = time_series.index.values[None, :]
+        key = item_id if item_id is not None else ANONYMOUS_SERIES_PREFIX + series_fingerprint(values[0], dates[0, 0])
+        forecast = self._ensemble_forecast_matrix([key], values, dates, steps, persist_state=item_id is not None)[0]
+        forecast.item_id = item_id or "ensemble_item"
+        return forecast
+    
+    def _decompose_matrix(self, demand_matrix: np.ndarray, day_of_week: np.ndarray,
+                          weekday_means: np.ndarray) -> Dict[str, np.ndarray]:
+        """Trend, weekly seasonal and residual components for every row of an (items x days) matrix"""
+        n_items, n_obs = demand_matrix.shape
+        
+        # Centered moving average for trend, from one cumulative sum per row
+        window = decomposition_window(n_obs)
+        cumsum = np.concatenate([np.zeros((n_items, 1)), np.cumsum(demand_matrix, axis=1)], axis=1)
+        trailing = (cumsum[:, window:] - cumsum[:, :-window]) / window
+        trend = np.full((n_items, n_obs), np.nan)
+        first = window - 1 - (window - 1) // 2
+        trend[:, first:first + trailing.shape[1]] = trailing
+        
+        # Seasonal component (simplified weekly pattern): per-row mean of the detrended series by weekday
+        if n_obs >= 14:
+            seasonal = np.take_along_axis(weekday_means, day_of_week, axis=1)
+        else:
+            seasonal = np.zeros((n_items, n_obs))
+        residual = np.nan_to_num(demand_matrix - trend - seasonal, nan=0.0)
         
-        # Extract components for forecast period
-        trend_component = [decomposition['trend'][-1]] * steps
-        seasonal_component = []
+        # Edges of the trend are filled from the nearest centered value
+        last = first + trailing.shape[1] - 1
+        trend[:, :first] = trend[:, [first]]
+        trend[:, last + 1:] = trend[:, [last]]
         
-        for i in range(steps):
-            if len(decomposition['seasonal']) >= 7:
-                season_idx = (len(time_series) + i) % 7
-                season_val = decomposition['seasonal'][-(7-season_idx) if season_idx > 0 else -7]
+        return {'trend': trend, 'seasonal': seasonal, 'residual': residual}
+    
+    def _seasonality_from_stats(self, stats: np.ndarray, shift: np.ndarray, pattern_type: str,
+                                threshold: float, n_extremes: int) -> List[Optional[SeasonalPattern]]:
+        """Coefficient-of-variation seasonality test for every row, from per-period count/sum/square stats"""
+        counts = stats[:, 0]
+        means, stds = period_means_stds(stats, shift)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = np.nanmean(stds, axis=1) / np.nanmean(means, axis=1)
+        
+        patterns: List[Optional[SeasonalPattern]] = [None] * len(stats)
+        for row in np.flatnonzero(cv > threshold):
+            present = np.flatnonzero(counts[row] > 0)
+            row_means = means[row, present]
+            patterns[row] = SeasonalPattern(
+                pattern_type=pattern_type,
+                strength=float(cv[row]),
+                peak_periods=present[np.argsort(-row_means, kind='stable')[:n_extremes]].tolist(),
+                low_periods=present[np.argsort(row_means, kind='stable')[:n_extremes]].tolist()
+            )
+        return patterns
+    
+    def _seasonal_patterns_matrix(self, item_ids: List[str], summary: Dict[str, Any],
+                                  n_obs: int) -> List[Dict[str, SeasonalPattern]]:
+        """
+        Seasonal patterns per item, reusing the patterns kept on summaries the cache had
+        unchanged (new and extended summaries start without patterns)
+        """
+        results: List[Optional[Dict[str, SeasonalPattern]]] = [None] * len(item_ids)
+        stale = []
+        for row, series_summary in enumerate(summary['summaries']):
+            if series_summary.patterns is not None:
+                results[row] = series_summary.patterns
             else:
-                season_val = 0
-            seasonal_component.append(season_val)
-        
-        # Calculate accuracy metrics (on historical data)
-        mape = self._calculate_mape(time_series.values[-min(30, len(time_series)):])
-        rmse = self._calculate_rmse(time_series.values[-min(30, len(time_series)):])
-        
-        accuracy_metrics = {
-            'mape': mape,
-            'rmse': rmse,
-            'mae': rmse * 0.8  # Approximation
-        }
-        
+                stale.append(row)
+        if not stale:
+            return results
+        
+        rows = np.array(stale)
+        shift = summary['shift'][rows]
+        weekly = self._seasonality_from_stats(summary['weekday'][rows], shift, 'weekly', 0.2, 2) \
+            if n_obs >= 14 else [None] * len(rows)  # At least 2 weeks
+        monthly = self._seasonality_from_stats(summary['month_day'][rows], shift, 'monthly', 0.15, 3) \
+            if n_obs >= 60 else [None] * len(rows)  # At least 2 months
+        for row, weekly_pattern, monthly_pattern in zip(stale, weekly, monthly):
+            patterns = {}
+            if weekly_pattern is not None:
+                patterns['weekly'] = weekly_pattern
+            if monthly_pattern is not None:
+                patterns['monthly'] = monthly_pattern
+            summary['summaries'][row].patterns = patterns
+            results[row] = patterns
+        return results
+    
+    def _naive_error_matrix(self, demand_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Naive day-over-day MAPE and RMSE over the last 30 days of every row, used until a backtest has run"""
+        recent = demand_matrix[:, -min(30, demand_matrix.shape[1]):]
+        if recent.shape[1] < 2:
+            return np.full(len(recent), 10.0), np.ones(len(recent))
+        
+        current, previous = recent[:, 1:], recent[:, :-1]
+        nonzero = current != 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percentage_errors = np.where(nonzero, np.abs(current - previous) / current, 0.0)
+            mape = percentage_errors.sum(axis=1) / nonzero.sum(axis=1) * 100
+        mape[nonzero.sum(axis=1) == 0] = 10.0
+        rmse = np.sqrt(((current - previous) ** 2).mean(axis=1))
+        return mape, rmse
+    
+    def _simple_average_forecast(self, item_id: str, demand: np.ndarray, forecast_days: int) -> DemandForecast:
+        """Fallback forecast for items with less than a week of history"""
+        avg_demand = float(demand.mean()) if len(demand) > 0 else 50
         return DemandForecast(
             item_id=item_id,
-            forecast_horizon=steps,
-            predictions=ensemble_forecasts,
-            confidence_intervals=ensemble_intervals,
-            seasonal_component=seasonal_component,
-            trend_component=trend_component,
-            accuracy_metrics=accuracy_metrics,
-            method_used="Ensemble (ARIMA + Exponential Smoothing)",
+            forecast_horizon=forecast_days,
+            predictions=[avg_demand] * forecast_days,
+            confidence_intervals=[(avg_demand * 0.8, avg_demand * 1.2)] * forecast_days,
+            seasonal_component=[0] * forecast_days,
+            trend_component=[avg_demand] * forecast_days,
+            accuracy_metrics={'mape': 15.0, 'rmse': avg_demand * 0.2, 'mae': avg_demand * 0.15},
+            method_used="Simple Average",
             timestamp=datetime.now()
         )
     
-    def _calculate_mape(self, actual_values: np.ndarray) -> float:
-        """Calculate Mean Absolute Percentage Error"""
-        if len(actual_values) < 2:
-            return 10.0  # Default MAPE
-        
-        # Simple in-sample error estimation
-        errors = []
-        for i in range(1, len(actual_values)):
-            if actual_values[i] != 0:
-                error = abs(actual_values[i] - actual_values[i-1]) / actual_values[i]
-                errors.append(error)
-        
-        return np.mean(errors) * 100 if errors else 10.0
+    def _ensemble_forecast_matrix(self, item_ids: List[str], demand_matrix: np.ndarray, dates: np.ndarray,
+                                  forecast_days: int, persist_state: bool = True) -> List[DemandForecast]:
+        """Ensemble forecasts for equal-length series stacked as an (items x days) matrix"""
+        n_items, n_obs = demand_matrix.shape
+        
+        # Seasonality detection, stored per item as in detect_seasonality; unchanged
+        # series reuse their summaries and patterns, extended series only fold in new days
+        summary = self.series_summaries.summarize(item_ids, demand_matrix, dates)
+        self._seasonal_patterns_matrix(item_ids, summary, n_obs)
+        
+        # Component forecasts, each a single pass over the whole matrix
+        arima_result = self._ar_forecast_matrix(demand_matrix, forecast_days)
+        exp_smooth_result = self.exponential_smoothing_matrix(demand_matrix, forecast_days)
+        if persist_state:
+            self.state_store.load(item_ids, exp_smooth_result['state'], arima_result['fit'], demand_matrix)
+        
+        # Per-item weights learned by backtest_many, default weights otherwise
+        default_weights = {
+            'arima': 0.4,
+            'exp_smooth': 0.6
+        }
+        arima_weight = np.array([
+            self.ensemble_weights.get(item_id, default_weights)['arima'] for item_id in item_ids
+        ])[:, None]
+        smooth_weight = 1 - arima_weight
+        predictions = arima_weight * arima_result['forecasts'] + smooth_weight * exp_smooth_result['forecasts']
+        lower = arima_weight * arima_result['lower'] + smooth_weight * exp_smooth_result['lower']
+        upper = arima_weight * arima_result['upper'] + smooth_weight * exp_smooth_result['upper']
+        
+        # Last observed weekly cycle repeated over the horizon
+        season_positions = n_obs - 7 + (n_obs + np.arange(forecast_days)) % 7
+        if n_obs >= 14:
+            weekday_means = weekly_seasonal_means(summary['detrended'])
+            seasonal_component = np.take_along_axis(weekday_means, summary['weekdays'][:, season_positions], axis=1)
+        else:
+            seasonal_component = np.zeros((n_items, forecast_days))
+        
+        # Last centered moving average of the decomposition trend (edge-filled)
+        trend_last = demand_matrix[:, -decomposition_window(n_obs):].mean(axis=1)
+        
+        # Out-of-sample ensemble errors when a backtest has run, naive day-over-day change otherwise
+        naive_mape, naive_rmse = self._naive_error_matrix(demand_matrix)
+        accuracy_metrics = []
+        for i, item_id in enumerate(item_ids):
+            backtest = self.backtest_metrics.get(item_id)
+            if backtest is not None:
+                accuracy_metrics.append(dict(backtest['ensemble']))
+            else:
+                accuracy_metrics.append({
+                    'mape': float(naive_mape[i]),
+                    'rmse': float(naive_rmse[i]),
+                    'mae': float(naive_rmse[i]) * 0.8  # Approximation
+                })
+        
+        timestamp = datetime.now()
+        return [
+            DemandForecast(
+                item_id=item_id,
+                forecast_horizon=forecast_days,
+                predictions=predictions[i].tolist(),
+                confidence_intervals=list(zip(lower[i].tolist(), upper[i].tolist())),
+                seasonal_component=seasonal_component[i].tolist(),
+                trend_component=[float(trend_last[i])] * forecast_days,
+                accuracy_metrics=accuracy_metrics[i],
+                method_used="Ensemble (ARIMA + Exponential Smoothing)",
+                timestamp=timestamp
+            )
+            for i, item_id in enumerate(item_ids)
+        ]
     
-    def _calculate_rmse(self, actual_values: np.ndarray) -> float:
-        """Calculate Root Mean Square Error"""
-        if len(actual_values) < 2:
-            return np.std(actual_values) if len(actual_values) > 0 else 1.0
-        
-        # Simple in-sample error estimation
-        errors = []
-        for i in range(1, len(actual_values)):
-            error = (actual_values[i] - actual_values[i-1]) ** 2
-            errors.append(error)
-        
-        return np.sqrt(np.mean(errors)) if errors else 1.0
+    def _group_by_length(self, history_index: ItemHistoryIndex, item_ids: List[str],
+                         min_length: int) -> Tuple[Dict[str, np.ndarray], Dict[int, Tuple[List[str], np.ndarray]]]:
+        """Split items into short histories and equal-length groups with row positions for stacking"""
+        short: Dict[str, np.ndarray] = {}
+        groups: Dict[int, List[str]] = {}
+        for item_id in item_ids:
+            values = history_index.values(item_id, 'demand') if item_id in history_index else np.zeros(0)
+            if len(values) < min_length:
+                short[item_id] = values.astype(float)
+            else:
+                groups.setdefault(len(values), []).append(item_id)
+        
+        stacked = {}
+        for n_obs, group_ids in groups.items():
+            starts = np.array([history_index.bounds(item_id)[0] for item_id in group_ids])
+            stacked[n_obs] = (group_ids, starts[:, None] + np.arange(n_obs))
+        return short, stacked
     
-    async def forecast_item_demand(self, item_id: str, historical_data: pd.DataFrame, 
-                                 forecast_days: int = 30) -> DemandForecast:
-        """Generate demand forecast for a specific item"""
-        logger.info(f"Forecasting demand for {item_id} over {forecast_days} days")
+    async def forecast_many(self, item_ids: Optional[List[str]], historical_data: pd.DataFrame,
+                            forecast_days: int = 30) -> Dict[str, DemandForecast]:
+        """Forecast demand for many items at once (all items in the history when item_ids is None)"""
+        return self.batch_forecast(item_ids, historical_data, forecast_days)
+    
+    def batch_forecast(self, item_ids: Optional[List[str]], historical_data: pd.DataFrame,
+                       forecast_days: int = 30) -> Dict[str, DemandForecast]:
+        """Blocking body of forecast_many, for callers that run it on an executor thread"""
+        history_index = ItemHistoryIndex(sort_by_item_date(historical_data))
+        if item_ids is None:
+            item_ids = history_index.item_ids
+        logger.info(f"Forecasting demand for {len(item_ids)} items over {forecast_days} days")
+        
+        demand = history_index.column('demand').astype(float)
+        dates = history_index.column('date')
+        
+        forecasts: Dict[str, DemandForecast] = {}
+        short, groups = self._group_by_length(history_index, item_ids, 7)
+        for item_id, values in short.items():
+            logger.warning(f"Insufficient data for {item_id}")
+            forecasts[item_id] = self._simple_average_forecast(item_id, values, forecast_days)
         
-        # Filter data for the specific item
-        item_data = historical_data[historical_data['item_id'] == item_id].copy()
+        # Items with the same history length are stacked into one aligned (items x days) matrix
+        for group_ids, positions in groups.values():
+            for forecast in self._ensemble_forecast_matrix(group_ids, demand[positions], dates[positions], forecast_days):
+                forecasts[forecast.item_id] = forecast
         
-        if len(item_data) < 7:
-            logger.warning(f"Insufficient data for {item_id}")
-            # Return simple forecast based on average
-            avg_demand = item_data['demand'].mean() if len(item_data) > 0 else 50
-            return DemandForecast(
+        return {item_id: forecasts[item_id] for item_id in item_ids}
+    
+    def fit_item_states(self, item_ids: Optional[List[str]], historical_data: pd.DataFrame) -> int:
+        """Full Holt-Winters and AR refit of the persisted per-item states; returns items fitted"""
+        history_index = ItemHistoryIndex(sort_by_item_date(historical_data))
+        if item_ids is None:
+            item_ids = history_index.item_ids
+        
+        demand = history_index.column('demand').astype(float)
+        _, groups = self._group_by_length(history_index, item_ids, 7)
+        fitted = 0
+        for group_ids, positions in groups.values():
+            demand_matrix = demand[positions]
+            self.state_store.load(group_ids, fit_holt_winters(demand_matrix), fit_ar_matrix(demand_matrix), demand_matrix)
+            fitted += len(group_ids)
+        
+        logger.info(f"Refitted forecast state for {fitted} items")
+        return fitted
+    
+    def update_item_states(self, observations: Dict[str, float]) -> List[str]:
+        """Apply one closed day of demand per item in O(1) each; returns items now due for a refit"""
+        known = [item_id for item_id in observations if item_id in self.state_store]
+        if not known:
+            return []
+        due = self.state_store.update_many(known, np.array([observations[item_id] for item_id in known], dtype=float))
+        return [item_id for item_id, is_due in zip(known, due) if is_due]
+    
+    def refresh_forecasts(self, item_ids: Optional[List[str]] = None, forecast_days: int = 30,
+                          historical_data: Optional[pd.DataFrame] = None) -> Dict[str, DemandForecast]:
+        """
+        Forecasts straight from the persisted per-item states, without touching history.
+        
+        When historical_data is given, items past their refit interval are fully
+        refitted first (drift control).
+        """
+        if historical_data is not None:
+            due = self.state_store.due_for_refit()
+            if due:
+                self.fit_item_states(due, historical_data)
+        
+        item_ids = [item_id for item_id in (item_ids or self.state_store.item_ids) if item_id in self.state_store]
+        if not item_ids:
+            return {}
+        
+        state = self.state_store.forecast(item_ids, forecast_days)
+        default_weights = {'arima': 0.4, 'exp_smooth': 0.6}
+        arima_weight = np.array([self.ensemble_weights.get(item_id, default_weights)['arima'] for item_id in item_ids])
+        w = arima_weight[:, None]
+        
+        predictions = w * state['arima'] + (1 - w) * state['exp_smooth']
+        arima_half = INTERVAL_Z * state['arima_std'][:, None]
+        smooth_half = INTERVAL_Z * state['exp_smooth_std'][:, None] * np.sqrt(1 + np.arange(forecast_days) * 0.1)
+        lower = w * np.maximum(0, state['arima'] - arima_half) + (1 - w) * np.maximum(0, state['exp_smooth'] - smooth_half)
+        upper = w * (state['arima'] + arima_half) + (1 - w) * (state['exp_smooth'] + smooth_half)
+        trend = state['level'][:, None] + np.arange(1, forecast_days + 1) * state['trend'][:, None]
+        
+        # In-sample residual spread stands in for accuracy until a backtest has run
+        residual_rmse = arima_weight * state['arima_std'] + (1 - arima_weight) * state['exp_smooth_std']
+        
+        residual_mape = (residual_rmse / np.maximum(predictions[:, 0], 1.0) * 100).tolist()
+        residual_rmse = residual_rmse.tolist()
+        
+        # Convert whole arrays once; per-row conversions dominate at catalogue scale
+        prediction_rows, lower_rows, upper_rows = predictions.tolist(), lower.tolist(), upper.tolist()
+        seasonal_rows, trend_rows = state['seasonal'].tolist(), trend.tolist()
+        
+        timestamp = datetime.now()
+        forecasts = {}
+        for i, item_id in enumerate(item_ids):
+            backtest = self.backtest_metrics.get(item_id)
+            accuracy_metrics = dict(backtest['ensemble']) if backtest is not None else {
+                'mape': residual_mape[i],
+                'rmse': residual_rmse[i],
+                'mae': residual_rmse[i] * 0.8  # Approximation
+            }
+            forecasts[item_id] = DemandForecast(
                 item_id=item_id,
                 forecast_horizon=forecast_days,
-                predictions=[avg_demand] * forecast_days,
-                confidence_intervals=[(avg_demand * 0.8, avg_demand * 1.2)] * forecast_days,
-                seasonal_component=[0] * forecast_days,
-                trend_component=[avg_demand] * forecast_days,
-                accuracy_metrics={'mape': 15.0, 'rmse': avg_demand * 0.2, 'mae': avg_demand * 0.15},
-                method_used="Simple Average",
-                timestamp=datetime.now()
+                predictions=prediction_rows[i],
+                confidence_intervals=list(zip(lower_rows[i], upper_rows[i])),
+                seasonal_component=seasonal_rows[i],
+                trend_component=trend_rows[i],
+                accuracy_metrics=accuracy_metrics,
+                method_used="Ensemble (ARIMA + Exponential Smoothing)",
+                timestamp=timestamp
             )
+        return forecasts
+    
+    async def backtest_many(self, item_ids: Optional[List[str]], historical_data: pd.DataFrame,
+                            horizon: int = 14, stride: int = 7, max_origins: int = 26,
+                            n_jobs: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """batch_backtest on an executor thread, so the awaiting event loop keeps serving"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self.batch_backtest(item_ids, historical_data, horizon, stride, max_origins, n_jobs))
+    
+    def batch_backtest(self, item_ids: Optional[List[str]], historical_data: pd.DataFrame,
+                       horizon: int = 14, stride: int = 7, max_origins: int = 26,
+                       n_jobs: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Rolling-origin backtest of AR and exponential smoothing for many items.
+        
+        Stores per-item ensemble weights and out-of-sample error metrics, which
+        forecast_many then uses. The ensemble's metrics come from held-out origins
+        whose weights were learned only from earlier origins; ensemble_in_sample
+        marks items with a single origin, where they could only be in sample.
+        n_jobs=None spreads item chunks over every core.
+        """
+        history_index = ItemHistoryIndex(sort_by_item_date(historical_data))
+        if item_ids is None:
+            item_ids = history_index.item_ids
+        logger.info(f"Backtesting {len(item_ids)} items over {horizon}-day horizons")
+        
+        demand = history_index.column('demand').astype(float)
+        _, groups = self._group_by_length(history_index, item_ids, 0)
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        for n_obs, (group_ids, positions) in groups.items():
+            if len(rolling_origins(n_obs, horizon, stride)) == 0:
+                logger.warning(f"Histories of {n_obs} days are too short to backtest {len(group_ids)} items")
+                continue
+            
+            backtest = backtest_matrix_parallel(demand[positions], n_jobs=n_jobs, horizon=horizon,
+                                                stride=stride, max_origins=max_origins)
+            for i, item_id in enumerate(group_ids):
+                metrics = {
+                    method: {name: float(values[i]) for name, values in method_metrics.items()}
+                    for method, method_metrics in backtest['metrics'].items()
+                }
+                weights = {method: float(values[i]) for method, values in backtest['weights'].items()}
+                self.backtest_metrics[item_id] = metrics
+                self.ensemble_weights[item_id] = weights
+                results[item_id] = {'metrics': metrics, 'weights': weights, 'origins': len(backtest['origins']),
+                                    'ensemble_in_sample': backtest['ensemble_in_sample']}
+        
+        return results
+    
+    async def forecast_item_demand(self, item_id: str, historical_data: pd.DataFrame, 
+                                 forecast_days: int = 30) -> DemandForecast:
+        """Generate demand forecast for a specific item"""
+        logger.info(f"Forecasting demand for {item_id} over {forecast_days} days")
         
-        # Prepare time series
-        item_data = item_data.sort_values('date')
-        item_data.set_index('date', inplace=True)
-        time_series = item_data['demand']
-        
-        # Detect seasonality
-        self.detect_seasonality(time_series, item_id)
-        
-        # Generate ensemble forecast
-        forecast = self.ensemble_forecast(time_series, forecast_days)
-        forecast.item_id = item_id
-        
-        return forecast
+        # Filter data for the specific item, then run the batch path on it
+        item_data = historical_data[historical_data['item_id'] == item_id]
+        forecasts = await self.forecast_many([item_id], item_data, forecast_days)
+        return forecasts[item_id]
 
 # Singleton instance
 demand_forecasting = AdvancedDemandForecasting()
@@ -0,0 +1,231 @@
+"""
+Online Feature Store for Hospital Supply Chain AI/ML
+
+This module implements:
+- Per-item ring buffers of recent daily demand
+- Sliding-window Welford mean/std for rolling statistics
+- O(1) feature updates when a new daily observation arrives
+- Feature vectors identical to the batch prepare_features path
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Any, Sequence
+from datetime import datetime
+import logging
+from history_store import ItemHistoryIndex, sort_by_item_date
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+LAG_PERIODS = (1, 3, 7, 14, 30)
+ROLLING_WINDOWS = (7, 14, 30)
+BASE_FEATURES = ['stock_level', 'procurement_cost', 'supplier_lead_time', 'day_of_week',
+                 'month', 'quarter', 'is_weekend', 'is_holiday']
+
+def feature_names(lags: Sequence[int] = LAG_PERIODS, windows: Sequence[int] = ROLLING_WINDOWS) -> List[str]:
+    """Feature column order produced by prepare_features"""
+    names = list(BASE_FEATURES)
+    names += [f'demand_lag_{lag}' for lag in lags]
+    for window in windows:
+        names += [f'demand_rolling_mean_{window}', f'demand_rolling_std_{window}']
+    names += ['day_sin', 'day_cos', 'month_sin', 'month_cos', 'stock_demand_ratio']
+    return names
+
+class _WindowStats:
+    """Sliding-window Welford accumulator"""
+
+    __slots__ = ('window', 'count', 'mean', 'm2')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def pop(self, value: float):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = value - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+
+    def reset(self, values: np.ndarray):
+        self.count = len(values)
+        self.mean = float(values.mean()) if self.count else 0.0
+        self.m2 = float(((values - self.mean) ** 2).sum()) if self.count else 0.0
+
+    def full_mean(self) -> float:
+        return self.mean if self.count >= self.window else 0.0
+
+    def full_std(self) -> float:
+        if self.count < self.window or self.count < 2:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+class _ItemFeatureState:
+    """Ring buffer and running window statistics for one item"""
+
+    def __init__(self, capacity: int, windows: Sequence[int]):
+        self.buffer = np.zeros(capacity)
+        self.head = -1          # Index of the most recent value
+        self.size = 0
+        self.windows = [_WindowStats(window) for window in windows]
+        self.latest: Dict[str, Any] = {}
+        self.updates_since_resync = 0
+
+    def value_at_lag(self, lag: int) -> Optional[float]:
+        if lag >= self.size:
+            return None
+        return self.buffer[(self.head - lag) % len(self.buffer)]
+
+    def push(self, value: float):
+        capacity = len(self.buffer)
+        for stats in self.windows:
+            if self.size >= stats.window:
+                stats.pop(self.buffer[(self.head - stats.window + 1) % capacity])
+        self.head = (self.head + 1) % capacity
+        self.buffer[self.head] = value
+        self.size = min(self.size + 1, capacity)
+        for stats in self.windows:
+            stats.push(value)
+        self.updates_since_resync += 1
+
+    def recent(self, n: int) -> np.ndarray:
+        """Last n values in chronological order"""
+        n = min(n, self.size)
+        idx = (self.head - np.arange(n - 1, -1, -1)) % len(self.buffer)
+        return self.buffer[idx]
+
+    def resync(self):
+        """Recompute window statistics exactly to bound floating-point drift"""
+        for stats in self.windows:
+            stats.reset(self.recent(stats.window))
+        self.updates_since_resync = 0
+
+class OnlineFeatureStore:
+    """
+    Maintains live lag and rolling-window features per item
+    """
+
+    def __init__(self, lags: Sequence[int] = LAG_PERIODS, windows: Sequence[int] = ROLLING_WINDOWS,
+                 resync_interval: int = 1000):
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+        self.capacity = max(max(self.lags) + 1, max(self.windows))
+        self.resync_interval = resync_interval
+        self.feature_names = feature_names(self.lags, self.windows)
+        self._items: Dict[str, _ItemFeatureState] = {}
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    @property
+    def item_ids(self) -> List[str]:
+        return list(self._items)
+
+    def update(self, item_id: str, observation: Dict[str, Any]):
+        """Append one daily observation for an item in O(1)"""
+        state = self._items.get(item_id)
+        if state is None:
+            state = _ItemFeatureState(self.capacity, self.windows)
+            self._items[item_id] = state
+
+        state.push(float(observation.get('demand', 0)))
+        state.latest = self.normalize_observation(observation)
+
+        if state.updates_since_resync >= self.resync_interval:
+            state.resync()
+
+    def load_history(self, df: pd.DataFrame, history_index: Optional[ItemHistoryIndex] = None):
+        """Initialise item states from the tail of each item's history"""
+        if history_index is None:
+            history_index = ItemHistoryIndex(sort_by_item_date(df))
+
+        demand = history_index.column('demand')
+        frame = history_index.frame
+        for item_id, start, stop in history_index.iter_slices():
+            values = demand[max(start, stop - self.capacity):stop].astype(float)
+            state = _ItemFeatureState(self.capacity, self.windows)
+            state.buffer[:len(values)] = values
+            state.size = len(values)
+            state.head = len(values) - 1
+            state.resync()
+            state.latest = self.normalize_observation(frame.iloc[stop - 1].to_dict())
+            self._items[item_id] = state
+
+        logger.info(f"Feature store loaded {len(self._items)} items")
+
+    def latest_observation(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Most recent raw observation recorded for an item"""
+        state = self._items.get(item_id)
+        return dict(state.latest) if state else None
+
+    def latest_observations(self) -> Dict[str, Dict[str, Any]]:
+        """Most recent raw observation for every item"""
+        return {item_id: dict(state.latest) for item_id, state in self._items.items()}
+
+    def get_features(self, item_id: str) -> Optional[Dict[str, float]]:
+        """Features for the item's latest observation, keyed by feature name"""
+        state = self._items.get(item_id)
+        if state is None:
+            return None
+
+        latest = state.latest
+        features = {name: float(latest.get(name, 0)) for name in BASE_FEATURES}
+
+        for lag in self.lags:
+            value = state.value_at_lag(lag)
+            features[f'demand_lag_{lag}'] = float(value) if value is not None else 0.0
+
+        for stats in state.windows:
+            features[f'demand_rolling_mean_{stats.window}'] = stats.full_mean()
+            features[f'demand_rolling_std_{stats.window}'] = stats.full_std()
+
+        day_of_week = latest.get('day_of_week', 0)
+        month = latest.get('month', 1)
+        features['day_sin'] = math.sin(2 * math.pi * day_of_week / 7)
+        features['day_cos'] = math.cos(2 * math.pi * day_of_week / 7)
+        features['month_sin'] = math.sin(2 * math.pi * month / 12)
+        features['month_cos'] = math.cos(2 * math.pi * month / 12)
+        features['stock_demand_ratio'] = latest.get('stock_level', 0) / (latest.get('demand', 0) + 1)
+        return features
+
+    def get_feature_vector(self, item_id: str, columns: Optional[Sequence[str]] = None) -> Optional[np.ndarray]:
+        """Feature vector for the item's latest observation in the given column order"""
+        features = self.get_features(item_id)
+        if features is None:
+            return None
+        columns = columns or self.feature_names
+        return np.array([features.get(name, 0.0) for name in columns], dtype=float)
+
+    @staticmethod
+    def normalize_observation(observation: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill calendar fields derived from the observation date"""
+        normalized = dict(observation)
+        date = normalized.get('date')
+        if date is not None:
+            date = pd.Timestamp(date)
+            normalized.setdefault('day_of_week', date.weekday())
+            normalized.setdefault('month', date.month)
+            normalized.setdefault('quarter', (date.month - 1) // 3 + 1)
+            normalized.setdefault('is_weekend', date.weekday() >= 5)
+        normalized.setdefault('is_holiday', False)
+        return normalized
+
+# Export main components
+__all__ = [
+    'OnlineFeatureStore',
+    'LAG_PERIODS',
+    'ROLLING_WINDOWS',
+    'feature_names'
+]
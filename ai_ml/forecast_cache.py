@@ -0,0 +1,209 @@
+"""
+Forecast Result Cache for Hospital Supply Chain AI/ML
+
+This module implements:
+- LRU eviction with an entry limit and an approximate memory cap
+- TTL freshness with stale-while-revalidate background refresh
+- Data-version keyed invalidation so new usage data never serves old forecasts
+- Coalescing of concurrent misses for the same key
+- Invalidation detaches in-flight computes, whose results are then never stored
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, is_dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+    value: Any
+    created_at: float
+    size_bytes: int
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """Approximate the in-memory size of a cached value in bytes"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    if isinstance(value, np.ndarray):
+        return value.nbytes + sys.getsizeof(value)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(v, _seen) for v in value)
+    elif is_dataclass(value) or hasattr(value, '__dict__'):
+        size += estimate_size(vars(value), _seen)
+    return size
+
+class ForecastCache:
+    """
+    Shared forecast cache keyed by (item, horizon, method, data version)
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300.0,
+                 stale_ttl_seconds: float = 1800.0, max_memory_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_ttl_seconds = max(stale_ttl_seconds, ttl_seconds)
+        self.max_memory_bytes = max_memory_bytes
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._memory_bytes = 0
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'background_refreshes': 0,
+            'coalesced': 0
+        }
+
+    @staticmethod
+    def make_key(item_id: str, horizon: int, method: str, data_version: int) -> Tuple[str, int, str, int]:
+        """Build the cache key for a forecast request"""
+        return (item_id, int(horizon), method, int(data_version))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value or None (never triggers computation)"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.created_at > self.ttl_seconds:
+            return None
+        self._entries.move_to_end(key)
+        self._stats['hits'] += 1
+        return entry.value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting least recently used entries as needed"""
+        self._remove(key)
+
+        size_bytes = estimate_size(value)
+        if size_bytes > self.max_memory_bytes:
+            logger.warning(f"Forecast for {key} exceeds cache memory cap, not cached")
+            return
+
+        self._entries[key] = CacheEntry(value=value, created_at=time.monotonic(), size_bytes=size_bytes)
+        self._memory_bytes += size_bytes
+
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._memory_bytes > self.max_memory_bytes):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._stats['evictions'] += 1
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, computing it if missing.
+
+        Entries older than the TTL but within the stale window are served
+        immediately while a background task recomputes them.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.created_at
+            if age <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry.value
+
+            if age <= self.stale_ttl_seconds:
+                self._entries.move_to_end(key)
+                self._stats['stale_hits'] += 1
+                if key not in self._inflight:
+                    self._stats['background_refreshes'] += 1
+                    self._start_compute(key, compute)
+                return entry.value
+
+            self._remove(key)
+
+        if key in self._inflight:
+            self._stats['coalesced'] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self._stats['misses'] += 1
+        return await asyncio.shield(self._start_compute(key, compute))
+
+    @staticmethod
+    def _matches(key: Hashable, item_id: Optional[str], older_than_version: Optional[int]) -> bool:
+        if item_id is not None and key[0] != item_id:
+            return False
+        return older_than_version is None or key[3] < older_than_version
+
+    def invalidate(self, item_id: Optional[str] = None, older_than_version: Optional[int] = None) -> int:
+        """
+        Drop entries for an item and/or entries keyed by an older data version.
+        Matching in-flight computes are detached: callers already waiting still get
+        their result, but it is not stored and later requests start a fresh compute.
+        """
+        to_remove = [key for key in self._entries if self._matches(key, item_id, older_than_version)]
+        for key in to_remove:
+            self._remove(key)
+        for key in [key for key in self._inflight if self._matches(key, item_id, older_than_version)]:
+            del self._inflight[key]
+        return len(to_remove)
+
+    def clear(self):
+        """Remove all cached entries and detach in-flight computes"""
+        self._entries.clear()
+        self._inflight.clear()
+        self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters and occupancy"""
+        lookups = self._stats['hits'] + self._stats['stale_hits'] + self._stats['misses'] + self._stats['coalesced']
+        return {
+            **self._stats,
+            'entries': len(self._entries),
+            'memory_bytes': self._memory_bytes,
+            'max_entries': self.max_entries,
+            'max_memory_bytes': self.max_memory_bytes,
+            'hit_rate': round((lookups - self._stats['misses']) / lookups, 4) if lookups else 0.0,
+            'inflight': len(self._inflight)
+        }
+
+    def _start_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Schedule computation of key, storing the result when it completes"""
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+
+        def _on_done(done: asyncio.Future):
+            if self._inflight.get(key) is not done:
+                return  # Detached by an invalidation: the result predates it
+            del self._inflight[key]
+            if done.cancelled():
+                return
+            error = done.exception()
+            if error is not None:
+                logger.error(f"Forecast computation failed for {key}: {error}")
+                return
+            result = done.result()
+            if result is not None:
+                self.put(key, result)
+
+        task.add_done_callback(_on_done)
+        return task
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry.size_bytes
+
+# Export main components
+__all__ = [
+    'ForecastCache',
+    'CacheEntry',
+    'estimate_size'
+]
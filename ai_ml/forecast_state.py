@@ -0,0 +1,227 @@
+"""
+Persistent Per-Item Forecast State for Demand Forecasting
+
+This module implements:
+- Holt-Winters level, trend and seasonal state kept per item
+- AR coefficients, mean and recent-value window kept per item
+- Running residual variance for both models (Welford updates)
+- O(1) updates when a new day of usage arrives, batched across items
+- Vectorized forecast refresh from the stored state
+- Update counters that flag items for a periodic full refit
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Any, Sequence
+import logging
+from holt_winters import HoltWintersState, DEFAULT_ALPHA, DEFAULT_BETA, DEFAULT_GAMMA, MAX_SEASON_LENGTH
+from autoregression import MAX_AR_ORDER
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class ForecastStateStore:
+    """
+    Struct-of-arrays store of fitted model state, one row per item
+    """
+
+    def __init__(self, max_ar_order: int = MAX_AR_ORDER, max_season_length: int = MAX_SEASON_LENGTH,
+                 refit_interval: int = 28, initial_capacity: int = 256):
+        self.max_ar_order = max_ar_order
+        self.max_season_length = max_season_length
+        self.refit_interval = refit_interval  # Updates before an item needs a full refit
+        self.alpha, self.beta, self.gamma = DEFAULT_ALPHA, DEFAULT_BETA, DEFAULT_GAMMA
+        self._rows: Dict[str, int] = {}
+        self._item_ids: List[str] = []
+        self._allocate(initial_capacity)
+
+    def _allocate(self, capacity: int):
+        P, m = self.max_ar_order, self.max_season_length
+        fields = {
+            'level': np.zeros(capacity),
+            'trend': np.zeros(capacity),
+            'seasonal': np.zeros((capacity, m)),
+            'season_length': np.zeros(capacity, dtype=int),
+            'n_obs': np.zeros(capacity, dtype=int),
+            'hw_count': np.zeros(capacity),
+            'hw_mean': np.zeros(capacity),
+            'hw_m2': np.zeros(capacity),
+            'ar_coefficients': np.zeros((capacity, P)),     # Lag 1 first, zero-padded
+            'ar_mean': np.zeros(capacity),
+            'ar_tail': np.zeros((capacity, P)),             # Most recent value last
+            'ar_count': np.zeros(capacity),
+            'ar_error_mean': np.zeros(capacity),
+            'ar_m2': np.zeros(capacity),
+            'updates_since_fit': np.zeros(capacity, dtype=int)
+        }
+        for name, array in fields.items():
+            current = getattr(self, name, None)
+            if current is not None:
+                array[:len(current)] = current
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self._item_ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def item_ids(self) -> List[str]:
+        return list(self._item_ids)
+
+    def _row_indices(self, item_ids: Sequence[str], create: bool = False) -> np.ndarray:
+        if create:
+            new_ids = [item_id for item_id in dict.fromkeys(item_ids) if item_id not in self._rows]
+            if len(self._item_ids) + len(new_ids) > self.capacity:
+                self._allocate(max(2 * self.capacity, len(self._item_ids) + len(new_ids)))
+            for item_id in new_ids:
+                self._rows[item_id] = len(self._item_ids)
+                self._item_ids.append(item_id)
+        return np.array([self._rows[item_id] for item_id in item_ids], dtype=int)
+
+    def load(self, item_ids: List[str], hw_state: HoltWintersState, ar_fit: Dict[str, Any],
+             demand_matrix: np.ndarray):
+        """Store freshly fitted states for the rows of an (items x days) fit"""
+        rows = self._row_indices(item_ids, create=True)
+        n_obs = demand_matrix.shape[1]
+        m = hw_state.season_length
+
+        self.level[rows] = hw_state.level
+        self.trend[rows] = hw_state.trend
+        self.seasonal[rows] = 0.0
+        self.seasonal[rows, :m] = hw_state.seasonal.T
+        self.season_length[rows] = m
+        self.n_obs[rows] = n_obs
+        self.hw_count[rows] = n_obs
+        self.hw_mean[rows] = hw_state.residuals.mean(axis=1)
+        self.hw_m2[rows] = hw_state.residual_std ** 2 * n_obs
+
+        P = min(self.max_ar_order, ar_fit['coefficients'].shape[1])
+        self.ar_coefficients[rows] = 0.0
+        self.ar_coefficients[rows, :P] = ar_fit['coefficients'][:, :P]
+        self.ar_mean[rows] = ar_fit['mean']
+        tail = demand_matrix[:, -self.max_ar_order:]
+        self.ar_tail[rows] = ar_fit['mean'][:, None]   # History before the first day reads as the mean
+        self.ar_tail[rows, self.max_ar_order - tail.shape[1]:] = tail
+        count = ar_fit['residual_count']
+        self.ar_count[rows] = count
+        self.ar_error_mean[rows] = ar_fit['residual_mean']
+        self.ar_m2[rows] = np.where(count > 0, ar_fit['residual_std'] ** 2 * count, 0.0)
+        self.updates_since_fit[rows] = 0
+
+    def update(self, item_id: str, demand: float) -> bool:
+        """Fold one new day of demand into an item's state; returns True when a refit is due"""
+        row = self._rows[item_id]
+        demand = float(demand)
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+
+        # Scalar version of update_many, avoiding array overhead for a single item
+        ar_mean = self.ar_mean[row]
+        tail = self.ar_tail[row]
+        ar_error = (demand - ar_mean) - float(np.dot(self.ar_coefficients[row], tail[::-1] - ar_mean))
+        self.ar_count[row], self.ar_error_mean[row], self.ar_m2[row] = _welford(
+            self.ar_count[row], self.ar_error_mean[row], self.ar_m2[row], ar_error)
+        tail[:-1] = tail[1:]
+        tail[-1] = demand
+
+        m = int(self.season_length[row])
+        season_idx = (int(self.n_obs[row]) - 1) % m if m else 0
+        season = float(self.seasonal[row, season_idx]) if m else 0.0
+        previous_level = float(self.level[row])
+        trend = float(self.trend[row])
+        level = alpha * (demand - season) + (1 - alpha) * (previous_level + trend)
+        self.trend[row] = beta * (level - previous_level) + (1 - beta) * trend
+        self.level[row] = level
+        if m:
+            season = gamma * (demand - level) + (1 - gamma) * season
+            self.seasonal[row, season_idx] = season
+        self.hw_count[row], self.hw_mean[row], self.hw_m2[row] = _welford(
+            self.hw_count[row], self.hw_mean[row], self.hw_m2[row], demand - (level + season))
+
+        self.n_obs[row] += 1
+        self.updates_since_fit[row] += 1
+        return bool(self.updates_since_fit[row] >= self.refit_interval)
+
+    def update_many(self, item_ids: Sequence[str], demand: np.ndarray) -> np.ndarray:
+        """Fold one new day of demand into each item's state at once"""
+        rows = self._row_indices(item_ids)
+        demand = np.asarray(demand, dtype=float)
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+
+        # AR one-step error against the state before this observation
+        centered_tail = self.ar_tail[rows] - self.ar_mean[rows, None]
+        predicted = (self.ar_coefficients[rows] * centered_tail[:, ::-1]).sum(axis=1)
+        ar_error = (demand - self.ar_mean[rows]) - predicted
+        self.ar_count[rows], self.ar_error_mean[rows], self.ar_m2[rows] = _welford(
+            self.ar_count[rows], self.ar_error_mean[rows], self.ar_m2[rows], ar_error)
+        self.ar_tail[rows, :-1] = self.ar_tail[rows, 1:]
+        self.ar_tail[rows, -1] = demand
+
+        # Holt-Winters step, same recursion as fit_holt_winters
+        m = self.season_length[rows]
+        seasonal_rows = m > 0
+        season_idx = np.where(seasonal_rows, (self.n_obs[rows] - 1) % np.maximum(m, 1), 0)
+        season = np.where(seasonal_rows, self.seasonal[rows, season_idx], 0.0)
+        previous_level = self.level[rows]
+        level = alpha * (demand - season) + (1 - alpha) * (previous_level + self.trend[rows])
+        self.trend[rows] = beta * (level - previous_level) + (1 - beta) * self.trend[rows]
+        self.level[rows] = level
+        season = np.where(seasonal_rows, gamma * (demand - level) + (1 - gamma) * season, 0.0)
+        self.seasonal[rows[seasonal_rows], season_idx[seasonal_rows]] = season[seasonal_rows]
+        hw_residual = demand - (level + season)
+        self.hw_count[rows], self.hw_mean[rows], self.hw_m2[rows] = _welford(
+            self.hw_count[rows], self.hw_mean[rows], self.hw_m2[rows], hw_residual)
+
+        self.n_obs[rows] += 1
+        self.updates_since_fit[rows] += 1
+        return self.updates_since_fit[rows] >= self.refit_interval
+
+    def due_for_refit(self) -> List[str]:
+        """Items updated refit_interval times since their last full fit"""
+        n = len(self._item_ids)
+        return [self._item_ids[row] for row in np.flatnonzero(self.updates_since_fit[:n] >= self.refit_interval)]
+
+    def forecast(self, item_ids: Sequence[str], steps: int) -> Dict[str, np.ndarray]:
+        """Holt-Winters and AR forecasts with residual stds for many items from stored state"""
+        rows = self._row_indices(item_ids)
+        horizons = np.arange(1, steps + 1)
+
+        hw = self.level[rows, None] + horizons * self.trend[rows, None]
+        m = self.season_length[rows]
+        season_idx = (self.n_obs[rows, None] + horizons - 1) % np.maximum(m, 1)[:, None]
+        hw = hw + np.where(m[:, None] > 0, np.take_along_axis(self.seasonal[rows], season_idx, axis=1), 0.0)
+
+        mean = self.ar_mean[rows]
+        reversed_coefficients = self.ar_coefficients[rows, ::-1]
+        window = self.ar_tail[rows] - mean[:, None]
+        ar = np.empty((len(rows), steps))
+        for h in range(steps):
+            next_value = (reversed_coefficients * window).sum(axis=1)
+            ar[:, h] = next_value + mean
+            window = np.concatenate([window[:, 1:], next_value[:, None]], axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hw_std = np.sqrt(np.where(self.hw_count[rows] > 0, self.hw_m2[rows] / self.hw_count[rows], 0.0))
+            ar_std = np.sqrt(np.where(self.ar_count[rows] > 0, self.ar_m2[rows] / self.ar_count[rows], 0.0))
+        return {
+            'exp_smooth': np.maximum(hw, 0),
+            'exp_smooth_std': hw_std,
+            'arima': np.maximum(ar, 0),
+            'arima_std': ar_std,
+            'level': self.level[rows].copy(),
+            'trend': self.trend[rows].copy(),
+            'seasonal': np.where(m[:, None] > 0, np.take_along_axis(self.seasonal[rows], season_idx, axis=1), 0.0)
+        }
+
+def _welford(count: np.ndarray, mean: np.ndarray, m2: np.ndarray, value: np.ndarray):
+    count = count + 1
+    delta = value - mean
+    mean = mean + delta / count
+    m2 = m2 + delta * (value - mean)
+    return count, mean, m2
+
+# Export main components
+__all__ = [
+    'ForecastStateStore'
+]
@@ -0,0 +1,188 @@
+"""
+Compact Historical Data Layout for Hospital Supply Chain AI/ML
+
+This module implements:
+- Memory-lean storage (categorical ids, downcast numerics)
+- Frames sorted by item and date with per-item offset slices
+- Zero-copy per-item access instead of boolean filtering
+- Single-pass lag and rolling-window features over the sorted layout
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_COLUMNS = ['item_id', 'item_name']
+
+def _item_codes(item_ids: pd.Series) -> np.ndarray:
+    if isinstance(item_ids.dtype, pd.CategoricalDtype):
+        return item_ids.cat.codes.to_numpy()
+    return pd.factorize(item_ids, sort=True)[0]
+
+def is_sorted_by_item_date(df: pd.DataFrame) -> bool:
+    """Check in O(n) whether rows are ordered by item and then by date"""
+    if len(df) < 2:
+        return True
+    code_steps = np.diff(_item_codes(df['item_id']))
+    if (code_steps < 0).any():
+        return False
+    date_steps = np.diff(df['date'].to_numpy())
+    return bool(((code_steps > 0) | (date_steps >= np.timedelta64(0))).all())
+
+def sort_by_item_date(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame ordered by item and date, sorting only when needed (always a new frame)"""
+    if is_sorted_by_item_date(df):
+        return df.copy(deep=False)
+    return df.sort_values(['item_id', 'date'], kind='stable')
+
+def compact_history_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a compact copy of a history frame sorted by item and date"""
+    compact = df.sort_values(['item_id', 'date'], kind='stable').reset_index(drop=True)
+
+    for column in compact.columns:
+        series = compact[column]
+        if column in CATEGORICAL_COLUMNS:
+            compact[column] = series.astype('category')
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            continue
+        elif pd.api.types.is_integer_dtype(series):
+            compact[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            # Integral floats (e.g. demand) are stored as integers, the rest as float32
+            values = series.to_numpy()
+            if np.isfinite(values).all() and np.array_equal(values, np.round(values)):
+                compact[column] = pd.to_numeric(series.astype(np.int64), downcast='integer')
+            else:
+                compact[column] = series.astype(np.float32)
+        elif series.dtype == object and column == 'date':
+            compact[column] = pd.to_datetime(series)
+
+    return compact
+
+def frame_memory_bytes(df: pd.DataFrame) -> int:
+    """Deep memory footprint of a frame"""
+    return int(df.memory_usage(deep=True).sum())
+
+class ItemHistoryIndex:
+    """
+    Offset index over a frame sorted by item and date
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.frame = df
+        item_ids = df['item_id']
+        if isinstance(item_ids.dtype, pd.CategoricalDtype):
+            codes = item_ids.cat.codes.to_numpy()
+            categories = item_ids.cat.categories
+        else:
+            codes, categories = pd.factorize(item_ids, sort=True)
+
+        if len(codes) and (np.diff(codes) < 0).any():
+            raise ValueError("History frame must be sorted by item_id and date")
+
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        self.starts = np.concatenate([[0], boundaries]).astype(np.int64) if len(codes) else np.zeros(0, np.int64)
+        self.stops = np.concatenate([boundaries, [len(codes)]]).astype(np.int64) if len(codes) else np.zeros(0, np.int64)
+        self.item_ids: List[str] = [str(categories[code]) for code in codes[self.starts]]
+        self._positions: Dict[str, int] = {item_id: i for i, item_id in enumerate(self.item_ids)}
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._positions
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self.stops - self.starts
+
+    def bounds(self, item_id: str) -> Tuple[int, int]:
+        position = self._positions[item_id]
+        return int(self.starts[position]), int(self.stops[position])
+
+    def slice(self, item_id: str) -> pd.DataFrame:
+        """Rows for one item as a positional slice (no boolean mask)"""
+        start, stop = self.bounds(item_id)
+        return self.frame.iloc[start:stop]
+
+    def column(self, column: str) -> np.ndarray:
+        """Whole column as a NumPy array, cached for repeated slicing"""
+        if column not in self._columns:
+            self._columns[column] = self.frame[column].to_numpy()
+        return self._columns[column]
+
+    def values(self, item_id: str, column: str) -> np.ndarray:
+        """One item's values for a column as a view into the column array"""
+        start, stop = self.bounds(item_id)
+        return self.column(column)[start:stop]
+
+    def matrix(self, columns: Sequence[str], dtype=float) -> np.ndarray:
+        """Several columns stacked as a (rows, columns) array"""
+        return np.column_stack([self.column(column).astype(dtype, copy=False) for column in columns])
+
+    def iter_slices(self) -> Iterator[Tuple[str, int, int]]:
+        for item_id, start, stop in zip(self.item_ids, self.starts, self.stops):
+            yield item_id, int(start), int(stop)
+
+    def group_positions(self) -> np.ndarray:
+        """Position of every row within its item's history"""
+        row_starts = np.repeat(self.starts, self.lengths)
+        return np.arange(len(row_starts)) - row_starts
+
+    def group_reduce(self, values: np.ndarray, ufunc=np.add) -> np.ndarray:
+        """Per-item reduction of a row-aligned array in one pass"""
+        if len(self.starts) == 0:
+            return np.zeros(0)
+        return ufunc.reduceat(values, self.starts)
+
+def grouped_lag(values: np.ndarray, positions: np.ndarray, lag: int) -> np.ndarray:
+    """Shift values by lag within each item (NaN where history is too short)"""
+    lagged = np.full(len(values), np.nan)
+    if lag < len(values):
+        lagged[lag:] = values[:len(values) - lag]
+    lagged[positions < lag] = np.nan
+    return lagged
+
+def grouped_rolling_mean_std(values: np.ndarray, positions: np.ndarray, index: ItemHistoryIndex,
+                             window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Trailing rolling mean and sample std within each item, vectorized over all rows"""
+    # Center by item mean so cumulative sums stay small and precise
+    item_means = index.group_reduce(values) / np.maximum(index.lengths, 1)
+    centered = values - np.repeat(item_means, index.lengths)
+
+    cumsum = np.concatenate([[0.0], np.cumsum(centered)])
+    cumsq = np.concatenate([[0.0], np.cumsum(centered * centered)])
+
+    n = len(values)
+    rows = np.arange(n)
+    lower = np.maximum(rows + 1 - window, 0)
+    window_sum = cumsum[rows + 1] - cumsum[lower]
+    window_sq = cumsq[rows + 1] - cumsq[lower]
+
+    mean = window_sum / window + np.repeat(item_means, index.lengths)
+    if window > 1:
+        variance = np.maximum(window_sq - window_sum * window_sum / window, 0.0) / (window - 1)
+        std = np.sqrt(variance)
+    else:
+        std = np.full(n, np.nan)
+
+    incomplete = positions < window - 1
+    mean[incomplete] = np.nan
+    std[incomplete] = np.nan
+    return mean, std
+
+# Export main components
+__all__ = [
+    'ItemHistoryIndex',
+    'compact_history_frame',
+    'is_sorted_by_item_date',
+    'sort_by_item_date',
+    'frame_memory_bytes',
+    'grouped_lag',
+    'grouped_rolling_mean_std'
+]
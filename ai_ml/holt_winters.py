@@ -0,0 +1,164 @@
+"""
+Vectorized Holt-Winters State Engine for Demand Forecasting
+
+This module implements:
+- Additive Holt-Winters smoothing as a state-space recursion
+- A single seasonal state vector per series (no per-step copies)
+- Fitted values and residuals computed inline during the recursion
+- One recursion over a whole (items x days) matrix of series
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence
+from dataclasses import dataclass
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALPHA = 0.3  # Level smoothing
+DEFAULT_BETA = 0.1   # Trend smoothing
+DEFAULT_GAMMA = 0.1  # Seasonal smoothing
+MAX_SEASON_LENGTH = 7  # Weekly pattern
+
+@dataclass
+class HoltWintersState:
+    level: np.ndarray       # (items,)
+    trend: np.ndarray       # (items,)
+    seasonal: np.ndarray    # (season_length, items)
+    residuals: np.ndarray   # (items, days) in-sample residuals
+    residual_std: np.ndarray  # (items,)
+    n_obs: int
+    alpha: float
+    beta: float
+    gamma: float
+    snapshots: Optional[Dict[str, np.ndarray]] = None  # States at requested origins
+
+    @property
+    def season_length(self) -> int:
+        return self.seasonal.shape[0]
+
+def season_length_for(n_obs: int) -> int:
+    """Weekly season, shortened for series under two weeks long"""
+    return min(MAX_SEASON_LENGTH, n_obs // 2)
+
+def fit_holt_winters(values: np.ndarray, alpha: float = DEFAULT_ALPHA, beta: float = DEFAULT_BETA,
+                     gamma: float = DEFAULT_GAMMA, season_length: Optional[int] = None,
+                     init_length: Optional[int] = None,
+                     snapshot_at: Optional[Sequence[int]] = None) -> HoltWintersState:
+    """
+    Run the smoothing recursion over every row of a (items x days) matrix at once.
+
+    A 1-D array is treated as a single series. Seasonal factors are initialised
+    from the first init_length days (default: all). snapshot_at lists origins o;
+    the state after consuming days [0, o) is recorded for each, so forecasts from
+    every rolling origin come out of one pass.
+    """
+    matrix = np.atleast_2d(np.asarray(values, dtype=float))
+    n_items, n_obs = matrix.shape
+    if n_obs == 0:
+        raise ValueError("Holt-Winters needs at least one observation per series")
+
+    m = season_length_for(n_obs) if season_length is None else season_length
+
+    # Time-major copy so every step reads one contiguous row
+    series = np.ascontiguousarray(matrix.T)
+
+    level = series[0].copy()
+    trend = series[1] - series[0] if n_obs >= 2 else np.zeros(n_items)
+
+    init_rows = series if init_length is None else series[:init_length]
+    seasonal = np.zeros((m, n_items))
+    for i in range(m):
+        seasonal[i] = init_rows[i::m].mean(axis=0)
+    if m:
+        seasonal -= seasonal.mean(axis=0)
+
+    residuals = np.empty((n_obs, n_items))
+    residuals[0] = 0.0  # The first fitted value is the initial level itself
+
+    origins = sorted(set(snapshot_at)) if snapshot_at is not None else []
+    snapshots = None
+    if origins:
+        snapshots = {
+            'origin': np.array(origins),
+            'level': np.empty((len(origins), n_items)),
+            'trend': np.empty((len(origins), n_items)),
+            'seasonal': np.empty((len(origins), m, n_items))
+        }
+    next_snapshot = 0
+
+    for i in range(1, n_obs + 1):
+        # State after days [0, i) is complete here
+        while next_snapshot < len(origins) and origins[next_snapshot] == i:
+            snapshots['level'][next_snapshot] = level
+            snapshots['trend'][next_snapshot] = trend
+            snapshots['seasonal'][next_snapshot] = seasonal
+            next_snapshot += 1
+        if i == n_obs:
+            break
+
+        observed = series[i]
+        previous_level = level
+        if m:
+            season = seasonal[(i - 1) % m]
+            level = alpha * (observed - season) + (1 - alpha) * (level + trend)
+            trend = beta * (level - previous_level) + (1 - beta) * trend
+            season *= (1 - gamma)
+            season += gamma * (observed - level)
+            residuals[i] = observed - (level + season)
+        else:
+            level = alpha * observed + (1 - alpha) * (level + trend)
+            trend = beta * (level - previous_level) + (1 - beta) * trend
+            residuals[i] = observed - level
+
+    residuals = residuals.T
+    return HoltWintersState(
+        level=level,
+        trend=trend,
+        seasonal=seasonal,
+        residuals=residuals,
+        residual_std=residuals.std(axis=1),
+        n_obs=n_obs,
+        alpha=alpha,
+        beta=beta,
+        gamma=gamma,
+        snapshots=snapshots
+    )
+
+def holt_winters_forecast(state: HoltWintersState, steps: int) -> np.ndarray:
+    """Non-negative (items x steps) point forecasts from a fitted state"""
+    horizons = np.arange(1, steps + 1)
+    forecasts = state.level[:, None] + horizons[None, :] * state.trend[:, None]
+    if state.season_length:
+        season_idx = (state.n_obs + horizons - 1) % state.season_length
+        forecasts = forecasts + state.seasonal[season_idx].T
+    return np.maximum(forecasts, 0)
+
+def holt_winters_snapshot_forecasts(state: HoltWintersState, steps: int) -> np.ndarray:
+    """Non-negative (items x origins x steps) forecasts from every recorded origin"""
+    snapshots = state.snapshots
+    horizons = np.arange(1, steps + 1)
+    forecasts = snapshots['level'].T[:, :, None] + horizons * snapshots['trend'].T[:, :, None]
+    if state.season_length:
+        season_idx = (snapshots['origin'][:, None] + horizons[None, :] - 1) % state.season_length
+        origin_idx = np.arange(len(snapshots['origin']))[:, None]
+        # seasonal[origin, season_idx, item] -> (origins, steps, items)
+        forecasts = forecasts + snapshots['seasonal'][origin_idx, season_idx].transpose(2, 0, 1)
+    return np.maximum(forecasts, 0)
+
+def holt_winters_intervals(state: HoltWintersState, forecasts: np.ndarray, z: float = 1.96):
+    """Prediction intervals that widen with the forecast horizon"""
+    error_multiplier = np.sqrt(1 + np.arange(forecasts.shape[1]) * 0.1)
+    half_width = z * state.residual_std[:, None] * error_multiplier[None, :]
+    return np.maximum(forecasts - half_width, 0), forecasts + half_width
+
+# Export main components
+__all__ = [
+    'HoltWintersState',
+    'fit_holt_winters',
+    'holt_winters_forecast',
+    'holt_winters_intervals',
+    'holt_winters_snapshot_forecasts',
+    'season_length_for'
+]
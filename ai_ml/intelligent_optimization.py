@@ -3,20 +3,46 @@ Intelligent Optimization Module for Hospital Supply Chain
 
 This module implements advanced optimization algorithms:
 - Multi-objective optimization for cost, service level, and risk
-- Genetic algorithms for complex constraint problems
-- Simulated annealing for global optimization
+- Genetic algorithms for complex constraint problems, with the population
+  evaluated as one (population x items x parameters) array
+- Closed-form (s, Q) policies (EOQ plus service-level safety stock) for the
+  whole catalogue in one pass, used directly for cost minimization and as a
+  warm start for the search methods
+- Lagrangian decomposition of the coupled investment / storage constraints
+  into per-item subproblems solved for the whole catalogue at once, with
+  subgradient updates of the multipliers
+- Island-model genetic algorithm over a process pool, with periodic elite
+  migration and deterministic per-island seeding
+- Simulated annealing with per-item delta evaluation of the objective
+- Optimization history keyed by an input fingerprint: identical inputs reuse the
+  previous solution, and a run whose inputs partly changed starts from the
+  closest previous solution and searches only the changed items
+- Anytime runs with a time budget, stall-based early stopping, cancellation,
+  a best-so-far checkpoint and per-step progress callbacks
+- Service levels and safety stocks from the exact normal kernels shared with
+  forecasting and procurement (inventory_kernels)
 - Linear programming for resource allocation
 """
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, Optional, Tuple, Any, Union, Callable, Awaitable
 from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass
 from enum import Enum
 import random
 import json
+import os
+import asyncio
+import itertools
+import time
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from inventory_kernels import cycle_service_level, normal_ppf, safety_stock_for_service_level, MIN_PROBABILITY
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -56,6 +82,281 @@ class OptimizationSolution:
     computation_time: float
     generated_at: datetime
 
+HOLDING_RATE = 0.20  # Annual holding cost as a share of unit cost
+ORDER_COST = 50      # Cost per order
+COUPLED_CONSTRAINTS = ('max_total_investment', 'max_storage_space')  # Constraints summed over items
+SCALING_MARGIN = 1e-9  # Relative slack kept when scaling to a coupled limit, so rounding cannot overshoot it
+
+POLICY_FIELDS = ('reorder_point', 'order_quantity', 'safety_stock', 'max_stock_level',
+                 'review_period', 'service_level_target')
+REORDER_POINT, ORDER_QUANTITY, SAFETY_STOCK, MAX_STOCK_LEVEL, REVIEW_PERIOD, SERVICE_LEVEL_TARGET = range(len(POLICY_FIELDS))
+INPUT_FIELDS = ('annual_demand', 'demand_std', 'unit_cost', 'lead_time')  # Item inputs a policy is solved for
+
+def scale_to_limit(quantities: np.ndarray, limit: float) -> np.ndarray:
+    """
+    Shrink quantities (each at least 1) so they sum to just under `limit`: the part above
+    one unit is scaled uniformly. All ones when the limit cannot cover one unit each.
+    """
+    limit = limit * (1 - SCALING_MARGIN)
+    if quantities.sum() <= limit:
+        return quantities
+    excess = np.maximum(quantities - 1, 0.0)
+    room = limit - len(quantities)
+    if room <= 0 or excess.sum() <= 0:
+        return np.ones_like(quantities)
+    return 1 + excess * (room / excess.sum())
+
+def item_arrays(item_data: Dict[str, Dict[str, Any]], item_ids: List[str]) -> Dict[str, np.ndarray]:
+    """Per-item inputs of the objective as arrays aligned with item_ids (lead time in days)"""
+    infos = [item_data.get(item_id, {}) for item_id in item_ids]
+    annual_demand = np.array([info.get('annual_demand', 1000) for info in infos], dtype=float)
+    return {
+        'annual_demand': annual_demand,
+        'unit_cost': np.array([info.get('unit_cost', 25) for info in infos], dtype=float),
+        'demand_std': np.array([info.get('demand_std', demand * 0.2) for info, demand in zip(infos, annual_demand)],
+                               dtype=float),
+        'lead_time': np.array([info.get('lead_time', 7) for info in infos], dtype=float)
+    }
+
+def input_matrix(items: Dict[str, np.ndarray]) -> np.ndarray:
+    """(items x INPUT_FIELDS) array of the arrays returned by item_arrays"""
+    return np.column_stack([items[field] for field in INPUT_FIELDS])
+
+def policies_to_array(policies: List[InventoryPolicy]) -> np.ndarray:
+    """(items x parameters) array in POLICY_FIELDS order"""
+    return np.array([[getattr(policy, field) for field in POLICY_FIELDS] for policy in policies],
+                    dtype=float).reshape(len(policies), len(POLICY_FIELDS))
+
+def array_to_policies(item_ids: List[str], parameters: np.ndarray) -> List[InventoryPolicy]:
+    return [
+        InventoryPolicy(
+            item_id=item_id,
+            reorder_point=float(row[REORDER_POINT]),
+            order_quantity=float(row[ORDER_QUANTITY]),
+            safety_stock=float(row[SAFETY_STOCK]),
+            max_stock_level=float(row[MAX_STOCK_LEVEL]),
+            review_period=int(row[REVIEW_PERIOD]),
+            service_level_target=float(row[SERVICE_LEVEL_TARGET])
+        )
+        for item_id, row in zip(item_ids, parameters.tolist())
+    ]
+
+@dataclass
+class OptimizationHistoryEntry:
+    solution_id: str
+    objective: OptimizationObjective
+    constraints_key: Tuple
+    requested_method: str    # Method asked for ("auto" or a specific one); reuse needs the same
+    optimization_method: str
+    objective_value: float
+    item_ids: List[str]
+    inputs: np.ndarray       # (items x INPUT_FIELDS) the solution was solved for
+    parameters: np.ndarray   # (items x POLICY_FIELDS) solved policies
+    fingerprint: str         # Hash of objective, constraints, method, item ids and inputs
+    recorded_at: datetime
+
+@dataclass
+class WarmStart:
+    entry: OptimizationHistoryEntry
+    unchanged: np.ndarray    # Items whose inputs equal the entry's
+    parameters: np.ndarray   # The entry's policies for unchanged items, NaN rows elsewhere
+
+@dataclass
+class OptimizationProgress:
+    run_id: str
+    method: str
+    step: int                       # Generation (GA, island model) or iteration (SA)
+    best_objective: float
+    elapsed_seconds: float
+    stalled_steps: int
+    finished: bool = False
+    stop_reason: Optional[str] = None  # completed, time_budget, converged or cancelled
+
+ProgressCallback = Callable[[OptimizationProgress], Optional[Awaitable[None]]]
+
+class OptimizationRun:
+    """
+    Control handle of an anytime optimization run.
+    
+    The search methods report every step (a GA generation, an island epoch or
+    report_interval SA iterations); the run checkpoints the best solution so far,
+    forwards progress to the callback and tells the method when to stop: on
+    cancel(), when time_budget seconds have passed, or after stall_steps steps
+    without improvement. With a time budget the method's own generation or
+    iteration limit is lifted.
+    """
+    
+    def __init__(self, run_id: Optional[str] = None, time_budget: Optional[float] = None,
+                 stall_steps: Optional[int] = None, progress_callback: Optional[ProgressCallback] = None,
+                 report_interval: int = 100, min_improvement: float = 1e-6, progress_interval: float = 0.0):
+        self.run_id = run_id or f"RUN_{uuid.uuid4().hex[:12]}"
+        self.time_budget = time_budget
+        self.stall_steps = stall_steps
+        self.progress_callback = progress_callback
+        self.report_interval = report_interval  # SA iterations per reported step
+        self.min_improvement = min_improvement  # Relative gain that resets the stall counter
+        self.progress_interval = progress_interval  # Minimum seconds between callbacks; the final one always fires
+        self._last_notified: Optional[float] = None
+        self.method: Optional[str] = None
+        self.item_ids: List[str] = []
+        self.created_at = datetime.now()
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self.step = 0
+        self.best_objective = float('inf')
+        self.best_parameters: Optional[np.ndarray] = None  # Checkpoint, (items x parameters)
+        self.objective_history: List[float] = []  # Best objective per step
+        self.stalled_steps = 0
+        self.cancelled = False
+        self.stop_reason: Optional[str] = None
+        self.solution: Optional[OptimizationSolution] = None
+    
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+    
+    @property
+    def finished(self) -> bool:
+        return self.solution is not None
+    
+    @property
+    def time_budgeted(self) -> bool:
+        return self.time_budget is not None
+    
+    def cancel(self):
+        """Ask the method to stop at its next step and return the best solution so far"""
+        self.cancelled = True
+    
+    def start(self, method: str, item_ids: List[str]):
+        self.method = method
+        self.item_ids = item_ids
+        self._started = time.perf_counter()
+    
+    def checkpoint_policies(self) -> List[InventoryPolicy]:
+        """Best policies found so far"""
+        if self.best_parameters is None:
+            return []
+        return array_to_policies(self.item_ids, self.best_parameters)
+    
+    def _progress(self) -> OptimizationProgress:
+        return OptimizationProgress(
+            run_id=self.run_id,
+            method=self.method or "",
+            step=self.step,
+            best_objective=self.best_objective,
+            elapsed_seconds=self.elapsed_seconds,
+            stalled_steps=self.stalled_steps,
+            finished=self.finished,
+            stop_reason=self.stop_reason
+        )
+    
+    async def _notify(self):
+        now = time.perf_counter()
+        if self.progress_callback is None or (not self.finished and self._last_notified is not None
+                                              and now - self._last_notified < self.progress_interval):
+            return
+        self._last_notified = now
+        result = self.progress_callback(self._progress())
+        if asyncio.iscoroutine(result):
+            await result
+    
+    async def report(self, step: int, best_objective: float, best_parameters: np.ndarray) -> bool:
+        """
+        Record a finished step; returns True when the method should stop.
+        
+        best_parameters is kept as the checkpoint without copying, so methods pass
+        an array they no longer modify.
+        """
+        threshold = self.best_objective - self.min_improvement * max(1.0, abs(self.best_objective)) \
+            if np.isfinite(self.best_objective) else float('inf')
+        if best_objective < threshold or self.best_parameters is None:
+            self.stalled_steps = 0
+        else:
+            self.stalled_steps += 1
+        if best_objective <= self.best_objective or self.best_parameters is None:
+            self.best_objective = float(best_objective)
+            self.best_parameters = best_parameters
+        self.step = step
+        self.objective_history.append(self.best_objective)
+        
+        if self.cancelled:
+            self.stop_reason = "cancelled"
+        elif self.time_budget is not None and self.elapsed_seconds >= self.time_budget:
+            self.stop_reason = "time_budget"
+        elif self.stall_steps is not None and self.stalled_steps >= self.stall_steps:
+            self.stop_reason = "converged"
+        await self._notify()
+        
+        # Yield to the event loop so progress is sent and cancellation can arrive
+        await asyncio.sleep(0)
+        if self.cancelled and self.stop_reason is None:
+            self.stop_reason = "cancelled"
+        return self.stop_reason is not None
+    
+    async def finish(self, solution: OptimizationSolution):
+        self._finished = time.perf_counter()
+        self.stop_reason = self.stop_reason or "completed"
+        self.best_objective = solution.objective_value
+        self.solution = solution
+        await self._notify()
+    
+    def status(self) -> Dict[str, Any]:
+        best = self.best_objective if np.isfinite(self.best_objective) else None
+        return {
+            'run_id': self.run_id,
+            'method': self.method,
+            'step': self.step,
+            'best_objective': best,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'time_budget': self.time_budget,
+            'stalled_steps': self.stalled_steps,
+            'finished': self.finished,
+            'cancelled': self.cancelled,
+            'stop_reason': self.stop_reason,
+            'objective_history': [value if np.isfinite(value) else None for value in self.objective_history],
+            'solution_id': self.solution.solution_id if self.solution else None
+        }
+
+@dataclass
+class _Island:
+    """One subpopulation of the island-model GA, shipped to a worker process per epoch"""
+    population: np.ndarray
+    fitness: np.ndarray
+    rng: np.random.Generator
+    best: np.ndarray
+    best_fitness: float
+
+def _evolve_island(island: _Island, items: Dict[str, np.ndarray], objective: 'OptimizationObjective',
+                   constraints: List['OptimizationConstraint'], rates: Tuple[float, float],
+                   generations: int, immigrants: Optional[np.ndarray],
+                   mutable: Optional[np.ndarray] = None) -> _Island:
+    """Replace an island's worst individuals with immigrants and evolve it for some generations"""
+    optimizer = _worker_optimizer()
+    optimizer.mutation_rate, optimizer.crossover_rate = rates
+    if immigrants is not None and len(immigrants):
+        worst = np.argsort(island.fitness, kind='stable')[len(island.fitness) - len(immigrants):]
+        island.population[worst] = immigrants
+        island.fitness[worst] = optimizer.evaluate_population(island.population[worst], items, objective, constraints)
+
+    for _ in range(generations):
+        island.population = optimizer.next_generation(island.population, island.fitness, island.rng, mutable)
+        island.fitness = optimizer.evaluate_population(island.population, items, objective, constraints)
+        best_idx = int(np.argmin(island.fitness))
+        if island.fitness[best_idx] < island.best_fitness:
+            island.best_fitness = float(island.fitness[best_idx])
+            island.best = island.population[best_idx].copy()
+    return island
+
+_island_optimizer = None
+
+def _worker_optimizer() -> 'IntelligentOptimizer':
+    global _island_optimizer
+    if _island_optimizer is None:
+        _island_optimizer = IntelligentOptimizer()
+    return _island_optimizer
+
 class IntelligentOptimizer:
     """
     Advanced optimization engine for hospital supply chain management
@@ -66,15 +367,117 @@ class IntelligentOptimizer:
         self.generations = 100
         self.mutation_rate = 0.1
         self.crossover_rate = 0.8
-        self.optimization_history = []
+        self.optimization_history: List[OptimizationHistoryEntry] = []
+        self.max_history_entries = 10
+        self.runs: "OrderedDict[str, OptimizationRun]" = OrderedDict()
+        self.max_tracked_runs = 20
+        self._registry_lock = threading.Lock()  # History and runs are shared by runs on job threads
         logger.info("Intelligent Optimizer initialized")
     
+    def create_run(self, time_budget: Optional[float] = None, stall_steps: Optional[int] = 20,
+                   progress_callback: Optional[ProgressCallback] = None, **kwargs) -> OptimizationRun:
+        """New anytime run handle, tracked until max_tracked_runs newer runs exist"""
+        run = OptimizationRun(time_budget=time_budget, stall_steps=stall_steps,
+                              progress_callback=progress_callback, **kwargs)
+        with self._registry_lock:
+            self.runs[run.run_id] = run
+            while len(self.runs) > self.max_tracked_runs:
+                self.runs.popitem(last=False)
+        return run
+    
+    def get_run(self, run_id: str) -> Optional[OptimizationRun]:
+        with self._registry_lock:
+            return self.runs.get(run_id)
+    
+    def cancel_run(self, run_id: str) -> bool:
+        run = self.get_run(run_id)
+        if run is None or run.finished:
+            return False
+        run.cancel()
+        return True
+    
+    def _history_key(self, constraints: List[OptimizationConstraint]) -> Tuple:
+        return tuple(sorted((c.constraint_type, float(c.target_value), float(c.tolerance), float(c.weight))
+                            for c in constraints))
+    
+    def input_fingerprint(self, item_ids: List[str], items: Dict[str, np.ndarray],
+                          objective: OptimizationObjective, constraints: List[OptimizationConstraint],
+                          method: str = "auto") -> str:
+        """Content hash of everything a solution depends on"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((objective.value, self._history_key(constraints), method)).encode())
+        digest.update('\0'.join(item_ids).encode())
+        digest.update(np.ascontiguousarray(input_matrix(items)).tobytes())
+        return digest.hexdigest()
+    
+    def record_solution(self, solution: OptimizationSolution, item_ids: List[str], items: Dict[str, np.ndarray],
+                        objective: OptimizationObjective, constraints: List[OptimizationConstraint],
+                        method: str = "auto") -> Optional[OptimizationHistoryEntry]:
+        """
+        Keep a finished solution with the inputs and requested method it was solved for.
+        
+        Feasibility is checked against these constraints rather than trusted from the
+        solution (methods that ignore constraints report it against none); infeasible
+        solutions are not kept.
+        """
+        parameters = policies_to_array(solution.policies)
+        if not self.constraints_matrix(parameters[None], constraints)[0]:
+            return None
+        entry = OptimizationHistoryEntry(
+            solution_id=solution.solution_id,
+            objective=objective,
+            constraints_key=self._history_key(constraints),
+            requested_method=method,
+            optimization_method=solution.optimization_method,
+            objective_value=solution.objective_value,
+            item_ids=list(item_ids),
+            inputs=input_matrix(items),
+            parameters=parameters,
+            fingerprint=self.input_fingerprint(item_ids, items, objective, constraints, method),
+            recorded_at=datetime.now()
+        )
+        with self._registry_lock:
+            self.optimization_history.append(entry)
+            del self.optimization_history[:-self.max_history_entries]
+        return entry
+    
+    def find_warm_start(self, item_ids: List[str], items: Dict[str, np.ndarray], objective: OptimizationObjective,
+                        constraints: List[OptimizationConstraint], method: str = "auto") -> Optional[WarmStart]:
+        """
+        Closest previous solution for the same objective, constraints and requested method:
+        the most recent one with the most items whose inputs are unchanged. None when no
+        item matches.
+        """
+        key = self._history_key(constraints)
+        with self._registry_lock:
+            history = list(self.optimization_history)
+        candidates = [entry for entry in reversed(history)
+                      if entry.objective == objective and entry.constraints_key == key
+                      and entry.requested_method == method]
+        if not candidates:
+            return None
+        
+        fingerprint = self.input_fingerprint(item_ids, items, objective, constraints, method)
+        inputs = input_matrix(items)
+        best = None
+        for entry in candidates:
+            if entry.fingerprint == fingerprint:
+                return WarmStart(entry, np.ones(len(item_ids), dtype=bool), entry.parameters.copy())
+            positions = {item_id: i for i, item_id in enumerate(entry.item_ids)}
+            rows = np.array([positions.get(item_id, -1) for item_id in item_ids], dtype=int)
+            unchanged = (rows >= 0) & (entry.inputs[rows] == inputs).all(axis=1)
+            if unchanged.any() and (best is None or unchanged.sum() > best.unchanged.sum()):
+                parameters = np.full((len(item_ids), len(POLICY_FIELDS)), np.nan)
+                parameters[unchanged] = entry.parameters[rows[unchanged]]
+                best = WarmStart(entry, unchanged, parameters)
+        return best
+    
     def calculate_holding_cost(self, avg_inventory: float, unit_cost: float, 
-                             holding_rate: float = 0.20) -> float:
+                             holding_rate: float = HOLDING_RATE) -> float:
         """Calculate holding cost for inventory"""
         return avg_inventory * unit_cost * holding_rate
     
-    def calculate_ordering_cost(self, orders_per_year: float, cost_per_order: float = 50) -> float:
+    def calculate_ordering_cost(self, orders_per_year: float, cost_per_order: float = ORDER_COST) -> float:
         """Calculate annual ordering cost"""
         return orders_per_year * cost_per_order
     
@@ -86,96 +489,110 @@ class IntelligentOptimizer:
     def calculate_service_level(self, safety_stock: float, demand_std: float,
                               lead_time: float) -> float:
         """Calculate service level based on safety stock"""
-        if demand_std == 0:
-            return 0.99
-        
-        # Using normal distribution approximation
-        z_score = safety_stock / (demand_std * np.sqrt(lead_time))
-        
-        # Approximate normal CDF
-        if z_score > 3:
-            return 0.9999
-        elif z_score < -3:
-            return 0.0001
-        else:
-            # Simplified normal CDF approximation
-            return 0.5 * (1 + np.tanh(z_score * 0.8))
+        return float(self.service_level_matrix(np.asarray(safety_stock, dtype=float),
+                                               np.asarray(demand_std, dtype=float),
+                                               np.asarray(lead_time, dtype=float)))
+    
+    def service_level_matrix(self, safety_stock: np.ndarray, demand_std: np.ndarray,
+                             lead_time: np.ndarray) -> np.ndarray:
+        """Cycle service level for broadcastable arrays of safety stock, demand std and lead time (days)"""
+        # Exact normal CDF of the safety stock in lead-time standard deviations
+        return cycle_service_level(safety_stock, demand_std, lead_time)
     
-    def objective_function(self, policies: List[InventoryPolicy], 
+    def service_level_z_score(self, service_level: np.ndarray) -> np.ndarray:
+        """z-score at which service_level_matrix reaches the given service level"""
+        return normal_ppf(np.clip(service_level, MIN_PROBABILITY, 1 - MIN_PROBABILITY))
+    
+    def objective_function(self, policies: List[InventoryPolicy],
                           item_data: Dict[str, Any],
                           objective: OptimizationObjective) -> float:
         """Calculate objective function value"""
-        total_cost = 0
-        total_service_level = 0
-        total_waste = 0
+        items = item_arrays(item_data, [policy.item_id for policy in policies])
+        return float(self.objective_matrix(policies_to_array(policies)[None], items, objective)[0])
+    
+    def objective_matrix(self, population: np.ndarray, items: Dict[str, np.ndarray],
+                         objective: OptimizationObjective) -> np.ndarray:
+        """
+        Objective value of every individual of a (population x items x parameters) array.
         
-        for policy in policies:
-            item_info = item_data.get(policy.item_id, {})
-            
-            annual_demand = item_info.get('annual_demand', 1000)
-            unit_cost = item_info.get('unit_cost', 25)
-            demand_std = item_info.get('demand_std', annual_demand * 0.2)
-            lead_time = item_info.get('lead_time', 7) / 365  # Convert to years
-            
-            # Calculate costs
-            avg_inventory = policy.order_quantity / 2 + policy.safety_stock
-            holding_cost = self.calculate_holding_cost(avg_inventory, unit_cost)
-            
-            orders_per_year = annual_demand / policy.order_quantity
-            ordering_cost = self.calculate_ordering_cost(orders_per_year)
-            
-            # Service level
-            service_level = self.calculate_service_level(
-                policy.safety_stock, demand_std, lead_time * 365
-            )
-            
-            # Waste (excess inventory)
-            waste = max(0, avg_inventory - annual_demand / 12)  # Monthly excess
-            
-            total_cost += holding_cost + ordering_cost
-            total_service_level += service_level
-            total_waste += waste * unit_cost
+        items holds the item_arrays of the population's items, in the same order.
+        """
+        return self.item_objective_matrix(population, items, objective).sum(axis=-1)
+    
+    def item_objective_matrix(self, policies: np.ndarray, items: Dict[str, np.ndarray],
+                              objective: OptimizationObjective, n_items: Optional[int] = None) -> np.ndarray:
+        """
+        Per-item contributions (... x items) to the objective of (... x items x parameters)
+        policies; summed over items they give objective_matrix.
+        
+        Every objective separates by item, the service-level average through its 1 / n_items
+        weight, so a subset of items can be re-scored on its own by passing the subset's
+        items and the full n_items.
+        """
+        annual_demand, unit_cost = items['annual_demand'], items['unit_cost']
+        order_quantity = policies[..., ORDER_QUANTITY]
+        safety_stock = policies[..., SAFETY_STOCK]
+        if n_items is None:
+            n_items = policies.shape[-2]
         
-        # Normalize metrics
-        avg_service_level = total_service_level / len(policies) if policies else 0
+        # Calculate costs
+        avg_inventory = order_quantity / 2 + safety_stock
+        if objective in (OptimizationObjective.MINIMIZE_WASTE, OptimizationObjective.BALANCE_ALL):
+            # Waste (excess inventory over a month of demand)
+            waste = np.maximum(0, avg_inventory - annual_demand / 12) * unit_cost
+        if objective == OptimizationObjective.MINIMIZE_WASTE:
+            return waste
+        
+        if objective in (OptimizationObjective.MAXIMIZE_SERVICE_LEVEL, OptimizationObjective.BALANCE_ALL):
+            service_level = self.service_level_matrix(safety_stock, items['demand_std'], items['lead_time'])
+            service_share = service_level / n_items if n_items else service_level
+        if objective == OptimizationObjective.MAXIMIZE_SERVICE_LEVEL:
+            return -service_share  # Negative for minimization
+        
+        holding_cost = self.calculate_holding_cost(avg_inventory, unit_cost)
+        ordering_cost = self.calculate_ordering_cost(annual_demand / order_quantity)
+        cost = holding_cost + ordering_cost
         
         # Multi-objective optimization
-        if objective == OptimizationObjective.MINIMIZE_COST:
-            return total_cost
-        elif objective == OptimizationObjective.MAXIMIZE_SERVICE_LEVEL:
-            return -avg_service_level  # Negative for minimization
-        elif objective == OptimizationObjective.MINIMIZE_WASTE:
-            return total_waste
-        elif objective == OptimizationObjective.BALANCE_ALL:
+        if objective == OptimizationObjective.BALANCE_ALL:
             # Weighted combination
-            normalized_cost = total_cost / 100000  # Scale factor
-            normalized_service = (1 - avg_service_level)
-            normalized_waste = total_waste / 10000  # Scale factor
+            normalized_cost = cost / 100000  # Scale factor
+            normalized_service = (1 / n_items - service_share) if n_items else 0.0
+            normalized_waste = waste / 10000  # Scale factor
             
             return 0.4 * normalized_cost + 0.4 * normalized_service + 0.2 * normalized_waste
-        else:
-            return total_cost
+        return cost
     
     def check_constraints(self, policies: List[InventoryPolicy],
                          constraints: List[OptimizationConstraint]) -> bool:
         """Check if solution satisfies all constraints"""
+        return bool(self.constraints_matrix(policies_to_array(policies)[None], constraints)[0])
+    
+    def constraints_matrix(self, population: np.ndarray,
+                           constraints: List[OptimizationConstraint]) -> np.ndarray:
+        """Feasibility of every individual of a (population x items x parameters) array"""
+        feasible = np.ones(len(population), dtype=bool)
         for constraint in constraints:
             if constraint.constraint_type == "max_total_investment":
-                total_investment = sum(p.order_quantity * 25 for p in policies)  # Assume $25 per unit
-                if total_investment > constraint.target_value * (1 + constraint.tolerance):
-                    return False
+                total_investment = population[..., ORDER_QUANTITY].sum(axis=1) * 25  # Assume $25 per unit
+                feasible &= total_investment <= constraint.target_value * (1 + constraint.tolerance)
             
             elif constraint.constraint_type == "min_service_level":
-                avg_service_level = sum(p.service_level_target for p in policies) / len(policies)
-                if avg_service_level < constraint.target_value * (1 - constraint.tolerance):
-                    return False
+                avg_service_level = population[..., SERVICE_LEVEL_TARGET].mean(axis=1)
+                feasible &= avg_service_level >= constraint.target_value * (1 - constraint.tolerance)
             
             elif constraint.constraint_type == "max_storage_space":
-                total_space = sum(p.max_stock_level for p in policies)
-                if total_space > constraint.target_value * (1 + constraint.tolerance):
-                    return False
+                total_space = population[..., MAX_STOCK_LEVEL].sum(axis=1)
+                feasible &= total_space <= constraint.target_value * (1 + constraint.tolerance)
         
-        return True
+        return feasible
+    
+    def evaluate_population(self, population: np.ndarray, items: Dict[str, np.ndarray],
+                            objective: OptimizationObjective,
+                            constraints: List[OptimizationConstraint]) -> np.ndarray:
+        """Objective of every individual, infinite where a constraint is violated"""
+        fitness = self.objective_matrix(population, items, objective)
+        return np.where(self.constraints_matrix(population, constraints), fitness, np.inf)  # Penalty for constraint violation
     
     def generate_random_policy(self, item_id: str, item_data: Dict[str, Any]) -> InventoryPolicy:
         """Generate a random inventory policy for an item"""
@@ -227,10 +644,329 @@ class IntelligentOptimizer:
         
         return child1, child2
     
+    def analytical_policy_matrix(self, items: Dict[str, np.ndarray], service_level: float = 0.95,
+                                 constraints: List[OptimizationConstraint] = None) -> np.ndarray:
+        """
+        (items x parameters) continuous-review (s, Q) policies in closed form.
+        
+        Q is the economic order quantity, which minimizes holding plus ordering cost,
+        and the safety stock is the z-score of the target service level times the
+        lead-time demand std. Under max_total_investment / max_storage_space the
+        order quantities are scaled down uniformly to fit where possible.
+        """
+        if constraints is None:
+            constraints = []
+        annual_demand, unit_cost = items['annual_demand'], items['unit_cost']
+        lead_time = items['lead_time']
+        
+        for constraint in constraints:
+            if constraint.constraint_type == "min_service_level":
+                service_level = max(service_level, constraint.target_value)
+        service_level = min(max(service_level, 0.7), 0.99)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            order_quantity = np.sqrt(2 * annual_demand * ORDER_COST / (HOLDING_RATE * unit_cost))
+        order_quantity = np.maximum(1, np.nan_to_num(order_quantity, nan=1.0, posinf=annual_demand.max(initial=1)))
+        safety_stock = np.maximum(0, safety_stock_for_service_level(service_level, items['demand_std'], lead_time))
+        
+        policies = np.empty((len(annual_demand), len(POLICY_FIELDS)))
+        policies[:, ORDER_QUANTITY] = order_quantity
+        policies[:, SAFETY_STOCK] = safety_stock
+        policies[:, REVIEW_PERIOD] = 1  # Continuous review
+        policies[:, SERVICE_LEVEL_TARGET] = service_level
+        self._set_dependent_parameters(policies, items)
+        return self.fit_coupled_constraints(policies, items, constraints)
+    
+    def _set_dependent_parameters(self, policies: np.ndarray, items: Dict[str, np.ndarray]):
+        """Reorder point and max stock level of (s, Q) policies from their order quantity and safety stock"""
+        policies[..., REORDER_POINT] = policies[..., SAFETY_STOCK] + items['lead_time'] * items['annual_demand'] / 365
+        policies[..., MAX_STOCK_LEVEL] = policies[..., ORDER_QUANTITY] + policies[..., SAFETY_STOCK]
+    
+    def fit_coupled_constraints(self, policies: np.ndarray, items: Dict[str, np.ndarray],
+                                constraints: List[OptimizationConstraint]) -> np.ndarray:
+        """
+        Scale (s, Q) order quantities down uniformly to meet max_total_investment / max_storage_space
+        where possible; the result satisfies them unless one unit per item already exceeds a limit
+        """
+        order_quantity = policies[:, ORDER_QUANTITY]
+        safety_stock = policies[:, SAFETY_STOCK]
+        for constraint in constraints:
+            if constraint.constraint_type == "max_total_investment":
+                budget = constraint.target_value * (1 + constraint.tolerance) / 25  # Assume $25 per unit
+                order_quantity = scale_to_limit(order_quantity, budget)
+        for constraint in constraints:
+            if constraint.constraint_type == "max_storage_space":
+                space = constraint.target_value * (1 + constraint.tolerance) - safety_stock.sum()
+                if space > 0:
+                    order_quantity = scale_to_limit(order_quantity, space)
+        
+        policies = policies.copy()
+        policies[:, ORDER_QUANTITY] = order_quantity
+        self._set_dependent_parameters(policies, items)
+        coupled = [constraint for constraint in constraints if constraint.constraint_type in COUPLED_CONSTRAINTS]
+        if not self.constraints_matrix(policies[None], coupled)[0]:
+            logger.debug("Coupled constraints cannot be met even at one unit per order")
+        return policies
+    
+    async def analytical_optimization(self, item_data: Dict[str, Dict[str, Any]],
+                                      objective: OptimizationObjective,
+                                      constraints: List[OptimizationConstraint] = None,
+                                      service_level: float = 0.95,
+                                      run: Optional[OptimizationRun] = None) -> OptimizationSolution:
+        """Closed-form (s, Q) policies for every item, scored under the given objective"""
+        logger.info("Running analytical (s, Q) optimization")
+        start_time = datetime.now()
+        
+        if constraints is None:
+            constraints = []
+        
+        item_ids = list(item_data.keys())
+        items = item_arrays(item_data, item_ids)
+        policies = self.analytical_policy_matrix(items, service_level, constraints)
+        objective_value = float(self.objective_matrix(policies[None], items, objective)[0])
+        
+        solution = self._array_solution("SQ", "Analytical (s, Q)", item_ids, items, policies, objective_value,
+                                        constraints, start_time)
+        if run is not None:
+            run.start(solution.optimization_method, item_ids)
+            await run.report(1, objective_value, policies)
+            await run.finish(solution)
+        return solution
+    
+    def _coupled_limits(self, constraints: List[OptimizationConstraint]) -> List[Tuple[int, float]]:
+        """(policy column summed by the constraint, limit on that sum) per coupled constraint"""
+        limits = []
+        for constraint in constraints:
+            limit = constraint.target_value * (1 + constraint.tolerance)
+            if constraint.constraint_type == "max_total_investment":
+                limits.append((ORDER_QUANTITY, limit / 25))  # Assume $25 per unit
+            elif constraint.constraint_type == "max_storage_space":
+                limits.append((MAX_STOCK_LEVEL, limit))
+        return limits
+    
+    def _best_column(self, policies: np.ndarray, items: Dict[str, np.ndarray], objective: OptimizationObjective,
+                     penalties: List[Tuple[int, float]], column: int, candidates: np.ndarray) -> np.ndarray:
+        """Per item, the candidate value of one column minimizing its penalized objective contribution"""
+        population = np.repeat(policies[None], len(candidates), axis=0)
+        population[..., column] = candidates
+        self._set_dependent_parameters(population, items)
+        cost = self.item_objective_matrix(population, items, objective)
+        for penalized_column, price in penalties:
+            cost += price * population[..., penalized_column]
+        return candidates[np.argmin(cost, axis=0), np.arange(policies.shape[0])]
+    
+    def solve_item_subproblems(self, policies: np.ndarray, items: Dict[str, np.ndarray],
+                               objective: OptimizationObjective, penalties: List[Tuple[int, float]],
+                               optimize_safety_stock: bool = True, rounds: int = 2) -> np.ndarray:
+        """
+        Minimize every item's objective contribution plus priced constraint usage independently.
+        
+        Order quantity (geometric grid over 1 unit to a year of demand) and safety stock
+        (linear grid over 0 to 4 lead-time demand stds) are set by coordinate descent,
+        each as a coarse grid search refined around its best point, for all items at once.
+        """
+        policies = policies.copy()
+        annual_demand = items['annual_demand']
+        lead_time_std = items['demand_std'] * np.sqrt(items['lead_time'])
+        coarse_steps, fine_steps = 64, 17
+        
+        quantity_grid = np.geomspace(1.0, np.maximum(annual_demand, 2.0), coarse_steps)
+        quantity_ratio = np.maximum(annual_demand, 2.0) ** (1 / (coarse_steps - 1))
+        stock_grid = np.linspace(0.0, 4 * lead_time_std, coarse_steps)
+        stock_step = 4 * lead_time_std / (coarse_steps - 1)
+        for _ in range(rounds):
+            quantity = self._best_column(policies, items, objective, penalties, ORDER_QUANTITY, quantity_grid)
+            quantity_fine = quantity * quantity_ratio ** np.linspace(-1, 1, fine_steps)[:, None]
+            policies[:, ORDER_QUANTITY] = self._best_column(policies, items, objective, penalties, ORDER_QUANTITY,
+                                                            np.maximum(1.0, quantity_fine))
+            if optimize_safety_stock:
+                stock = self._best_column(policies, items, objective, penalties, SAFETY_STOCK, stock_grid)
+                stock_fine = stock + stock_step * np.linspace(-1, 1, fine_steps)[:, None]
+                policies[:, SAFETY_STOCK] = self._best_column(policies, items, objective, penalties, SAFETY_STOCK,
+                                                              np.maximum(0.0, stock_fine))
+            self._set_dependent_parameters(policies, items)
+        return policies
+    
+    async def lagrangian_optimization(self, item_data: Dict[str, Dict[str, Any]],
+                                      objective: OptimizationObjective,
+                                      constraints: List[OptimizationConstraint] = None,
+                                      service_level: float = 0.95,
+                                      max_iterations: int = 60,
+                                      step_size: float = 1.0,
+                                      tolerance: float = 1e-3,
+                                      run: Optional[OptimizationRun] = None) -> OptimizationSolution:
+        """
+        Lagrangian decomposition for objectives under coupled constraints.
+        
+        max_total_investment and max_storage_space are priced into the objective with one
+        multiplier each, which splits the problem into independent per-item subproblems
+        (solve_item_subproblems). Multipliers follow projected subgradient steps on the
+        relative constraint violation, scaled by the objective of the unconstrained
+        solution. The best feasible iterate is kept, each iterate also contributing a
+        uniformly scaled-down feasible version. Safety stock stays at the service-level
+        target for the cost objectives, which gain nothing from it.
+        """
+        logger.info("Running Lagrangian decomposition optimization")
+        start_time = datetime.now()
+        
+        if constraints is None:
+            constraints = []
+        
+        item_ids = list(item_data.keys())
+        items = item_arrays(item_data, item_ids)
+        if run is not None:
+            run.start("Lagrangian Decomposition", item_ids)
+        
+        optimize_safety_stock = objective not in (OptimizationObjective.MINIMIZE_COST,
+                                                  OptimizationObjective.MINIMIZE_STOCKOUTS)
+        start = self.analytical_policy_matrix(items, service_level, [
+            constraint for constraint in constraints if constraint.constraint_type not in COUPLED_CONSTRAINTS])
+        limits = self._coupled_limits(constraints)
+        policies = self.solve_item_subproblems(start, items, objective, [], optimize_safety_stock)
+        scale = max(abs(float(self.objective_matrix(policies[None], items, objective)[0])), 1e-9)
+        
+        multipliers = np.zeros(len(limits))
+        best_policies, best_value = None, float('inf')
+        for iteration in range(max_iterations if limits else 1):
+            if iteration:
+                penalties = [(column, multiplier * scale / limit)
+                             for (column, limit), multiplier in zip(limits, multipliers)]
+                # One coordinate round per update, warm-started from the previous iterate
+                policies = self.solve_item_subproblems(policies, items, objective, penalties, optimize_safety_stock,
+                                                       rounds=1)
+            
+            violation = np.array([policies[:, column].sum() / limit - 1 for column, limit in limits])
+            for candidate in (policies, self.fit_coupled_constraints(policies, items, constraints)):
+                if self.constraints_matrix(candidate[None], constraints)[0]:
+                    value = float(self.objective_matrix(candidate[None], items, objective)[0])
+                    if value < best_value:
+                        best_policies, best_value = candidate, value
+            
+            if run is not None and best_policies is not None and await run.report(iteration + 1, best_value, best_policies):
+                break
+            # Converged: feasible, with multipliers only on (nearly) binding constraints
+            if np.all(violation <= tolerance) and np.all(multipliers * np.abs(violation) <= tolerance):
+                break
+            multipliers = np.maximum(0.0, multipliers + step_size / np.sqrt(iteration + 1) * violation)
+        
+        constraints_met = best_policies is not None
+        if not constraints_met:
+            best_policies = self.fit_coupled_constraints(policies, items, constraints)
+            best_value = float(self.objective_matrix(best_policies[None], items, objective)[0])
+        logger.info(f"Lagrangian decomposition: {iteration + 1} iterations, objective {best_value:.2f}, "
+                    f"multipliers {np.round(multipliers, 4).tolist()}, feasible={constraints_met}")
+        
+        solution = self._array_solution("LD", "Lagrangian Decomposition", item_ids, items, best_policies, best_value,
+                                        constraints, start_time)
+        if run is not None:
+            await run.finish(solution)
+        return solution
+    
+    def seeded_population(self, items: Dict[str, np.ndarray], size: int, rng: np.random.Generator,
+                          initial_solution: Optional[np.ndarray] = None,
+                          mutable: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Random population whose first fifth is initial_solution (once as given, then
+        mutated copies) when a warm start is supplied. Items outside the boolean
+        mutable mask keep their initial_solution policy in every individual.
+        """
+        population = self.random_population(items, size, rng)
+        if initial_solution is not None:
+            n_seeds = max(1, size // 5)
+            population[:n_seeds] = initial_solution
+            if n_seeds > 1:
+                population[1:n_seeds] = self.mutate_population(population[1:n_seeds], rng, mutable=mutable)
+            if mutable is not None:
+                population[:, ~mutable] = initial_solution[~mutable]
+        return population
+    
+    def random_population(self, items: Dict[str, np.ndarray], size: int,
+                          rng: np.random.Generator) -> np.ndarray:
+        """(size x items x parameters) array of random policies, as generate_random_policy draws them"""
+        annual_demand = items['annual_demand']
+        lead_time_demand = items['lead_time'] * annual_demand / 365
+        shape = (size, len(annual_demand))
+        
+        population = np.empty(shape + (len(POLICY_FIELDS),))
+        order_quantity = rng.uniform(annual_demand * 0.05, annual_demand * 0.3, shape)
+        safety_stock = rng.uniform(lead_time_demand * 0.5, lead_time_demand * 2, shape)
+        population[..., ORDER_QUANTITY] = order_quantity
+        population[..., SAFETY_STOCK] = safety_stock
+        population[..., REORDER_POINT] = safety_stock + lead_time_demand
+        population[..., MAX_STOCK_LEVEL] = order_quantity + safety_stock + rng.uniform(0, order_quantity * 0.5)
+        population[..., REVIEW_PERIOD] = rng.integers(1, 15, shape)
+        population[..., SERVICE_LEVEL_TARGET] = rng.uniform(0.85, 0.99, shape)
+        return population
+    
+    def mutate_population(self, individuals: np.ndarray, rng: np.random.Generator,
+                          mutation_strength: float = 0.1, mutable: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Mutate every policy of the given individuals, with the bounds of mutate_policy
+        (only the items in the boolean mutable mask when one is given)
+        """
+        if mutable is not None:
+            mutated = individuals.copy()
+            mutated[..., mutable, :] = self.mutate_population(individuals[..., mutable, :], rng, mutation_strength)
+            return mutated
+        shape = individuals.shape[:-1]
+        
+        # Reorder point, order quantity, safety stock and max stock level scale by one factor block
+        scaled = individuals[..., :MAX_STOCK_LEVEL + 1] * rng.uniform(1 - mutation_strength, 1 + mutation_strength,
+                                                                      shape + (MAX_STOCK_LEVEL + 1,))
+        mutated = np.empty_like(individuals)
+        mutated[..., :SAFETY_STOCK + 1] = np.maximum(scaled[..., :SAFETY_STOCK + 1], (0, 1, 0))
+        mutated[..., MAX_STOCK_LEVEL] = np.maximum(individuals[..., SAFETY_STOCK], scaled[..., MAX_STOCK_LEVEL])
+        mutated[..., REVIEW_PERIOD] = np.clip(np.trunc(individuals[..., REVIEW_PERIOD]) + rng.integers(-2, 3, shape),
+                                              1, 30)
+        mutated[..., SERVICE_LEVEL_TARGET] = np.clip(
+            individuals[..., SERVICE_LEVEL_TARGET] + rng.uniform(-0.05, 0.05, shape), 0.7, 0.99)
+        return mutated
+    
+    def next_generation(self, population: np.ndarray, fitness: np.ndarray,
+                        rng: np.random.Generator, mutable: Optional[np.ndarray] = None) -> np.ndarray:
+        """Tournament selection, single-point crossover and mutation over the whole population"""
+        size, n_items = population.shape[:2]
+        
+        # Selection (tournament selection of 3 distinct individuals)
+        tournament_size = min(3, size)
+        tournaments = np.argpartition(rng.random((size, size)), tournament_size - 1, axis=1)[:, :tournament_size]
+        winners = tournaments[np.arange(size), np.argmin(fitness[tournaments], axis=1)]
+        selected = population[winners]
+        
+        # Crossover of consecutive pairs (an odd last individual pairs with the first)
+        first = selected[0::2]
+        second = selected[np.arange(1, size + 1, 2) % size]
+        n_pairs = len(first)
+        if n_items > 1:
+            crossover = rng.random(n_pairs) < self.crossover_rate
+            points = np.where(crossover, rng.integers(1, n_items, n_pairs), n_items)
+            swap = (np.arange(n_items)[None, :] >= points[:, None])[..., None]
+            first, second = np.where(swap, second, first), np.where(swap, first, second)
+        
+        children = np.empty((2 * n_pairs,) + population.shape[1:])
+        children[0::2] = first
+        children[1::2] = second
+        
+        # Mutation
+        mutate = rng.random(len(children)) < self.mutation_rate
+        if mutate.any():
+            children[mutate] = self.mutate_population(children[mutate], rng, mutable=mutable)
+        
+        return children[:size]
+    
     async def genetic_algorithm_optimization(self, item_data: Dict[str, Dict[str, Any]],
                                            objective: OptimizationObjective,
-                                           constraints: List[OptimizationConstraint] = None) -> OptimizationSolution:
-        """Genetic algorithm for inventory optimization"""
+                                           constraints: List[OptimizationConstraint] = None,
+                                           seed: Optional[int] = None,
+                                           initial_solution: Optional[np.ndarray] = None,
+                                           run: Optional[OptimizationRun] = None,
+                                           mutable: Optional[np.ndarray] = None,
+                                           generations: Optional[int] = None) -> OptimizationSolution:
+        """
+        Genetic algorithm for inventory optimization, optionally warm-started from an
+        (items x parameters) solution and controlled by an anytime run. With a boolean
+        mutable mask only those items are searched; the rest keep initial_solution.
+        """
         logger.info("Running genetic algorithm optimization")
         start_time = datetime.now()
         
@@ -238,125 +974,203 @@ class IntelligentOptimizer:
             constraints = []
         
         item_ids = list(item_data.keys())
+        items = item_arrays(item_data, item_ids)
+        rng = np.random.default_rng(seed)
         
-        # Initialize population
-        population = []
-        for _ in range(self.population_size):
-            individual = []
-            for item_id in item_ids:
-                policy = self.generate_random_policy(item_id, item_data[item_id])
-                individual.append(policy)
-            population.append(individual)
+        # Initialize population as a (population x items x parameters) array
+        population = self.seeded_population(items, self.population_size, rng, initial_solution, mutable)
         
         best_solution = None
         best_fitness = float('inf')
+        if run is not None:
+            run.start("Genetic Algorithm", item_ids)
         
         # Evolution loop
-        for generation in range(self.generations):
-            # Evaluate fitness
-            fitness_scores = []
-            for individual in population:
-                if self.check_constraints(individual, constraints):
-                    fitness = self.objective_function(individual, 
-                                                    {item_id: item_data[item_id] for item_id in item_ids},
-                                                    objective)
-                else:
-                    fitness = float('inf')  # Penalty for constraint violation
-                
-                fitness_scores.append(fitness)
-                
-                if fitness < best_fitness:
-                    best_fitness = fitness
-                    best_solution = individual.copy()
-            
-            # Selection (tournament selection)
-            new_population = []
-            for _ in range(self.population_size):
-                tournament_size = 3
-                tournament_indices = random.sample(range(len(population)), tournament_size)
-                tournament_fitness = [fitness_scores[i] for i in tournament_indices]
-                winner_idx = tournament_indices[tournament_fitness.index(min(tournament_fitness))]
-                new_population.append(population[winner_idx].copy())
-            
-            # Crossover and mutation
-            next_population = []
-            for i in range(0, self.population_size, 2):
-                parent1 = new_population[i]
-                parent2 = new_population[i + 1] if i + 1 < self.population_size else new_population[0]
-                
-                if random.random() < self.crossover_rate:
-                    child1, child2 = self.crossover_policies(parent1, parent2)
-                else:
-                    child1, child2 = parent1.copy(), parent2.copy()
-                
-                # Mutation
-                if random.random() < self.mutation_rate:
-                    child1 = [self.mutate_policy(policy) for policy in child1]
-                if random.random() < self.mutation_rate:
-                    child2 = [self.mutate_policy(policy) for policy in child2]
-                
-                next_population.extend([child1, child2])
+        if run is not None and run.time_budgeted:
+            generations = itertools.count()
+        else:
+            generations = range(self.generations if generations is None else generations)
+        for generation in generations:
+            # Evaluate fitness of the whole population at once
+            fitness = self.evaluate_population(population, items, objective, constraints)
             
-            population = next_population[:self.population_size]
+            best_idx = int(np.argmin(fitness))
+            if fitness[best_idx] < best_fitness or best_solution is None:
+                best_fitness = float(fitness[best_idx])
+                best_solution = population[best_idx].copy()
             
             if generation % 20 == 0:
                 logger.info(f"Generation {generation}: Best fitness = {best_fitness:.2f}")
+            if run is not None and await run.report(generation + 1, best_fitness, best_solution):
+                logger.info(f"Stopping at generation {generation}: {run.stop_reason}")
+                break
+            
+            population = self.next_generation(population, fitness, rng, mutable)
         
-        # Calculate performance metrics
-        total_cost = 0
-        total_service_level = 0
+        if best_solution is None:
+            best_solution = population[0].copy()
         
-        for policy in best_solution:
-            item_info = item_data[policy.item_id]
-            annual_demand = item_info.get('annual_demand', 1000)
-            unit_cost = item_info.get('unit_cost', 25)
-            
-            avg_inventory = policy.order_quantity / 2 + policy.safety_stock
-            holding_cost = self.calculate_holding_cost(avg_inventory, unit_cost)
-            orders_per_year = annual_demand / policy.order_quantity
-            ordering_cost = self.calculate_ordering_cost(orders_per_year)
-            
-            total_cost += holding_cost + ordering_cost
-            total_service_level += policy.service_level_target
+        solution = self._array_solution("GA", "Genetic Algorithm", item_ids, items, best_solution, best_fitness,
+                                        constraints, start_time)
+        if run is not None:
+            await run.finish(solution)
+        return solution
+    
+    def _array_solution(self, prefix: str, method: str, item_ids: List[str], items: Dict[str, np.ndarray],
+                        parameters: np.ndarray, objective_value: float,
+                        constraints: List[OptimizationConstraint], start_time: datetime) -> OptimizationSolution:
+        """OptimizationSolution for an (items x parameters) array, with its performance metrics"""
+        policies = array_to_policies(item_ids, parameters)
+        
+        # Calculate performance metrics
+        order_quantity = parameters[:, ORDER_QUANTITY]
+        avg_inventory = order_quantity / 2 + parameters[:, SAFETY_STOCK]
+        holding_cost = self.calculate_holding_cost(avg_inventory, items['unit_cost'])
+        ordering_cost = self.calculate_ordering_cost(items['annual_demand'] / order_quantity)
         
         performance_metrics = {
-            'total_annual_cost': total_cost,
-            'average_service_level': total_service_level / len(best_solution),
-            'total_investment': sum(p.order_quantity * item_data[p.item_id].get('unit_cost', 25) for p in best_solution),
-            'number_of_items': len(best_solution)
+            'total_annual_cost': float((holding_cost + ordering_cost).sum()),
+            'average_service_level': float(parameters[:, SERVICE_LEVEL_TARGET].mean()) if len(policies) else 0.0,
+            'total_investment': float((order_quantity * items['unit_cost']).sum()),
+            'number_of_items': len(policies)
         }
         
         computation_time = (datetime.now() - start_time).total_seconds()
         
         return OptimizationSolution(
-            solution_id=f"GA_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            objective_value=best_fitness,
-            policies=best_solution,
+            solution_id=f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            objective_value=objective_value,
+            policies=policies,
             performance_metrics=performance_metrics,
-            constraints_satisfied=self.check_constraints(best_solution, constraints),
-            optimization_method="Genetic Algorithm",
+            constraints_satisfied=bool(self.constraints_matrix(parameters[None], constraints)[0]),
+            optimization_method=method,
             computation_time=computation_time,
             generated_at=datetime.now()
         )
     
+    async def island_model_optimization(self, item_data: Dict[str, Dict[str, Any]],
+                                        objective: OptimizationObjective,
+                                        constraints: List[OptimizationConstraint] = None,
+                                        n_islands: Optional[int] = None,
+                                        migration_interval: int = 20,
+                                        migrants: int = 2,
+                                        seed: Optional[int] = None,
+                                        n_jobs: Optional[int] = None,
+                                        initial_solution: Optional[np.ndarray] = None,
+                                        run: Optional[OptimizationRun] = None,
+                                        mutable: Optional[np.ndarray] = None,
+                                        generations: Optional[int] = None) -> OptimizationSolution:
+        """
+        Island-model genetic algorithm, optionally controlled by an anytime run (one step per epoch).
+        
+        n_islands subpopulations of population_size individuals each evolve in separate
+        processes (n_jobs=None uses every core). Every migration_interval generations the
+        best `migrants` individuals of each island replace the worst of the next island
+        in a ring. Each island draws from its own child of SeedSequence(seed), so a given
+        seed reproduces the same solution whatever the number of processes. A warm-start
+        initial_solution seeds every island, and a mutable mask limits the search as in
+        genetic_algorithm_optimization.
+        """
+        logger.info("Running island-model genetic algorithm optimization")
+        start_time = datetime.now()
+        
+        if constraints is None:
+            constraints = []
+        n_jobs = n_jobs or os.cpu_count() or 1
+        n_islands = n_islands or max(2, min(n_jobs, 8))
+        
+        item_ids = list(item_data.keys())
+        items = item_arrays(item_data, item_ids)
+        
+        islands = []
+        for seed_sequence in np.random.SeedSequence(seed).spawn(n_islands):
+            rng = np.random.default_rng(seed_sequence)
+            population = self.seeded_population(items, self.population_size, rng, initial_solution, mutable)
+            fitness = self.evaluate_population(population, items, objective, constraints)
+            best_idx = int(np.argmin(fitness))
+            islands.append(_Island(population, fitness, rng, population[best_idx].copy(), float(fitness[best_idx])))
+        
+        if run is not None:
+            run.start("Island Model Genetic Algorithm", item_ids)
+        if run is not None and run.time_budgeted:
+            generation_limit = float('inf')
+        else:
+            generation_limit = self.generations if generations is None else generations
+        
+        loop = asyncio.get_running_loop()
+        rates = (self.mutation_rate, self.crossover_rate)
+        executor = ProcessPoolExecutor(max_workers=min(n_jobs, n_islands)) if n_jobs > 1 else None
+        try:
+            immigrants = [None] * n_islands
+            generation = 0
+            while generation < generation_limit:
+                epoch = int(min(migration_interval, generation_limit - generation))
+                if executor is not None:
+                    islands = list(await asyncio.gather(*[
+                        loop.run_in_executor(executor, _evolve_island, island, items, objective, constraints,
+                                             rates, epoch, incoming, mutable)
+                        for island, incoming in zip(islands, immigrants)
+                    ]))
+                else:
+                    islands = [_evolve_island(island, items, objective, constraints, rates, epoch, incoming, mutable)
+                               for island, incoming in zip(islands, immigrants)]
+                generation += epoch
+                
+                # Ring migration of each island's elites into the next island
+                elites = [island.population[np.argsort(island.fitness, kind='stable')[:migrants]] for island in islands]
+                immigrants = [elites[(i - 1) % n_islands] for i in range(n_islands)]
+                
+                best_island = min(islands, key=lambda island: island.best_fitness)
+                logger.info(f"Generation {generation}: Best fitness = {best_island.best_fitness:.2f} across {n_islands} islands")
+                if run is not None and await run.report(generation, best_island.best_fitness, best_island.best):
+                    logger.info(f"Stopping at generation {generation}: {run.stop_reason}")
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        best_island = min(islands, key=lambda island: island.best_fitness)
+        solution = self._array_solution("IGA", "Island Model Genetic Algorithm", item_ids, items, best_island.best,
+                                        best_island.best_fitness, constraints, start_time)
+        if run is not None:
+            await run.finish(solution)
+        return solution
+    
     async def simulated_annealing_optimization(self, item_data: Dict[str, Dict[str, Any]],
                                              objective: OptimizationObjective,
-                                             max_iterations: int = 1000) -> OptimizationSolution:
-        """Simulated annealing optimization"""
+                                             max_iterations: int = 1000,
+                                             initial_solution: Optional[np.ndarray] = None,
+                                             seed: Optional[int] = None,
+                                             mutation_probability: float = 0.3,
+                                             run: Optional[OptimizationRun] = None,
+                                             mutable: Optional[np.ndarray] = None,
+                                             constraints: List[OptimizationConstraint] = None) -> OptimizationSolution:
+        """
+        Simulated annealing optimization, optionally starting from an (items x parameters) solution.
+        
+        The search itself is unconstrained; constraints only decide whether the
+        solution is reported as satisfying them.
+        
+        The per-item objective contributions of the current solution are kept, so each
+        iteration re-scores only the mutated items and updates the total by difference.
+        With a boolean mutable mask only those items are mutated. An anytime run gets
+        one step per run.report_interval iterations.
+        """
         logger.info("Running simulated annealing optimization")
         start_time = datetime.now()
         
         item_ids = list(item_data.keys())
+        items = item_arrays(item_data, item_ids)
+        n_items = len(item_ids)
+        rng = np.random.default_rng(seed)
         
         # Initial solution
-        current_solution = []
-        for item_id in item_ids:
-            policy = self.generate_random_policy(item_id, item_data[item_id])
-            current_solution.append(policy)
-        
-        current_fitness = self.objective_function(current_solution,
-                                                {item_id: item_data[item_id] for item_id in item_ids},
-                                                objective)
+        if initial_solution is not None:
+            current_solution = np.array(initial_solution, dtype=float)
+        else:
+            current_solution = self.random_population(items, 1, rng)[0]
+        contributions = self.item_objective_matrix(current_solution, items, objective)
+        current_fitness = float(contributions.sum())
         
         best_solution = current_solution.copy()
         best_fitness = current_fitness
@@ -365,77 +1179,77 @@ class IntelligentOptimizer:
         initial_temp = 1000.0
         final_temp = 0.1
         cooling_rate = 0.95
+        resync_interval = 1000  # Iterations between exact re-summations of the contributions
+        log_interval = max(200, max_iterations // 5)
         
         temperature = initial_temp
+        candidates = np.arange(n_items) if mutable is None else np.flatnonzero(mutable)
+        if run is not None:
+            run.start("Simulated Annealing", item_ids)
+        iterations = itertools.count() if run is not None and run.time_budgeted else range(max_iterations)
         
-        for iteration in range(max_iterations):
-            # Generate neighbor solution
-            neighbor_solution = []
-            for policy in current_solution:
-                if random.random() < 0.3:  # 30% chance to mutate each policy
-                    neighbor_policy = self.mutate_policy(policy, 0.2)
-                else:
-                    neighbor_policy = policy
-                neighbor_solution.append(neighbor_policy)
-            
-            neighbor_fitness = self.objective_function(neighbor_solution,
-                                                     {item_id: item_data[item_id] for item_id in item_ids},
-                                                     objective)
-            
-            # Acceptance criterion
-            if neighbor_fitness < current_fitness:
-                # Better solution - always accept
-                current_solution = neighbor_solution
-                current_fitness = neighbor_fitness
+        for iteration in iterations:
+            # Neighbor solution: mutate each policy with mutation_probability
+            mutated = candidates[rng.random(len(candidates)) < mutation_probability]
+            if len(mutated):
+                neighbor_policies = self.mutate_population(current_solution[mutated], rng, 0.2)
+                neighbor_contributions = self.item_objective_matrix(
+                    neighbor_policies, {name: values[mutated] for name, values in items.items()}, objective, n_items)
+                delta = float(neighbor_contributions.sum() - contributions[mutated].sum())
                 
-                if current_fitness < best_fitness:
-                    best_solution = current_solution.copy()
-                    best_fitness = current_fitness
-            else:
-                # Worse solution - accept with probability
-                delta = neighbor_fitness - current_fitness
-                probability = np.exp(-delta / temperature)
-                
-                if random.random() < probability:
-                    current_solution = neighbor_solution
-                    current_fitness = neighbor_fitness
+                # Acceptance criterion: better solutions always, worse ones with probability
+                if delta < 0 or rng.random() < np.exp(-delta / temperature):
+                    current_solution[mutated] = neighbor_policies
+                    contributions[mutated] = neighbor_contributions
+                    current_fitness += delta
+                    
+                    if current_fitness < best_fitness:
+                        best_solution = current_solution.copy()
+                        best_fitness = current_fitness
+            
+            if iteration % resync_interval == resync_interval - 1:
+                current_fitness = float(contributions.sum())
             
             # Cool down
             temperature *= cooling_rate
             temperature = max(temperature, final_temp)
             
-            if iteration % 200 == 0:
+            if iteration % log_interval == 0:
                 logger.info(f"Iteration {iteration}: Best fitness = {best_fitness:.2f}, Temp = {temperature:.2f}")
+            if run is not None and iteration % run.report_interval == run.report_interval - 1 \
+                    and await run.report(iteration + 1, best_fitness, best_solution):
+                logger.info(f"Stopping at iteration {iteration}: {run.stop_reason}")
+                break
         
-        # Calculate performance metrics
-        total_cost = sum(p.order_quantity * item_data[p.item_id].get('unit_cost', 25) for p in best_solution)
-        avg_service_level = sum(p.service_level_target for p in best_solution) / len(best_solution)
-        
-        performance_metrics = {
-            'total_annual_cost': best_fitness,
-            'average_service_level': avg_service_level,
-            'total_investment': total_cost,
-            'number_of_items': len(best_solution)
-        }
-        
-        computation_time = (datetime.now() - start_time).total_seconds()
-        
-        return OptimizationSolution(
-            solution_id=f"SA_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            objective_value=best_fitness,
-            policies=best_solution,
-            performance_metrics=performance_metrics,
-            constraints_satisfied=True,  # Simplified
-            optimization_method="Simulated Annealing",
-            computation_time=computation_time,
-            generated_at=datetime.now()
-        )
+        best_fitness = float(self.objective_matrix(best_solution[None], items, objective)[0])
+        solution = self._array_solution("SA", "Simulated Annealing", item_ids, items, best_solution, best_fitness,
+                                        constraints or [], start_time)
+        if run is not None:
+            await run.finish(solution)
+        return solution
     
     async def optimize_inventory_policies(self, current_inventory: Dict[str, Any],
                                         demand_forecasts: Dict[str, Any],
                                         objective: OptimizationObjective = OptimizationObjective.BALANCE_ALL,
-                                        method: str = "genetic_algorithm") -> OptimizationSolution:
-        """Main optimization function"""
+                                        method: str = "auto",
+                                        constraints: List[OptimizationConstraint] = None,
+                                        run: Optional[OptimizationRun] = None,
+                                        use_history: bool = True) -> OptimizationSolution:
+        """
+        Main optimization function.
+        
+        method="auto" solves cost minimization without coupled constraints in closed form,
+        any objective under coupled constraints by Lagrangian decomposition, and otherwise
+        runs the genetic algorithm. The search methods start from the analytical (s, Q)
+        policies. Pass a run from create_run for a time-budgeted,
+        cancellable optimization with progress reporting.
+        
+        Feasible solutions are kept in optimization_history with their inputs and the
+        requested method. With use_history and the same method, unchanged inputs return
+        the previous solution without solving, and the search
+        methods copy the previous policies of unchanged items and search only the
+        changed ones, with effort in proportion.
+        """
         logger.info(f"Optimizing inventory policies using {method}")
         
         # Prepare item data
@@ -451,14 +1265,86 @@ class IntelligentOptimizer:
                 'current_stock': inventory.get('stock_level', 0)
             }
         
+        if constraints is None:
+            constraints = []
+        item_ids = list(item_data)
+        items = item_arrays(item_data, item_ids)
+        warm_start = self.find_warm_start(item_ids, items, objective, constraints, method) if use_history else None
+        
+        if warm_start is not None and warm_start.unchanged.all():
+            solution = await self._reuse_solution(warm_start, item_ids, items, objective, constraints, run)
+        else:
+            solution = await self._solve(item_data, items, objective, method, constraints, warm_start, run)
+        
+        self.record_solution(solution, item_ids, items, objective, constraints, method)
+        return solution
+    
+    async def _reuse_solution(self, warm_start: WarmStart, item_ids: List[str], items: Dict[str, np.ndarray],
+                              objective: OptimizationObjective, constraints: List[OptimizationConstraint],
+                              run: Optional[OptimizationRun]) -> OptimizationSolution:
+        """The previous solution for identical inputs, without solving"""
+        start_time = datetime.now()
+        entry = warm_start.entry
+        logger.info(f"Inputs unchanged since {entry.solution_id}, reusing its policies")
+        if run is not None:
+            run.start(entry.optimization_method, item_ids)
+            await run.report(1, entry.objective_value, warm_start.parameters)
+            run.stop_reason = run.stop_reason or "reused"
+        solution = self._array_solution("WS", entry.optimization_method, item_ids, items, warm_start.parameters,
+                                        entry.objective_value, constraints, start_time)
+        solution.performance_metrics['reused_policies'] = len(item_ids)
+        if run is not None:
+            await run.finish(solution)
+        return solution
+    
+    async def _solve(self, item_data: Dict[str, Dict[str, Any]], items: Dict[str, np.ndarray],
+                     objective: OptimizationObjective, method: str, constraints: List[OptimizationConstraint],
+                     warm_start: Optional[WarmStart], run: Optional[OptimizationRun]) -> OptimizationSolution:
+        coupled = any(constraint.constraint_type in COUPLED_CONSTRAINTS for constraint in constraints)
+        if method == "auto":
+            if coupled:
+                method = "lagrangian"
+            elif objective == OptimizationObjective.MINIMIZE_COST:
+                method = "analytical"
+            else:
+                method = "genetic_algorithm"
+        if method == "analytical":
+            return await self.analytical_optimization(item_data, objective, constraints, run=run)
+        if method == "lagrangian":
+            return await self.lagrangian_optimization(item_data, objective, constraints, run=run)
+        
+        # Warm start for the search methods: previous policies of unchanged items,
+        # analytical ones for the rest, which are the only items searched
+        initial_solution = self.analytical_policy_matrix(items, constraints=constraints)
+        mutable = None
+        generations, iterations = self.generations, 1000
+        if warm_start is not None:
+            mutable = ~warm_start.unchanged
+            initial_solution[warm_start.unchanged] = warm_start.parameters[warm_start.unchanged]
+            share = float(mutable.mean())
+            generations = max(10, int(np.ceil(self.generations * share)))
+            iterations = max(100, int(np.ceil(iterations * share)))
+            logger.info(f"Warm start from {warm_start.entry.solution_id}: "
+                        f"{int(warm_start.unchanged.sum())} unchanged, {int(mutable.sum())} items searched")
+        
         # Choose optimization method
-        if method == "genetic_algorithm":
-            return await self.genetic_algorithm_optimization(item_data, objective)
+        if method == "island_model":
+            solution = await self.island_model_optimization(item_data, objective, constraints,
+                                                            initial_solution=initial_solution, run=run,
+                                                            mutable=mutable, generations=generations)
         elif method == "simulated_annealing":
-            return await self.simulated_annealing_optimization(item_data, objective)
+            solution = await self.simulated_annealing_optimization(item_data, objective, max_iterations=iterations,
+                                                                   initial_solution=initial_solution, run=run,
+                                                                   mutable=mutable, constraints=constraints)
         else:
-            logger.warning(f"Unknown optimization method: {method}")
-            return await self.genetic_algorithm_optimization(item_data, objective)
+            if method != "genetic_algorithm":
+                logger.warning(f"Unknown optimization method: {method}")
+            solution = await self.genetic_algorithm_optimization(item_data, objective, constraints,
+                                                                 initial_solution=initial_solution, run=run,
+                                                                 mutable=mutable, generations=generations)
+        if warm_start is not None:
+            solution.performance_metrics['reused_policies'] = int(warm_start.unchanged.sum())
+        return solution
 
 # Singleton instance
 intelligent_optimizer = IntelligentOptimizer()
@@ -470,5 +1356,16 @@ __all__ = [
     'InventoryPolicy',
     'OptimizationObjective',
     'OptimizationConstraint',
+    'OptimizationRun',
+    'OptimizationProgress',
+    'OptimizationHistoryEntry',
+    'WarmStart',
+    'POLICY_FIELDS',
+    'INPUT_FIELDS',
+    'item_arrays',
+    'scale_to_limit',
+    'input_matrix',
+    'policies_to_array',
+    'array_to_policies',
     'intelligent_optimizer'
 ]
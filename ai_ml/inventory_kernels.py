@@ -0,0 +1,100 @@
+"""
+Vectorized Service-Level Kernels for Hospital Inventory Policies
+
+This module implements:
+- Exact standard normal CDF, PDF and inverse CDF (PPF) on whole arrays
+- The standard normal loss function (expected units short per unit of spread)
+- Cycle service level, stockout probability, expected shortage per cycle and
+  fill rate for a safety stock held against normal lead-time demand
+- Safety stock for a target cycle service level, the inverse of the above
+All functions take and return arrays (scalars broadcast), so the optimizer,
+procurement recommendations and forecasting share one numeric definition
+"""
+
+import numpy as np
+import logging
+from scipy.special import ndtr, ndtri
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MIN_PROBABILITY = 1e-6  # Service levels are clipped to [MIN, 1 - MIN] before inversion
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+def normal_cdf(z) -> np.ndarray:
+    """Standard normal cumulative distribution Φ(z)"""
+    return ndtr(np.asarray(z, dtype=float))
+
+def normal_pdf(z) -> np.ndarray:
+    """Standard normal density φ(z)"""
+    z = np.asarray(z, dtype=float)
+    return _INV_SQRT_2PI * np.exp(-0.5 * z * z)
+
+def normal_ppf(probability) -> np.ndarray:
+    """Standard normal quantile Φ⁻¹(p); ±inf at 0 and 1"""
+    return ndtri(np.asarray(probability, dtype=float))
+
+def normal_loss(z) -> np.ndarray:
+    """Standard normal loss L(z) = E[max(Z - z, 0)] = φ(z) - z(1 - Φ(z))"""
+    z = np.asarray(z, dtype=float)
+    # Φ(-z) = 1 - Φ(z) without cancellation in the upper tail
+    return np.maximum(normal_pdf(z) - z * ndtr(-z), 0.0)
+
+def lead_time_std(demand_std, lead_time) -> np.ndarray:
+    """Standard deviation of demand over the lead time, σ√L (per-period σ and L in the same unit)"""
+    return np.asarray(demand_std, dtype=float) * np.sqrt(np.maximum(np.asarray(lead_time, dtype=float), 0.0))
+
+def safety_z(safety_stock, demand_std, lead_time) -> np.ndarray:
+    """Safety stock in lead-time standard deviations; ±inf where demand does not vary"""
+    sigma = lead_time_std(demand_std, lead_time)
+    safety_stock = np.asarray(safety_stock, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = safety_stock / sigma
+    # Deterministic demand: any non-negative safety stock covers it
+    return np.where(sigma > 0, z, np.where(safety_stock >= 0, np.inf, -np.inf))
+
+def cycle_service_level(safety_stock, demand_std, lead_time) -> np.ndarray:
+    """Probability of no stockout in a replenishment cycle, Φ(SS / σ√L)"""
+    return ndtr(safety_z(safety_stock, demand_std, lead_time))
+
+def stockout_probability(safety_stock, demand_std, lead_time) -> np.ndarray:
+    """Probability that lead-time demand exceeds the reorder point, 1 - Φ(SS / σ√L)"""
+    return ndtr(-safety_z(safety_stock, demand_std, lead_time))
+
+def safety_stock_for_service_level(service_level, demand_std, lead_time) -> np.ndarray:
+    """Safety stock z·σ√L reaching a target cycle service level"""
+    probability = np.clip(np.asarray(service_level, dtype=float), MIN_PROBABILITY, 1.0 - MIN_PROBABILITY)
+    return ndtri(probability) * lead_time_std(demand_std, lead_time)
+
+def expected_shortage(safety_stock, demand_std, lead_time) -> np.ndarray:
+    """Expected units short per replenishment cycle, σ√L · L(SS / σ√L)"""
+    sigma = lead_time_std(demand_std, lead_time)
+    safety_stock = np.asarray(safety_stock, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shortage = sigma * normal_loss(safety_stock / sigma)
+    # Deterministic demand falls short only by a negative safety stock
+    return np.where(sigma > 0, shortage, np.maximum(-safety_stock, 0.0))
+
+def fill_rate(safety_stock, order_quantity, demand_std, lead_time) -> np.ndarray:
+    """Share of demand met from stock, 1 - expected shortage per cycle / order quantity"""
+    order_quantity = np.asarray(order_quantity, dtype=float)
+    shortage = expected_shortage(safety_stock, demand_std, lead_time)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = 1.0 - shortage / order_quantity
+    return np.clip(np.where(order_quantity > 0, rate, np.where(shortage > 0, 0.0, 1.0)), 0.0, 1.0)
+
+# Export main components
+__all__ = [
+    'normal_cdf',
+    'normal_pdf',
+    'normal_ppf',
+    'normal_loss',
+    'lead_time_std',
+    'safety_z',
+    'cycle_service_level',
+    'stockout_probability',
+    'safety_stock_for_service_level',
+    'expected_shortage',
+    'fill_rate',
+    'MIN_PROBABILITY'
+]
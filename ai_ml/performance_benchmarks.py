@@ -0,0 +1,462 @@
+"""
+Performance Benchmarks for the Hospital Supply Chain AI/ML Modules
+
+Run directly to print timings:
+    python performance_benchmarks.py [benchmark_name ...]
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Any
+
+from history_store import ItemHistoryIndex, compact_history_frame, frame_memory_bytes
+
+def _timed(func: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def make_wide_history(n_items: int, days: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic history in the original wide layout (object ids, float64/int64 columns)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp.now().normalize(), periods=days, freq='D')
+    base = rng.uniform(5, 200, n_items)
+
+    day_index = np.tile(np.arange(days), n_items)
+    item_base = np.repeat(base, days)
+    demand = np.maximum(0, item_base * (1 + 0.1 * np.sin(2 * np.pi * day_index / 7))
+                        + rng.normal(0, 0.1, n_items * days) * item_base).round()
+    all_dates = np.tile(dates.values, n_items)
+    weekday = np.tile(dates.weekday.values, n_items)
+    month = np.tile(dates.month.values, n_items)
+
+    item_ids = np.array([f"ITEM{i:06d}" for i in range(n_items)], dtype=object)
+    return pd.DataFrame({
+        'date': all_dates,
+        'item_id': np.repeat(item_ids, days),
+        'item_name': np.repeat(np.array([f"Supply item {i}" for i in range(n_items)], dtype=object), days),
+        'demand': demand,
+        'stock_level': (demand * rng.uniform(2, 5, len(demand))).round(),
+        'procurement_cost': (demand * rng.uniform(10, 50, len(demand))).round(2),
+        'supplier_lead_time': rng.integers(3, 14, len(demand)).astype(np.int64),
+        'day_of_week': weekday.astype(np.int64),
+        'month': month.astype(np.int64),
+        'quarter': ((month - 1) // 3 + 1).astype(np.int64),
+        'is_weekend': weekday >= 5,
+        'is_holiday': day_index % 30 == 0,
+    })
+
+def benchmark_history_layout(n_items: int = 50000, days: int = 60, sample_items: int = 200) -> Dict[str, Any]:
+    """Compare the wide/boolean-filter layout with the compact/offset-slice layout"""
+    from predictive_analytics import AdvancedPredictiveAnalytics
+
+    wide = make_wide_history(n_items, days)
+    compact, compact_time = _timed(compact_history_frame, wide)
+    index, index_time = _timed(ItemHistoryIndex, compact)
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(index.item_ids, size=min(sample_items, n_items), replace=False)
+
+    # Per-item boolean filtering (O(items x rows)), extrapolated from a sample
+    _, filter_time = _timed(lambda: [wide[wide['item_id'] == item_id]['demand'].mean() for item_id in sample])
+    filter_all_estimate = filter_time / len(sample) * n_items
+
+    # Offset slices for every item
+    def _slice_all():
+        demand = index.column('demand')
+        return [demand[start:stop].mean() for _, start, stop in index.iter_slices()]
+    _, slice_time = _timed(_slice_all)
+
+    # One grouped reduction for every item
+    _, reduce_time = _timed(lambda: index.group_reduce(index.column('demand').astype(float)) / index.lengths)
+
+    engine = AdvancedPredictiveAnalytics()
+    _, features_time = _timed(engine.prepare_features, compact)
+
+    results = {
+        'rows': len(wide),
+        'items': n_items,
+        'wide_memory_mb': frame_memory_bytes(wide) / 1e6,
+        'compact_memory_mb': frame_memory_bytes(compact) / 1e6,
+        'compaction_seconds': compact_time,
+        'index_build_seconds': index_time,
+        'boolean_filter_all_items_seconds_estimated': filter_all_estimate,
+        'offset_slice_all_items_seconds': slice_time,
+        'grouped_reduce_all_items_seconds': reduce_time,
+        'prepare_features_seconds': features_time,
+    }
+    return results
+
+def benchmark_holt_winters(n_items: int = 50000, days: int = 365, steps: int = 30,
+                           sample_items: int = 200) -> Dict[str, Any]:
+    """Per-series Holt-Winters calls against one matrix recursion over the catalogue"""
+    from demand_forecasting import AdvancedDemandForecasting
+
+    forecaster = AdvancedDemandForecasting()
+    rng = np.random.default_rng(7)
+    demand_matrix = rng.poisson(80, (n_items, days)).astype(float)
+    index = pd.date_range(end=pd.Timestamp.now().normalize(), periods=days, freq='D')
+
+    def _per_series():
+        return [forecaster.exponential_smoothing_forecast(pd.Series(row, index=index), steps)
+                for row in demand_matrix[:sample_items]]
+    _, per_series_time = _timed(_per_series)
+    _, matrix_time = _timed(forecaster.exponential_smoothing_matrix, demand_matrix, steps)
+
+    return {
+        'items': n_items,
+        'days': days,
+        'per_series_all_items_seconds_estimated': per_series_time / sample_items * n_items,
+        'matrix_recursion_seconds': matrix_time,
+    }
+
+def benchmark_forecast_many(n_items: int = 5000, days: int = 365, forecast_days: int = 30,
+                            sample_items: int = 20) -> Dict[str, Any]:
+    """Per-item forecast_item_demand calls against one forecast_many call"""
+    import asyncio
+    from demand_forecasting import AdvancedDemandForecasting
+
+    forecaster = AdvancedDemandForecasting()
+    history = make_wide_history(n_items, days)
+    sample = history['item_id'].unique()[:sample_items]
+
+    async def _per_item():
+        for item_id in sample:
+            await forecaster.forecast_item_demand(item_id, history, forecast_days)
+    _, per_item_time = _timed(asyncio.run, _per_item())
+    _, batch_time = _timed(asyncio.run, forecaster.forecast_many(None, history, forecast_days))
+
+    return {
+        'items': n_items,
+        'days': days,
+        'per_item_all_items_seconds_estimated': per_item_time / len(sample) * n_items,
+        'forecast_many_seconds': batch_time,
+    }
+
+def legacy_ar_forecast(data: np.ndarray, steps: int, max_lag: int = 7) -> np.ndarray:
+    """Previous arima_forecast: corrcoef lag scan, row-by-row design matrix and lstsq"""
+    max_lag = min(max_lag, len(data) // 4)
+    best_lag, best_corr = 1, 0
+    for lag in range(1, max_lag + 1):
+        corr = np.corrcoef(data[:-lag], data[lag:])[0, 1]
+        if abs(corr) > abs(best_corr):
+            best_corr, best_lag = corr, lag
+
+    X = np.array([data[i - best_lag:i] for i in range(best_lag, len(data))])
+    y = np.array([data[i] for i in range(best_lag, len(data))])
+    coeffs = np.linalg.lstsq(X, y, rcond=None)[0]
+
+    forecasts, last_values = [], data[-best_lag:].tolist()
+    for _ in range(steps):
+        next_val = np.dot(coeffs, last_values)
+        forecasts.append(max(0, next_val))
+        last_values = last_values[1:] + [next_val]
+    return np.array(forecasts)
+
+def benchmark_autoregression(n_items: int = 5000, days: int = 365, long_days: int = 3650,
+                             steps: int = 30, sample_items: int = 200) -> Dict[str, Any]:
+    """Lag scan + lstsq against FFT autocorrelation + Levinson-Durbin, at weekly and monthly orders"""
+    from autoregression import fit_ar_matrix, ar_forecast_matrix
+
+    rng = np.random.default_rng(11)
+    demand_matrix = rng.poisson(60, (n_items, days)).astype(float)
+    long_series = rng.poisson(60, long_days).astype(float)
+
+    def _legacy(max_lag):
+        for row in demand_matrix[:sample_items]:
+            legacy_ar_forecast(row, steps, max_lag)
+
+    def _levinson(matrix, max_order):
+        fit = fit_ar_matrix(matrix, max_order)
+        return ar_forecast_matrix(matrix, fit, steps)
+
+    results = {'items': n_items, 'days': days}
+    for max_lag in (7, 31):
+        _, legacy_time = _timed(_legacy, max_lag)
+        _, levinson_time = _timed(_levinson, demand_matrix, max_lag)
+        results[f'lag_scan_lstsq_p{max_lag}_all_items_seconds_estimated'] = legacy_time / sample_items * n_items
+        results[f'fft_levinson_p{max_lag}_all_items_seconds'] = levinson_time
+
+        _, legacy_long = _timed(legacy_ar_forecast, long_series, steps, max_lag)
+        _, levinson_long = _timed(_levinson, long_series[None, :], max_lag)
+        results[f'lag_scan_lstsq_p{max_lag}_{long_days}_day_series_seconds'] = legacy_long
+        results[f'fft_levinson_p{max_lag}_{long_days}_day_series_seconds'] = levinson_long
+    return results
+
+def benchmark_backtesting(n_items: int = 20000, days: int = 365, horizon: int = 14,
+                          n_jobs: int = None) -> Dict[str, Any]:
+    """Rolling-origin backtest of the whole catalogue, serial and across a process pool"""
+    from backtesting import backtest_matrix, backtest_matrix_parallel
+
+    demand_matrix = np.random.default_rng(3).poisson(60, (n_items, days)).astype(float)
+    serial, serial_time = _timed(backtest_matrix, demand_matrix, horizon=horizon)
+    _, parallel_time = _timed(backtest_matrix_parallel, demand_matrix, n_jobs=n_jobs, horizon=horizon)
+
+    fits = n_items * len(serial['origins'])
+    return {
+        'items': n_items,
+        'origins_per_item': len(serial['origins']),
+        'serial_seconds': serial_time,
+        'serial_microseconds_per_fit': serial_time / fits * 1e6,
+        'process_pool_seconds': parallel_time,
+    }
+
+def benchmark_state_updates(n_items: int = 50000, days: int = 365, forecast_days: int = 30) -> Dict[str, Any]:
+    """Daily refresh from persisted per-item state against a full refit"""
+    from demand_forecasting import AdvancedDemandForecasting
+    from holt_winters import fit_holt_winters
+    from autoregression import fit_ar_matrix
+
+    forecaster = AdvancedDemandForecasting()
+    rng = np.random.default_rng(5)
+    demand_matrix = rng.poisson(60, (n_items, days)).astype(float)
+    item_ids = [f"ITEM{i:06d}" for i in range(n_items)]
+
+    def _full_fit():
+        forecaster.state_store.load(item_ids, fit_holt_winters(demand_matrix), fit_ar_matrix(demand_matrix), demand_matrix)
+    _, refit_time = _timed(_full_fit)
+
+    observations = dict(zip(item_ids, rng.poisson(60, n_items).astype(float)))
+    _, update_time = _timed(forecaster.update_item_states, observations)
+    _, state_forecast_time = _timed(forecaster.state_store.forecast, item_ids, forecast_days)
+    _, refresh_time = _timed(forecaster.refresh_forecasts, item_ids, forecast_days)
+    _, single_time = _timed(lambda: [forecaster.state_store.update(item_id, 60.0) for item_id in item_ids[:1000]])
+
+    return {
+        'items': n_items,
+        'full_refit_seconds': refit_time,
+        'batch_update_microseconds_per_item': update_time / n_items * 1e6,
+        'single_update_microseconds': single_time / 1000 * 1e6,
+        'state_forecast_microseconds_per_item': state_forecast_time / n_items * 1e6,
+        'refresh_forecasts_microseconds_per_item': refresh_time / n_items * 1e6,
+    }
+
+def benchmark_series_summaries(n_items: int = 5000, days: int = 365) -> Dict[str, Any]:
+    """Seasonality detection from scratch, on an unchanged series and after one appended day"""
+    from demand_forecasting import AdvancedDemandForecasting
+
+    forecaster = AdvancedDemandForecasting()
+    rng = np.random.default_rng(6)
+    demand_matrix = rng.poisson(60, (n_items, days + 1)).astype(float)
+    dates = np.broadcast_to(pd.date_range('2024-01-01', periods=days + 1).values, demand_matrix.shape)
+    item_ids = [f"ITEM{i:06d}" for i in range(n_items)]
+
+    def _detect(matrix, calendar):
+        summary = forecaster.series_summaries.summarize(item_ids, matrix, calendar)
+        return forecaster._seasonal_patterns_matrix(item_ids, summary, matrix.shape[1])
+
+    _, cold_time = _timed(_detect, demand_matrix[:, :days], dates[:, :days])
+    _, unchanged_time = _timed(_detect, demand_matrix[:, :days], dates[:, :days])
+    _, appended_time = _timed(_detect, demand_matrix, dates)
+
+    return {
+        'items': n_items,
+        'cold_seconds': cold_time,
+        'unchanged_seconds': unchanged_time,
+        'one_day_appended_seconds': appended_time,
+        'cache': forecaster.series_summaries.stats()
+    }
+
+def benchmark_consumption_store(n_items: int = 2000, n_locations: int = 5, n_events: int = 2000000,
+                                years: int = 3) -> Dict[str, Any]:
+    """Event ingest into the multi-resolution store and multi-year daily history reads"""
+    from datetime import datetime
+    from consumption_store import ConsumptionTimeSeriesStore
+
+    store = ConsumptionTimeSeriesStore()
+    rng = np.random.default_rng(7)
+    end = datetime(2026, 1, 1)
+    items = [f"ITEM{i:06d}" for i in rng.integers(0, n_items, n_events)]
+    locations = [f"LOC{i}" for i in rng.integers(0, n_locations, n_events)]
+    timestamps = np.sort(np.datetime64(end) - rng.integers(0, years * 365 * 86400, n_events).astype('timedelta64[s]'))
+    quantities = rng.integers(1, 10, n_events)
+
+    _, ingest_time = _timed(store.record_many, items, locations, quantities, timestamps)
+    _, single_time = _timed(lambda: [store.record(items[i], locations[i], 1, end) for i in range(1000)])
+    _, query_time = _timed(lambda: [store.query(items[i], '2023-01-01', end, 'day') for i in range(1000)])
+    frame, frame_time = _timed(store.history_frame, None, years * 365, end)
+
+    return {
+        'events': n_events,
+        'series': len(store),
+        'ingest_events_per_second': n_events / ingest_time,
+        'single_record_microseconds': single_time / 1000 * 1e6,
+        'item_query_microseconds': query_time / 1000 * 1e6,
+        'history_frame_seconds': frame_time,
+        'history_rows': len(frame),
+        'store_megabytes': store.memory_bytes() / 1e6,
+        'kilobytes_per_series': store.memory_bytes() / len(store) / 1e3
+    }
+
+def make_item_data(n_items: int, seed: int = 42) -> Dict[str, Dict[str, Any]]:
+    """Optimizer item data (annual demand, demand std, unit cost, lead time) for a synthetic catalogue"""
+    rng = np.random.default_rng(seed)
+    annual_demand = rng.gamma(2.0, 2000.0, n_items) + 50
+    return {
+        f"ITEM{i:06d}": {
+            'annual_demand': float(annual_demand[i]),
+            'demand_std': float(annual_demand[i] / 365 * rng.uniform(0.2, 1.0)),  # Daily
+            'unit_cost': float(rng.lognormal(3.0, 1.0)),
+            'lead_time': int(rng.integers(1, 21))
+        }
+        for i in range(n_items)
+    }
+
+def benchmark_optimizer(n_items: int = 5000, sa_iterations: int = 20000) -> Dict[str, Any]:
+    """
+    Vectorized GA, island model, (s, Q) solver, simulated annealing, Lagrangian
+    decomposition and warm starts from the optimization history
+    """
+    import asyncio
+    from intelligent_optimization import (IntelligentOptimizer, OptimizationObjective, OptimizationConstraint,
+                                          item_arrays, array_to_policies)
+
+    optimizer = IntelligentOptimizer()
+    item_data = make_item_data(n_items)
+    item_ids = list(item_data)
+    items = item_arrays(item_data, item_ids)
+    population = optimizer.random_population(items, optimizer.population_size, np.random.default_rng(0))
+    individuals = [array_to_policies(item_ids, individual) for individual in population]
+
+    _, vectorized_time = _timed(optimizer.objective_matrix, population, items, OptimizationObjective.BALANCE_ALL)
+    _, per_policy_time = _timed(lambda: [optimizer.objective_function(individual, item_data, OptimizationObjective.BALANCE_ALL)
+                                         for individual in individuals])
+    solution, ga_time = _timed(asyncio.run, optimizer.genetic_algorithm_optimization(
+        item_data, OptimizationObjective.BALANCE_ALL, seed=0))
+    islands, island_time = _timed(asyncio.run, optimizer.island_model_optimization(
+        item_data, OptimizationObjective.BALANCE_ALL, n_islands=4, seed=0))
+    analytical, analytical_time = _timed(asyncio.run, optimizer.analytical_optimization(
+        item_data, OptimizationObjective.MINIMIZE_COST))
+    cost_ga, cost_ga_time = _timed(asyncio.run, optimizer.genetic_algorithm_optimization(
+        item_data, OptimizationObjective.MINIMIZE_COST, seed=0))
+    _, sa_time = _timed(asyncio.run, optimizer.simulated_annealing_optimization(
+        item_data, OptimizationObjective.BALANCE_ALL, sa_iterations, seed=0))
+    budget = [OptimizationConstraint('max_total_investment', 0.5 * 25 * sum(
+        policy.order_quantity for policy in analytical.policies), 0.0, 1.0)]
+    lagrangian, lagrangian_time = _timed(asyncio.run, optimizer.lagrangian_optimization(
+        item_data, OptimizationObjective.BALANCE_ALL, budget))
+    budget_ga, budget_ga_time = _timed(asyncio.run, optimizer.genetic_algorithm_optimization(
+        item_data, OptimizationObjective.BALANCE_ALL, budget, seed=0,
+        initial_solution=optimizer.analytical_policy_matrix(items, constraints=budget)))
+    _, full_evaluation_time = _timed(lambda: [optimizer.objective_matrix(population[:1], items, OptimizationObjective.BALANCE_ALL)
+                                              for _ in range(100)])
+
+    # Repeated runs through optimize_inventory_policies, then with 1% of the forecasts changed
+    inventory = {item_id: {'unit_cost': data['unit_cost'], 'supplier_lead_time': data['lead_time']}
+                 for item_id, data in item_data.items()}
+    forecasts = {item_id: {'annual_demand': data['annual_demand'], 'demand_std': data['demand_std']}
+                 for item_id, data in item_data.items()}
+    _, history_cold_time = _timed(asyncio.run, optimizer.optimize_inventory_policies(inventory, forecasts))
+    _, history_reuse_time = _timed(asyncio.run, optimizer.optimize_inventory_policies(inventory, forecasts))
+    for item_id in item_ids[::100]:
+        forecasts[item_id] = {**forecasts[item_id], 'annual_demand': forecasts[item_id]['annual_demand'] * 1.2}
+    _, history_warm_time = _timed(asyncio.run, optimizer.optimize_inventory_policies(inventory, forecasts))
+
+    return {
+        'items': n_items,
+        'population_evaluation_seconds': vectorized_time,
+        'population_evaluation_seconds_from_policy_objects': per_policy_time,
+        'ga_seconds': ga_time,
+        'ga_objective': solution.objective_value,
+        'ga_generations_per_second': optimizer.generations / ga_time,
+        'island_model_seconds_4_islands': island_time,
+        'island_model_objective': islands.objective_value,
+        'minimize_cost_analytical_seconds': analytical_time,
+        'minimize_cost_analytical_objective': analytical.objective_value,
+        'minimize_cost_ga_seconds': cost_ga_time,
+        'minimize_cost_ga_objective': cost_ga.objective_value,
+        'sa_iterations_per_second': sa_iterations / sa_time,
+        'sa_full_objective_evaluations_per_second': 100 / full_evaluation_time,
+        'half_budget_lagrangian_seconds': lagrangian_time,
+        'half_budget_lagrangian_objective': lagrangian.objective_value,
+        'half_budget_warm_ga_seconds': budget_ga_time,
+        'half_budget_warm_ga_objective': budget_ga.objective_value,
+        'history_cold_run_seconds': history_cold_time,
+        'history_unchanged_inputs_seconds': history_reuse_time,
+        'history_1pct_changed_seconds': history_warm_time
+    }
+
+def benchmark_transfer_planning(n_items: int = 5000, n_locations: int = 8) -> Dict[str, Any]:
+    """Whole-hospital transfer plan as one transportation LP, against one LP per item"""
+    from transfer_planning import plan_transfers
+
+    rng = np.random.default_rng(42)
+    minimum = rng.integers(5, 50, (n_items, n_locations)).astype(float)
+    available = np.floor(minimum * rng.uniform(0.2, 3.0, (n_items, n_locations)))
+    stocked = rng.random((n_items, n_locations)) < 0.8
+    costs = rng.uniform(0.5, 3.0, (n_locations, n_locations))
+    np.fill_diagonal(costs, 0.0)
+    item_ids, location_ids = list(range(n_items)), list(range(n_locations))
+
+    plan, joint_time = _timed(plan_transfers, item_ids, location_ids, available, minimum, None, stocked, costs)
+    sample = min(n_items, 500)
+    _, per_item_time = _timed(lambda: [plan_transfers([i], location_ids, available[i:i + 1], minimum[i:i + 1], None,
+                                                      stocked[i:i + 1], costs) for i in range(sample)])
+    return {
+        'items': n_items,
+        'locations': n_locations,
+        'joint_plan_seconds': joint_time,
+        'per_item_plans_seconds_extrapolated': per_item_time * n_items / sample,
+        'transfers': len(plan),
+        'transfer_cost': plan.total_cost,
+        'units_short_after_plan': float(plan.shortage.sum())
+    }
+
+def benchmark_service_level_kernels(n_items: int = 1000000, sample_items: int = 20000) -> Dict[str, Any]:
+    """Safety stock, stockout probability and fill rate for the catalogue in one pass, against a per-item loop"""
+    from statistics import NormalDist
+    from inventory_kernels import fill_rate, safety_stock_for_service_level, stockout_probability
+
+    rng = np.random.default_rng(42)
+    demand_std = rng.uniform(0.5, 20, n_items)
+    lead_time = rng.integers(1, 21, n_items).astype(float)
+    order_quantity = rng.uniform(10, 500, n_items)
+
+    def vectorized():
+        safety_stock = safety_stock_for_service_level(0.95, demand_std, lead_time)
+        return stockout_probability(safety_stock, demand_std, lead_time), fill_rate(safety_stock, order_quantity, demand_std, lead_time)
+
+    def per_item(count):
+        normal = NormalDist()
+        results = []
+        for std, days, quantity in zip(demand_std[:count].tolist(), lead_time[:count].tolist(), order_quantity[:count].tolist()):
+            sigma = std * days ** 0.5
+            z = normal.inv_cdf(0.95)
+            shortage = sigma * (normal.pdf(z) - z * (1 - normal.cdf(z)))
+            results.append((1 - normal.cdf(z), min(1.0, max(0.0, 1 - shortage / quantity))))
+        return results
+
+    (risk, rate), vector_time = _timed(vectorized)
+    loop_results, loop_time = _timed(per_item, sample_items)
+    return {
+        'items': n_items,
+        'vectorized_seconds': vector_time,
+        'per_item_seconds_extrapolated': loop_time * n_items / sample_items,
+        'max_fill_rate_difference': float(np.abs(rate[:sample_items] - np.array([r[1] for r in loop_results])).max()),
+        'mean_stockout_probability': float(risk.mean())
+    }
+
+BENCHMARKS = {
+    'history_layout': benchmark_history_layout,
+    'holt_winters': benchmark_holt_winters,
+    'forecast_many': benchmark_forecast_many,
+    'autoregression': benchmark_autoregression,
+    'backtesting': benchmark_backtesting,
+    'state_updates': benchmark_state_updates,
+    'series_summaries': benchmark_series_summaries,
+    'consumption_store': benchmark_consumption_store,
+    'optimizer': benchmark_optimizer,
+    'transfer_planning': benchmark_transfer_planning,
+    'service_level_kernels': benchmark_service_level_kernels,
+}
+
+def main(names=None):
+    for name in names or BENCHMARKS:
+        print(f"== {name} ==")
+        for key, value in BENCHMARKS[name]().items():
+            print(f"  {key:55s} {value:,.4f}" if isinstance(value, float) else f"  {key:55s} {value}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
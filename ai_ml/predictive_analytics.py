@@ -21,6 +21,17 @@ from sklearn.ensemble import RandomForestRegressor, IsolationForest
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error
+from forecast_cache import ForecastCache
+from anomaly_detection import AnomalyDetectorBank
+from feature_store import OnlineFeatureStore, LAG_PERIODS, ROLLING_WINDOWS
+from inventory_kernels import fill_rate, normal_ppf, safety_stock_for_service_level, stockout_probability
+from history_store import (
+    ItemHistoryIndex,
+    compact_history_frame,
+    grouped_lag,
+    grouped_rolling_mean_std,
+    sort_by_item_date
+)
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -28,6 +39,9 @@ warnings.filterwarnings('ignore')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+FORECAST_INTERVAL_LEVEL = 0.95  # Coverage of forecast confidence intervals
+TARGET_SERVICE_LEVEL = 0.95     # Cycle service level behind recommended safety stocks
+
 class ForecastMethod(Enum):
     LSTM = "lstm"
     ARIMA = "arima"
@@ -81,9 +95,32 @@ class AdvancedPredictiveAnalytics:
         self.scalers = {}
         self.feature_importance = {}
         self.historical_data = {}
+        self.history_index: Optional[ItemHistoryIndex] = None
         self.is_trained = False
+        self.data_version = 0
+        self.forecast_cache = ForecastCache()
+        self.anomaly_detectors = AnomalyDetectorBank(contamination=0.1)
+        self.feature_store = OnlineFeatureStore()
+        self.feature_columns: List[str] = []
+        self._pending_observations: List[Dict[str, Any]] = []
+        self._stale_detector_items: set = set()  # Items with observations since their detector was checked
+        self._insights_cache: Optional[Dict[str, Any]] = None
         logger.info("Advanced Predictive Analytics engine initialized")
     
+    def _bump_data_version(self):
+        """Mark usage data or models as changed so cached forecasts are recomputed"""
+        self.data_version += 1
+        self.forecast_cache.invalidate(older_than_version=self.data_version)
+    
+    def _set_historical_data(self, df: pd.DataFrame, reload_features: bool = True, bump_version: bool = True):
+        """Store history in the compact item/date-sorted layout and rebuild the item index"""
+        self.historical_data = compact_history_frame(df)
+        self.history_index = ItemHistoryIndex(self.historical_data)
+        if reload_features:
+            self.feature_store.load_history(self.historical_data, self.history_index)
+        if bump_version:
+            self._bump_data_version()
+    
     async def generate_synthetic_training_data(self, days: int = 365) -> pd.DataFrame:
         """Generate synthetic historical data for training ML models"""
         logger.info(f"Generating synthetic training data for {days} days")
@@ -140,26 +177,31 @@ class AdvancedPredictiveAnalytics:
                     'is_holiday': day % 30 == 0,  # Simplified holiday pattern
                 })
         
-        df = pd.DataFrame(data)
-        self.historical_data = df
-        logger.info(f"Generated {len(df)} data points for training")
-        return df
+        self._set_historical_data(pd.DataFrame(data))
+        logger.info(f"Generated {len(self.historical_data)} data points for training")
+        return self.historical_data
     
     def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Prepare features for ML models"""
         logger.info("Preparing features for ML models")
         
-        # Sort by item and date
-        df = df.sort_values(['item_id', 'date'])
+        # Sort by item and date (compact history frames are stored pre-sorted)
+        df = sort_by_item_date(df)
+        
+        # Lag and rolling features in one vectorized pass over the sorted rows
+        index = ItemHistoryIndex(df)
+        demand = index.column('demand').astype(float)
+        positions = index.group_positions()
         
         # Create lag features
-        for lag in [1, 3, 7, 14, 30]:
-            df[f'demand_lag_{lag}'] = df.groupby('item_id')['demand'].shift(lag)
+        for lag in LAG_PERIODS:
+            df[f'demand_lag_{lag}'] = grouped_lag(demand, positions, lag)
         
         # Rolling statistics
-        for window in [7, 14, 30]:
-            df[f'demand_rolling_mean_{window}'] = df.groupby('item_id')['demand'].rolling(window).mean().reset_index(0, drop=True)
-            df[f'demand_rolling_std_{window}'] = df.groupby('item_id')['demand'].rolling(window).std().reset_index(0, drop=True)
+        for window in ROLLING_WINDOWS:
+            rolling_mean, rolling_std = grouped_rolling_mean_std(demand, positions, index, window)
+            df[f'demand_rolling_mean_{window}'] = rolling_mean
+            df[f'demand_rolling_std_{window}'] = rolling_std
         
         # Cyclical features
         df['day_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
@@ -168,10 +210,11 @@ class AdvancedPredictiveAnalytics:
         df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
         
         # Stock-to-demand ratio
-        df['stock_demand_ratio'] = df['stock_level'] / (df['demand'] + 1)
+        df['stock_demand_ratio'] = df['stock_level'].astype(float) / (demand + 1)
         
         # Fill missing values
-        df = df.fillna(method='ffill').fillna(0)
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        df[numeric_cols] = df[numeric_cols].ffill().fillna(0)
         
         return df
     
@@ -181,9 +224,12 @@ class AdvancedPredictiveAnalytics:
         
         results = {}
         feature_cols = [col for col in df.columns if col not in ['date', 'item_id', 'item_name', 'demand']]
+        self.feature_columns = feature_cols
+        
+        index = ItemHistoryIndex(sort_by_item_date(df))
         
-        for item_id in df['item_id'].unique():
-            item_data = df[df['item_id'] == item_id].copy()
+        for item_id in index.item_ids:
+            item_data = index.slice(item_id)
             
             if len(item_data) < 50:  # Need sufficient data
                 continue
@@ -227,45 +273,53 @@ class AdvancedPredictiveAnalytics:
             logger.info(f"Trained model for {item_id}: MAE={mae:.2f}, RMSE={rmse:.2f}")
         
         self.is_trained = True
+        self._bump_data_version()
         return results
     
     async def forecast_demand(self, item_id: str, forecast_days: int = 30) -> ForecastResult:
-        """Generate demand forecast for specific item"""
+        """Generate demand forecast for specific item (served from the shared forecast cache)"""
         if not self.is_trained or item_id not in self.models:
             logger.warning(f"Model not trained for item {item_id}")
             return None
         
+        cache_key = ForecastCache.make_key(item_id, forecast_days, "RandomForest", self.data_version)
+        return await self.forecast_cache.get_or_compute(
+            cache_key, lambda: self._compute_forecast(item_id, forecast_days)
+        )
+    
+    async def _compute_forecast(self, item_id: str, forecast_days: int) -> ForecastResult:
+        """Compute a demand forecast from the trained model (uncached)"""
         logger.info(f"Generating {forecast_days}-day forecast for {item_id}")
         
-        # Get recent data for the item
-        item_data = self.historical_data[self.historical_data['item_id'] == item_id].tail(60)
-        item_name = item_data['item_name'].iloc[0]
+        # Read live features from the online feature store, falling back to
+        # recomputing them from raw history for items it does not track
+        last_features = None
+        if item_id in self.feature_store and self.feature_columns:
+            last_features = self.feature_store.get_feature_vector(item_id, self.feature_columns).reshape(1, -1)
+            item_name = self.feature_store.latest_observation(item_id).get('item_name', item_id)
         
-        # Prepare features for forecasting
-        df_prepared = self.prepare_features(item_data)
-        feature_cols = [col for col in df_prepared.columns if col not in ['date', 'item_id', 'item_name', 'demand']]
+        if last_features is None:
+            self._flush_pending_observations()
+            item_data = self.history_index.slice(item_id).tail(60)
+            item_name = item_data['item_name'].iloc[0]
+            df_prepared = self.prepare_features(item_data)
+            feature_cols = [col for col in df_prepared.columns if col not in ['date', 'item_id', 'item_name', 'demand']]
+            last_features = df_prepared[feature_cols].iloc[-1].values.reshape(1, -1)
         
-        forecasts = []
-        confidence_intervals = []
+        # Scale features
+        scaled_features = self.scalers[item_id].transform(last_features)
         
-        # Generate forecasts
-        for day in range(forecast_days):
-            # Use last available features
-            last_features = df_prepared[feature_cols].iloc[-1].values.reshape(1, -1)
-            
-            # Scale features
-            scaled_features = self.scalers[item_id].transform(last_features)
-            
-            # Predict
-            forecast = self.models[item_id].predict(scaled_features)[0]
-            
-            # Estimate confidence interval (simplified)
-            std_dev = np.std([tree.predict(scaled_features)[0] for tree in self.models[item_id].estimators_[:10]])
-            ci_lower = max(0, forecast - 1.96 * std_dev)
-            ci_upper = forecast + 1.96 * std_dev
-            
-            forecasts.append(max(0, forecast))
-            confidence_intervals.append((ci_lower, ci_upper))
+        # Predict (features are constant over the horizon, so predict once)
+        forecast = self.models[item_id].predict(scaled_features)[0]
+        
+        # Estimate confidence interval (simplified)
+        std_dev = np.std([tree.predict(scaled_features)[0] for tree in self.models[item_id].estimators_[:10]])
+        z = float(normal_ppf(0.5 + FORECAST_INTERVAL_LEVEL / 2))
+        ci_lower = max(0, forecast - z * std_dev)
+        ci_upper = forecast + z * std_dev
+        
+        forecasts = [max(0, forecast)] * forecast_days
+        confidence_intervals = [(ci_lower, ci_upper)] * forecast_days
         
         # Calculate accuracy score (simplified)
         accuracy_score = 0.85 + np.random.uniform(0, 0.1)  # Simulated accuracy
@@ -281,64 +335,63 @@ class AdvancedPredictiveAnalytics:
             generated_at=datetime.now()
         )
     
-    async def detect_anomalies(self, current_data: Dict[str, Any]) -> List[AnomalyDetection]:
-        """Detect anomalies in current supply data"""
+    def record_observation(self, item_id: str, observation: Dict[str, Any]):
+        """
+        Record a new daily observation for an item (O(1) feature update).
+        
+        Only this item's cached forecasts are dropped and only its anomaly detector is
+        rechecked; other items keep their forecasts and detectors.
+        """
+        observation = OnlineFeatureStore.normalize_observation(observation)
+        self.feature_store.update(item_id, observation)
+        self._pending_observations.append({'item_id': item_id, **observation})
+        self.forecast_cache.invalidate(item_id=item_id)
+        self._stale_detector_items.add(item_id)
+        self._insights_cache = None
+    
+    def _flush_pending_observations(self):
+        """Append recorded observations to the historical frame for batch paths"""
+        if not self._pending_observations:
+            return
+        pending = pd.DataFrame(self._pending_observations)
+        if isinstance(self.historical_data, pd.DataFrame) and len(self.historical_data) > 0:
+            pending = pd.concat([self.historical_data.astype({'item_id': str, 'item_name': str}), pending],
+                                ignore_index=True)
+        self._pending_observations = []
+        self._set_historical_data(pending, reload_features=False, bump_version=False)
+    
+    async def detect_anomalies(self, current_data: Optional[Dict[str, Any]] = None) -> List[AnomalyDetection]:
+        """Detect anomalies in current supply data (all items' latest observations if omitted)"""
         logger.info("Running anomaly detection")
         
         anomalies = []
         
-        # Isolation Forest for anomaly detection
+        # Fill the current observations from the feature store's live view
+        latest = self.feature_store.latest_observations()
+        if current_data is None:
+            current_data = latest
+        else:
+            current_data = {
+                item_id: {**latest.get(item_id, {}), **data}
+                for item_id, data in current_data.items()
+            }
+        
+        # Isolation Forest detectors are fitted once per item and only
+        # refreshed when the underlying history changes
         if len(self.historical_data) > 100:
-            # Prepare data
-            df = self.historical_data.copy()
-            feature_cols = ['demand', 'stock_level', 'procurement_cost', 'supplier_lead_time']
+            if self.anomaly_detectors.data_version != self.data_version:
+                self._flush_pending_observations()
+                self.anomaly_detectors.refresh(self.history_index, self.data_version)
+                self._stale_detector_items.clear()
+            elif self._stale_detector_items:
+                self._flush_pending_observations()
+                self.anomaly_detectors.refresh(self.history_index, item_ids=sorted(self._stale_detector_items))
+                self._stale_detector_items.clear()
             
-            for item_id in df['item_id'].unique():
-                item_data = df[df['item_id'] == item_id][feature_cols]
-                
-                if len(item_data) < 30:
-                    continue
-                
-                # Train isolation forest
-                iso_forest = IsolationForest(contamination=0.1, random_state=42)
-                iso_forest.fit(item_data)
-                
-                # Check current data point
-                if item_id in current_data:
-                    current_point = [
-                        current_data[item_id].get('demand', 0),
-                        current_data[item_id].get('stock_level', 0),
-                        current_data[item_id].get('procurement_cost', 0),
-                        current_data[item_id].get('supplier_lead_time', 7)
-                    ]
-                    
-                    anomaly_score = iso_forest.decision_function([current_point])[0]
-                    is_anomaly = iso_forest.predict([current_point])[0] == -1
-                    
-                    if is_anomaly:
-                        # Determine anomaly type and severity
-                        if current_point[0] > item_data['demand'].mean() + 2 * item_data['demand'].std():
-                            anomaly_type = "Demand Spike"
-                            severity = "High"
-                            recommendation = "Increase procurement immediately"
-                        elif current_point[1] < item_data['stock_level'].mean() - 2 * item_data['stock_level'].std():
-                            anomaly_type = "Stock Depletion"
-                            severity = "Critical"
-                            recommendation = "Emergency restocking required"
-                        else:
-                            anomaly_type = "General Anomaly"
-                            severity = "Medium"
-                            recommendation = "Monitor closely"
-                        
-                        anomalies.append(AnomalyDetection(
-                            item_id=item_id,
-                            anomaly_score=abs(anomaly_score),
-                            is_anomaly=True,
-                            detected_at=datetime.now(),
-                            anomaly_type=anomaly_type,
-                            severity=severity,
-                            recommendation=recommendation
-                        ))
+            anomalies = [
+                AnomalyDetection(**anomaly)
+                for anomaly in self.anomaly_detectors.score_batch(current_data)
+            ]
         
         logger.info(f"Detected {len(anomalies)} anomalies")
         return anomalies
@@ -350,67 +403,84 @@ class AdvancedPredictiveAnalytics:
         recommendations = []
         total_savings = 0
         
-        for item_id, data in current_inventory.items():
-            # Get forecast for next 30 days
+        # Get forecast for next 30 days
+        item_ids, forecasts = [], []
+        for item_id in current_inventory:
             forecast = await self.forecast_demand(item_id, 30)
-            
             if forecast:
-                # Calculate optimal order quantity and timing
-                avg_daily_demand = np.mean(forecast.forecast_values)
-                current_stock = data.get('stock_level', 0)
-                lead_time = data.get('supplier_lead_time', 7)
-                
-                # Safety stock calculation
-                demand_std = np.std(forecast.forecast_values)
-                safety_stock = lead_time * demand_std * 1.65  # 95% service level
-                
-                # Reorder point
-                reorder_point = (avg_daily_demand * lead_time) + safety_stock
-                
-                # Economic Order Quantity (simplified)
-                annual_demand = avg_daily_demand * 365
-                ordering_cost = 50  # Fixed ordering cost
-                holding_cost_rate = 0.20  # 20% of item value
-                item_cost = data.get('unit_cost', 25)
-                
-                eoq = np.sqrt((2 * annual_demand * ordering_cost) / (holding_cost_rate * item_cost))
+                item_ids.append(item_id)
+                forecasts.append(forecast)
+        
+        # Policy parameters for every forecast item at once
+        data = [current_inventory[item_id] for item_id in item_ids]
+        avg_daily_demand = np.array([np.mean(forecast.forecast_values) for forecast in forecasts])
+        # Daily demand std from the forecast interval width (the forecast path itself is flat)
+        interval_width = np.array([
+            np.mean([upper - lower for lower, upper in forecast.confidence_intervals]) if forecast.confidence_intervals else 0.0
+            for forecast in forecasts
+        ])
+        demand_std = interval_width / (2 * normal_ppf(0.5 + FORECAST_INTERVAL_LEVEL / 2))
+        current_stock = np.array([item.get('stock_level', 0) for item in data], dtype=float)
+        lead_time = np.array([item.get('supplier_lead_time', 7) for item in data], dtype=float)
+        item_cost = np.array([item.get('unit_cost', 25) for item in data], dtype=float)
+        
+        # Safety stock calculation
+        safety_stock = safety_stock_for_service_level(TARGET_SERVICE_LEVEL, demand_std, lead_time)
+        
+        # Reorder point
+        lead_time_demand = avg_daily_demand * lead_time
+        reorder_point = lead_time_demand + safety_stock
+        
+        # Economic Order Quantity (simplified)
+        annual_demand = avg_daily_demand * 365
+        ordering_cost = 50  # Fixed ordering cost
+        holding_cost_rate = 0.20  # 20% of item value
+        eoq = np.sqrt((2 * annual_demand * ordering_cost) / (holding_cost_rate * item_cost))
+        
+        # Risk of running out before a replenishment ordered now arrives, and the fill rate of the policy
+        current_stockout_risk = stockout_probability(current_stock - lead_time_demand, demand_std, lead_time)
+        policy_fill_rate = fill_rate(safety_stock, eoq, demand_std, lead_time)
+        
+        # Generate recommendations
+        for i, item_id in enumerate(item_ids):
+            item = data[i]
+            if current_stock[i] < reorder_point[i]:
+                order_quantity = max(eoq[i], reorder_point[i] - current_stock[i])
+                priority = "High" if current_stock[i] < safety_stock[i] else "Medium"
                 
-                # Generate recommendations
-                if current_stock < reorder_point:
-                    order_quantity = max(eoq, reorder_point - current_stock)
-                    priority = "High" if current_stock < safety_stock else "Medium"
-                    
-                    # Estimate savings
-                    current_holding_cost = current_stock * item_cost * holding_cost_rate / 365 * 30
-                    optimized_holding_cost = eoq * item_cost * holding_cost_rate / 365 * 30
-                    monthly_savings = max(0, current_holding_cost - optimized_holding_cost)
-                    total_savings += monthly_savings
-                    
-                    recommendations.append({
-                        "item_id": item_id,
-                        "item_name": data.get('name', item_id),
-                        "action": "Reorder",
-                        "current_stock": current_stock,
-                        "recommended_order_qty": round(order_quantity),
-                        "reorder_point": round(reorder_point),
-                        "safety_stock": round(safety_stock),
-                        "priority": priority,
-                        "estimated_monthly_savings": round(monthly_savings, 2),
-                        "reasoning": f"Stock level ({current_stock}) below reorder point ({reorder_point:.0f})"
-                    })
+                # Estimate savings
+                current_holding_cost = current_stock[i] * item_cost[i] * holding_cost_rate / 365 * 30
+                optimized_holding_cost = eoq[i] * item_cost[i] * holding_cost_rate / 365 * 30
+                monthly_savings = max(0, current_holding_cost - optimized_holding_cost)
+                total_savings += monthly_savings
                 
-                elif current_stock > eoq * 2:  # Overstock situation
-                    recommendations.append({
-                        "item_id": item_id,
-                        "item_name": data.get('name', item_id),
-                        "action": "Reduce_Orders",
-                        "current_stock": current_stock,
-                        "optimal_stock": round(eoq),
-                        "excess_stock": round(current_stock - eoq),
-                        "priority": "Low",
-                        "estimated_monthly_savings": round(current_stock * item_cost * holding_cost_rate / 365 * 30 * 0.3, 2),
-                        "reasoning": f"Overstock detected. Current: {current_stock}, Optimal: {eoq:.0f}"
-                    })
+                recommendations.append({
+                    "item_id": item_id,
+                    "item_name": item.get('name', item_id),
+                    "action": "Reorder",
+                    "current_stock": item.get('stock_level', 0),
+                    "recommended_order_qty": round(order_quantity),
+                    "reorder_point": round(reorder_point[i]),
+                    "safety_stock": round(safety_stock[i]),
+                    "stockout_probability": round(float(current_stockout_risk[i]), 4),
+                    "fill_rate": round(float(policy_fill_rate[i]), 4),
+                    "priority": priority,
+                    "estimated_monthly_savings": round(monthly_savings, 2),
+                    "reasoning": f"Stock level ({item.get('stock_level', 0)}) below reorder point ({reorder_point[i]:.0f})"
+                })
+            
+            elif current_stock[i] > eoq[i] * 2:  # Overstock situation
+                recommendations.append({
+                    "item_id": item_id,
+                    "item_name": item.get('name', item_id),
+                    "action": "Reduce_Orders",
+                    "current_stock": item.get('stock_level', 0),
+                    "optimal_stock": round(eoq[i]),
+                    "excess_stock": round(current_stock[i] - eoq[i]),
+                    "priority": "Low",
+                    "estimated_monthly_savings": round(current_stock[i] * item_cost[i] * holding_cost_rate / 365 * 30 * 0.3, 2),
+                    "reasoning": f"Overstock detected. Current: {item.get('stock_level', 0)}, Optimal: {eoq[i]:.0f}"
+                })
         
         confidence_score = 0.82 + np.random.uniform(0, 0.15)  # Simulated confidence
         
@@ -423,52 +493,86 @@ class AdvancedPredictiveAnalytics:
             generated_at=datetime.now()
         )
     
-    async def generate_predictive_insights(self) -> Dict[str, Any]:
-        """Generate comprehensive predictive insights"""
-        logger.info("Generating predictive insights")
-        
+    def _compute_insights(self) -> Dict[str, Any]:
+        """Trend, volatility and risk factors for every item in one grouped pass"""
         insights = {
             "demand_trends": {},
             "risk_factors": [],
             "optimization_opportunities": [],
             "seasonal_patterns": {},
+            "data_version": self.data_version,
             "generated_at": datetime.now().isoformat()
         }
         
-        if len(self.historical_data) > 0:
-            # Analyze demand trends
-            for item_id in self.historical_data['item_id'].unique():
-                item_data = self.historical_data[self.historical_data['item_id'] == item_id]
-                
-                # Calculate trend
-                recent_demand = item_data.tail(30)['demand'].mean()
-                historical_demand = item_data.head(30)['demand'].mean()
-                trend_change = ((recent_demand - historical_demand) / historical_demand) * 100
-                
-                insights["demand_trends"][item_id] = {
-                    "trend_percentage": round(trend_change, 2),
-                    "direction": "Increasing" if trend_change > 5 else "Decreasing" if trend_change < -5 else "Stable",
-                    "recent_avg_demand": round(recent_demand, 2),
-                    "volatility": round(item_data['demand'].std(), 2)
-                }
-                
-                # Risk factors
-                if trend_change > 20:
-                    insights["risk_factors"].append({
-                        "item_id": item_id,
-                        "risk_type": "Demand Surge",
-                        "severity": "High",
-                        "description": f"Demand increased by {trend_change:.1f}% - potential shortage risk"
-                    })
-                elif item_data['demand'].std() > item_data['demand'].mean():
-                    insights["risk_factors"].append({
-                        "item_id": item_id,
-                        "risk_type": "High Volatility",
-                        "severity": "Medium",
-                        "description": "Highly variable demand pattern detected"
-                    })
+        index = self.history_index
+        if index is None or len(index) == 0:
+            return insights
+        
+        demand = index.column('demand').astype(float)
+        lengths = index.lengths
+        window = np.minimum(lengths, 30)
+        cumsum = np.concatenate([[0.0], np.cumsum(demand)])
+        
+        # Head/tail means from the cumulative sum at each item's offsets
+        historical_demand = (cumsum[index.starts + window] - cumsum[index.starts]) / window
+        recent_demand = (cumsum[index.stops] - cumsum[index.stops - window]) / window
+        
+        # Per-item mean and sample std (ddof=1) via grouped reductions
+        mean_demand = index.group_reduce(demand) / lengths
+        deviations = demand - np.repeat(mean_demand, lengths)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volatility = np.sqrt(index.group_reduce(deviations * deviations) / (lengths - 1))
+            trend_change = (recent_demand - historical_demand) / historical_demand * 100
+        
+        direction = np.where(trend_change > 5, "Increasing", np.where(trend_change < -5, "Decreasing", "Stable"))
+        is_surge = trend_change > 20
+        is_volatile = ~is_surge & (volatility > mean_demand)
+        
+        trend_rounded = np.round(trend_change, 2)
+        recent_rounded = np.round(recent_demand, 2)
+        volatility_rounded = np.round(volatility, 2)
+        
+        for i, item_id in enumerate(index.item_ids):
+            insights["demand_trends"][item_id] = {
+                "trend_percentage": _finite_or_none(trend_rounded[i]),
+                "direction": str(direction[i]),
+                "recent_avg_demand": _finite_or_none(recent_rounded[i]),
+                "volatility": _finite_or_none(volatility_rounded[i])
+            }
+        
+        # Risk factors
+        for i in np.flatnonzero(is_surge | is_volatile):
+            if is_surge[i]:
+                insights["risk_factors"].append({
+                    "item_id": index.item_ids[i],
+                    "risk_type": "Demand Surge",
+                    "severity": "High",
+                    "description": f"Demand increased by {trend_change[i]:.1f}% - potential shortage risk"
+                })
+            else:
+                insights["risk_factors"].append({
+                    "item_id": index.item_ids[i],
+                    "risk_type": "High Volatility",
+                    "severity": "Medium",
+                    "description": "Highly variable demand pattern detected"
+                })
         
         return insights
+    
+    async def generate_predictive_insights(self) -> Dict[str, Any]:
+        """Generate comprehensive predictive insights (cached per data version)"""
+        cached = self._insights_cache
+        if cached is not None and cached["data_version"] == self.data_version:
+            return cached
+        
+        logger.info("Generating predictive insights")
+        self._flush_pending_observations()
+        self._insights_cache = self._compute_insights()
+        return self._insights_cache
+
+def _finite_or_none(value: float) -> Optional[float]:
+    value = float(value)
+    return value if np.isfinite(value) else None
 
 # Singleton instance
 predictive_analytics = AdvancedPredictiveAnalytics()
@@ -0,0 +1,242 @@
+"""
+Memoized Series Summaries for Seasonality Detection and Decomposition
+
+This module implements:
+- Per-item sufficient statistics for weekday / day-of-month seasonality
+  (counts, sums and sums of squares per period)
+- Per-weekday sums of the detrended series over positions whose centered
+  trend is final, for the weekly seasonal component
+- Memoization keyed by item with a series fingerprint, in a bounded LRU
+- Results derived from a summary (seasonal patterns) kept on it, so they share its bound
+- Incremental extension when only new days were appended to a series
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = 7
+MONTH_DAYS = 32  # Day-of-month codes 1..31 (0 unused)
+
+def decomposition_window(n_obs: int) -> int:
+    """Centered moving-average window used by the trend decomposition"""
+    return max(1, min(30, n_obs // 4))
+
+def day_of_week(dates: np.ndarray) -> np.ndarray:
+    """Monday=0 weekday codes from integer day counts (1970-01-01 was a Thursday)"""
+    return (np.asarray(dates).astype('datetime64[D]').astype(np.int64) + 3) % WEEKDAYS
+
+def day_of_month(dates: np.ndarray) -> np.ndarray:
+    return pd.DatetimeIndex(np.asarray(dates).ravel()).day.to_numpy().reshape(np.shape(dates))
+
+def _fingerprint(values: np.ndarray, first_ns: int) -> str:
+    digest = hashlib.blake2b(values.tobytes(), digest_size=16)
+    digest.update(first_ns.to_bytes(8, 'little', signed=True))
+    return digest.hexdigest()
+
+def series_fingerprint(values: np.ndarray, first_date: np.datetime64) -> str:
+    """Content hash of a series and its start date"""
+    return _fingerprint(np.ascontiguousarray(values, dtype=float),
+                        int(np.datetime64(first_date, 'ns').astype(np.int64)))
+
+@dataclass
+class SeriesSummary:
+    fingerprint: str
+    n_obs: int
+    first_date: np.datetime64
+    shift: float                 # Reference level subtracted before accumulating squares
+    weekday: np.ndarray          # (3, 7): count, sum, sum of squares of (value - shift)
+    month_day: np.ndarray        # (3, 32)
+    window: int
+    detrended: np.ndarray        # (2, 7): count, sum of (value - centered trend) per weekday
+    patterns: Optional[Dict[str, Any]] = None  # Seasonal patterns detected from these statistics
+
+def _period_stats(values: np.ndarray, codes: np.ndarray, n_periods: int) -> np.ndarray:
+    """(rows, 3, periods) count / sum / sum of squares of values grouped by code, per row"""
+    n_rows = values.shape[0]
+    flat = (np.arange(n_rows)[:, None] * n_periods + codes).ravel()
+    size = n_rows * n_periods
+    stats = np.stack([
+        np.bincount(flat, minlength=size),
+        np.bincount(flat, weights=values.ravel(), minlength=size),
+        np.bincount(flat, weights=(values * values).ravel(), minlength=size)
+    ]).reshape(3, n_rows, n_periods)
+    return stats.transpose(1, 0, 2)
+
+def _detrended_stats(values: np.ndarray, weekdays: np.ndarray, window: int, start: int) -> np.ndarray:
+    """
+    (rows, 2, 7) count / sum of value minus centered trend, per weekday, for centered
+    positions whose trailing window ends at index >= start
+    """
+    n_rows, n_obs = values.shape
+    half = (window - 1) // 2
+    first_end = max(start, window - 1)
+    if first_end >= n_obs:
+        return np.zeros((n_rows, 2, WEEKDAYS))
+
+    # Only days from the first affected window onwards are read
+    offset = first_end - (window - 1)
+    values, weekdays = values[:, offset:], weekdays[:, offset:]
+    cumsum = np.concatenate([np.zeros((n_rows, 1)), np.cumsum(values, axis=1)], axis=1)
+    ends = np.arange(first_end - offset, n_obs - offset)
+    trend = (cumsum[:, ends + 1] - cumsum[:, ends + 1 - window]) / window
+    positions = ends - half
+    detrended = values[:, positions] - trend
+
+    flat = (np.arange(n_rows)[:, None] * WEEKDAYS + weekdays[:, positions]).ravel()
+    size = n_rows * WEEKDAYS
+    stats = np.stack([
+        np.bincount(flat, minlength=size),
+        np.bincount(flat, weights=detrended.ravel(), minlength=size)
+    ]).reshape(2, n_rows, WEEKDAYS)
+    return stats.transpose(1, 0, 2)
+
+class SeriesSummaryCache:
+    """
+    Bounded LRU of series summaries keyed by item
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, SeriesSummary]" = OrderedDict()
+        self.hits = 0
+        self.extensions = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[SeriesSummary]:
+        return self._entries.get(key)
+
+    def items(self):
+        return self._entries.items()
+
+    def _store(self, key: str, summary: SeriesSummary):
+        self._entries[key] = summary
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def summarize(self, keys: List[str], demand_matrix: np.ndarray, dates: np.ndarray) -> Dict[str, Any]:
+        """
+        Stacked summaries for equal-length series (rows of demand_matrix).
+
+        Unchanged series are served from the cache (flagged in 'reused'), series
+        that only gained days at the end are extended with the new days, and the
+        rest are computed from scratch, each group in one vectorized pass.
+        """
+        demand_matrix = np.ascontiguousarray(demand_matrix, dtype=float)
+        n_rows, n_obs = demand_matrix.shape
+        weekdays = day_of_week(dates)
+        window = decomposition_window(n_obs)
+        first_ns = dates[:, 0].astype('datetime64[ns]').astype(np.int64).tolist()
+
+        summaries: List[Optional[SeriesSummary]] = [None] * n_rows
+        fingerprints = [_fingerprint(demand_matrix[row], first_ns[row]) for row in range(n_rows)]
+        reused = np.zeros(n_rows, dtype=bool)
+        fresh, extend = [], {}
+        for row, key in enumerate(keys):
+            cached = self._entries.get(key)
+            if cached is not None and cached.fingerprint == fingerprints[row]:
+                self._entries.move_to_end(key)
+                summaries[row] = cached
+                reused[row] = True
+            elif (cached is not None and cached.n_obs < n_obs and cached.window == window
+                  and cached.first_date == dates[row, 0]
+                  and _fingerprint(demand_matrix[row, :cached.n_obs], first_ns[row]) == cached.fingerprint):
+                extend.setdefault(cached.n_obs, []).append(row)
+            else:
+                fresh.append(row)
+        self.hits += int(reused.sum())
+
+        def _store_rows(rows, shift, weekday, month_day, detrended):
+            for i, row in enumerate(rows):
+                summaries[row] = SeriesSummary(
+                    fingerprint=fingerprints[row], n_obs=n_obs, first_date=dates[row, 0],
+                    shift=float(shift[i]), weekday=weekday[i], month_day=month_day[i],
+                    window=window, detrended=detrended[i]
+                )
+                self._store(keys[row], summaries[row])
+
+        if fresh:
+            rows = np.array(fresh)
+            shift = demand_matrix[rows, :min(WEEKDAYS, n_obs)].mean(axis=1)
+            shifted = demand_matrix[rows] - shift[:, None]
+            _store_rows(rows, shift,
+                        _period_stats(shifted, weekdays[rows], WEEKDAYS),
+                        _period_stats(shifted, day_of_month(dates[rows]), MONTH_DAYS),
+                        _detrended_stats(demand_matrix[rows], weekdays[rows], window, 0))
+            self.misses += len(rows)
+
+        for previous_n, rows in extend.items():
+            # Only the appended days are folded in; earlier days keep their sums
+            rows = np.array(rows)
+            previous = [self._entries[keys[row]] for row in rows]
+            shift = np.array([summary.shift for summary in previous])
+            tail = demand_matrix[rows, previous_n:] - shift[:, None]
+            weekday = np.stack([summary.weekday for summary in previous]) \
+                + _period_stats(tail, weekdays[rows, previous_n:], WEEKDAYS)
+            month_day = np.stack([summary.month_day for summary in previous]) \
+                + _period_stats(tail, day_of_month(dates[rows, previous_n:]), MONTH_DAYS)
+            detrended = np.stack([summary.detrended for summary in previous]) \
+                + _detrended_stats(demand_matrix[rows], weekdays[rows], window, previous_n)
+            _store_rows(rows, shift, weekday, month_day, detrended)
+            self.extensions += len(rows)
+
+        return {
+            'summaries': summaries,
+            'weekday': np.stack([s.weekday for s in summaries]),
+            'month_day': np.stack([s.month_day for s in summaries]),
+            'shift': np.array([s.shift for s in summaries]),
+            'detrended': np.stack([s.detrended for s in summaries]),
+            'weekdays': weekdays,
+            'reused': reused
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.extensions + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'extensions': self.extensions,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'reuse_rate': (self.hits + self.extensions) / lookups if lookups else 0.0
+        }
+
+def period_means_stds(stats: np.ndarray, shift: np.ndarray):
+    """Per-period mean and sample std from (rows, 3, periods) stats; NaN where undefined"""
+    count, total, squares = stats[:, 0], stats[:, 1], stats[:, 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shifted_mean = total / count
+        variance = (squares - total * shifted_mean) / (count - 1)
+        stds = np.sqrt(np.maximum(variance, 0.0))
+    stds[count < 2] = np.nan
+    return shifted_mean + shift[:, None], stds
+
+def weekly_seasonal_means(detrended: np.ndarray) -> np.ndarray:
+    """Mean detrended value per weekday (NaN for weekdays without a settled position)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return detrended[:, 1] / detrended[:, 0]
+
+# Export main components
+__all__ = [
+    'SeriesSummary',
+    'SeriesSummaryCache',
+    'decomposition_window',
+    'day_of_week',
+    'series_fingerprint',
+    'period_means_stds',
+    'weekly_seasonal_means'
+]
@@ -0,0 +1,316 @@
+"""
+In-Process Background Job Queue for Long-Running API Computations
+Jobs run on a pool of worker tasks in priority order; identical submissions share one job.
+CPU-bound kinds run on executor threads so the serving event loop stays responsive
+"""
+
+from typing import Dict, Any, Callable, Awaitable, Optional, List, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+import asyncio
+import itertools
+import logging
+import threading
+import time
+import uuid
+
+try:
+    from .request_coalescing import normalize_params
+except ImportError:
+    from request_coalescing import normalize_params
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = "queued", "running", "completed", "failed", "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class _ThreadedCall:
+    """A handler coroutine run to completion on its own event loop in an executor thread"""
+
+    def __init__(self, handler: JobHandler, params: Dict[str, Any]):
+        self.handler = handler
+        self.params = params
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._cancelled = False
+
+    def run(self) -> Any:
+        loop = asyncio.new_event_loop()
+        try:
+            with self._lock:
+                if self._cancelled:
+                    raise asyncio.CancelledError()
+                self._loop = loop
+                self._task = loop.create_task(self.handler(self.params))
+            return loop.run_until_complete(self._task)
+        finally:
+            with self._lock:
+                self._loop = None
+            loop.close()
+
+    def cancel(self):
+        """Cancel the handler on its own loop (or before it starts); safe from any thread"""
+        with self._lock:
+            self._cancelled = True
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    params: Dict[str, Any]
+    key: Tuple[str, str]
+    priority: int
+    status: str = QUEUED
+    submitted_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[str] = None
+    submissions: int = 1
+    expires_at: Optional[float] = None  # Monotonic time the finished job is dropped
+    _task: Optional[asyncio.Task] = None
+    _done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "priority": self.priority,
+            "status": self.status,
+            "submissions": self.submissions,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobQueue:
+    """
+    Runs registered job kinds on `workers` worker tasks, highest priority first
+    (FIFO within a priority). Submitting the same kind and parameters while a job
+    is queued or running returns that job, raising its priority if needed.
+    Finished jobs and their results are kept for result_ttl seconds.
+
+    Kinds registered with offload=True run on one of `workers` executor threads,
+    each on a private event loop; their handlers reach the serving loop (for
+    example to publish to websockets) through on_serving_loop.
+    """
+
+    def __init__(self, workers: int = 2, result_ttl: float = 900.0, max_finished_jobs: int = 200):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.max_finished_jobs = max_finished_jobs
+        self._handlers: Dict[str, JobHandler] = {}
+        self._offloaded: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[Tuple[str, str], Job] = {}
+        self._latest: Dict[str, Job] = {}
+        self._sequence = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._loop = None
+        self._metrics = {"submitted": 0, "deduplicated": 0, "completed": 0, "failed": 0, "cancelled": 0, "expired": 0}
+
+    def register(self, kind: str, handler: JobHandler, offload: bool = False):
+        """Add a job kind; offload runs its handler on an executor thread instead of the serving loop"""
+        self._handlers[kind] = handler
+        if offload:
+            self._offloaded.add(kind)
+        else:
+            self._offloaded.discard(kind)
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker_tasks:
+            return
+        # Started lazily on the serving event loop; restarted if that loop changes
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        for job in list(self._jobs.values()):
+            if job.status == QUEUED:
+                self._enqueue(job)
+            elif job.status == RUNNING:
+                job.status = FAILED
+                job.error = "Interrupted: event loop changed"
+                self._metrics[FAILED] += 1
+                self._settle(job)
+        self._worker_tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _enqueue(self, job: Job):
+        self._queue.put_nowait((-job.priority, next(self._sequence), job))
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None, priority: int = 0) -> Job:
+        """Queue a job (or join the identical queued / running one); must be called on the event loop"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}', expected one of {list(self._handlers)}")
+        self._ensure_workers()
+        self._purge()
+        params = dict(params or {})
+        key = (kind, normalize_params(params))
+        self._metrics["submitted"] += 1
+
+        job = self._active.get(key)
+        if job is not None:
+            self._metrics["deduplicated"] += 1
+            job.submissions += 1
+            if job.status == QUEUED and priority > job.priority:
+                job.priority = priority
+                self._enqueue(job)  # The stale lower-priority entry is skipped by the workers
+            return job
+
+        job = Job(job_id=uuid.uuid4().hex[:12], kind=kind, params=params, key=key, priority=priority)
+        self._jobs[job.job_id] = job
+        self._active[key] = job
+        self._enqueue(job)
+        return job
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            if job.status != QUEUED:
+                continue
+            job.status = RUNNING
+            job.started_at = datetime.now()
+            job._task = asyncio.ensure_future(self._run_handler(job))
+            try:
+                await asyncio.wait([job._task])
+            except asyncio.CancelledError:
+                # Worker stopped: the job is cancelled with it
+                job._task.cancel()
+                job.status = CANCELLED
+                self._metrics[CANCELLED] += 1
+                self._settle(job)
+                raise
+            self._finish(job)
+
+    async def _run_handler(self, job: Job) -> Any:
+        handler = self._handlers[job.kind]
+        if job.kind not in self._offloaded:
+            return await handler(job.params)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        call = _ThreadedCall(handler, job.params)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call.run)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            call.cancel()  # The thread stops at the handler's next await
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())  # Nothing awaits it now
+            raise
+
+    async def on_serving_loop(self, coroutine: Awaitable[Any]) -> Any:
+        """Await a coroutine on the serving event loop, also from an offloaded handler's thread"""
+        loop = asyncio.get_running_loop()
+        if self._loop is None or loop is self._loop or self._loop.is_closed():
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self._loop))
+
+    def _finish(self, job: Job):
+        task = job._task
+        if task.cancelled():
+            job.status = CANCELLED
+        elif task.exception() is not None:
+            job.status = FAILED
+            job.error = str(task.exception()) or type(task.exception()).__name__
+            logger.error(f"Job {job.job_id} ({job.kind}) failed: {job.error}")
+        else:
+            job.status = COMPLETED
+            job.result = task.result()
+            self._latest[job.kind] = job
+        self._metrics[job.status] += 1
+        self._settle(job)
+
+    def _settle(self, job: Job):
+        job.finished_at = datetime.now()
+        job.expires_at = time.monotonic() + self.result_ttl
+        job._task = None
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+        job._done.set()
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False when it has already finished"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        if job.status == QUEUED:
+            job.status = CANCELLED
+            self._metrics[CANCELLED] += 1
+            self._settle(job)
+        else:
+            job._task.cancel()  # Settled by its worker
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    def latest(self, kind: str) -> Optional[Job]:
+        """Most recently completed job of a kind whose result has not expired"""
+        self._purge()
+        return self._latest.get(kind)
+
+    def jobs(self, kind: Optional[str] = None) -> List[Job]:
+        self._purge()
+        return [job for job in self._jobs.values() if kind is None or job.kind == kind]
+
+    async def wait(self, job: Job, timeout: Optional[float] = None) -> Job:
+        await asyncio.wait_for(job._done.wait(), timeout)
+        return job
+
+    def _purge(self):
+        now = time.monotonic()
+        finished = [job for job in self._jobs.values() if job.finished]
+        excess = len(finished) - self.max_finished_jobs
+        for job in finished:
+            if job.expires_at <= now or excess > 0:
+                excess -= 1
+                del self._jobs[job.job_id]
+                self._metrics["expired"] += 1
+                if self._latest.get(job.kind) is job:
+                    del self._latest[job.kind]
+
+    async def stop(self):
+        """Cancel the workers and every unfinished job"""
+        for job in list(self._jobs.values()):
+            self.cancel(job.job_id)
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        self._purge()
+        states = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+        for job in self._jobs.values():
+            states[job.status] += 1
+        return {
+            **self._metrics,
+            "workers": self.workers,
+            "offloaded_kinds": sorted(self._offloaded),
+            "result_ttl_seconds": self.result_ttl,
+            "jobs": states,
+            "latest_completed": {kind: job.job_id for kind, job in self._latest.items()}
+        }
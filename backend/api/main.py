@@ -375,7 +375,7 @@ async def get_usage_analytics(item_id: str):
     if item_id not in supply_agent.inventory:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    usage_data = supply_agent.usage_patterns.get(item_id, [])
+    usage_data = supply_agent.usage_patterns.history(item_id)
     avg_usage = supply_agent._get_average_usage(item_id)
     
     return {
@@ -0,0 +1,65 @@
+"""
+Single-Flight Request Coalescing for Expensive API Endpoints
+Concurrent identical requests share one in-progress computation and its result
+"""
+
+from typing import Dict, Any, Callable, Awaitable, Tuple
+import asyncio
+import json
+
+
+def normalize_params(params: Dict[str, Any]) -> str:
+    """Canonical form of request parameters, independent of key order"""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per (endpoint, normalized parameters) at a time.
+    Requests arriving while it is in flight await the same result (or exception).
+    Nothing is cached once the computation finishes.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._metrics: Dict[str, Dict[str, int]] = {}
+
+    def _endpoint_metrics(self, endpoint: str) -> Dict[str, int]:
+        if endpoint not in self._metrics:
+            self._metrics[endpoint] = {"requests": 0, "executions": 0, "coalesced": 0, "failures": 0}
+        return self._metrics[endpoint]
+
+    async def run(self, endpoint: str, params: Dict[str, Any], compute: Callable[[], Awaitable[Any]]) -> Any:
+        key = (endpoint, normalize_params(params))
+        metrics = self._endpoint_metrics(endpoint)
+        metrics["requests"] += 1
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            metrics["coalesced"] += 1
+        else:
+            metrics["executions"] += 1
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+
+            def _finished(done: asyncio.Future, key=key):
+                if self._in_flight.get(key) is done:
+                    del self._in_flight[key]
+                if not done.cancelled() and done.exception() is not None:
+                    metrics["failures"] += 1
+            task.add_done_callback(_finished)
+
+        # A disconnecting client must not cancel the computation others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        totals = {"requests": 0, "executions": 0, "coalesced": 0, "failures": 0}
+        for metrics in self._metrics.values():
+            for name in totals:
+                totals[name] += metrics[name]
+        return {
+            **totals,
+            "coalesced_rate": totals["coalesced"] / totals["requests"] if totals["requests"] else 0.0,
+            "in_flight": len(self._in_flight),
+            "endpoints": {endpoint: dict(metrics) for endpoint, metrics in self._metrics.items()}
+        }